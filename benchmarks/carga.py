@@ -0,0 +1,464 @@
+# benchmarks/carga.py
+"""
+Teste de carga das páginas: N sessões simultâneas com o AppTest do Streamlit.
+
+Uso (na raiz do repositório):
+    python -m benchmarks.carga --sessoes 1,4,8,16 --saida carga.json
+    python -m benchmarks.carga --url postgresql://usuario@localhost/viabilidade --sessoes 8,32
+    python -m benchmarks.carga --base carga_anterior.json --limite 20
+
+Cada sessão simulada percorre o roteiro de um usuário: abre a página de
+entrada, edita o terreno, salva, vai para a lista de projetos, busca o
+projeto salvo e o carrega. Cada sessão roda no seu próprio processo (o
+AppTest guarda estado global durante as execuções e não pode ser usado
+por várias threads ao mesmo tempo), e as sessões de um nível começam
+juntas, disputando CPU e banco de verdade. Cada processo tem seu próprio
+engine e caches, como réplicas de um servidor com uma sessão cada; o
+compartilhamento de caches entre sessões de um mesmo servidor não entra
+na medida.
+
+Para cada nível de concorrência o relatório traz p50/p95/p99 das execuções
+(reruns), o tempo até a gravação ser confirmada, as conexões em uso (soma
+dos pools de todos os processos no mesmo instante), o acréscimo de memória
+(RSS) de cada sessão, os engines criados e os comandos SQL (inclusive DDL)
+por execução. A capacidade é o maior nível com p95 dentro de `--meta-p95`
+e sem erros. Antes da medida, cada processo percorre o roteiro
+`--aquecimento` vezes; engines criados ou DDL depois disso contam como
+falha, pois são custos que deveriam ocorrer uma única vez por processo.
+"""
+
+import argparse
+import gc
+import json
+import math
+import multiprocessing
+import os
+import platform
+import queue
+import sys
+import tempfile
+import threading
+import time
+
+# As fases das páginas e os comandos SQL só são medidos com as métricas ligadas,
+# e o engine só é instrumentado se isso valer antes de ser criado
+os.environ['VIABILIDADE_METRICAS'] = '1'
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(RAIZ, 'viabilidade_app.py')
+PAGINA_ENTRADA = 'pages/1_🏠_Dados_de_Entrada.py'
+PAGINA_ABRIR = 'pages/2_📁_Abrir_Viabilidade.py'
+
+URL_PADRAO = 'sqlite:///' + os.path.join(tempfile.gettempdir(), 'viabilidade_carga.db')
+
+# Comandos que não deveriam rodar depois do aquecimento
+COMANDOS_DDL = ('CREATE', 'ALTER', 'DROP')
+
+# Intervalo de amostragem das conexões em uso (s)
+INTERVALO_AMOSTRAS = 0.01
+
+# Tempo máximo (s) para os processos de um nível importarem o Streamlit e aquecerem
+TEMPO_PREPARO = 600.0
+
+
+def percentil(valores, p: float) -> float:
+    """Percentil `p` pelo método do posto mais próximo."""
+    ordenados = sorted(valores)
+    if not ordenados:
+        return float('nan')
+    return ordenados[max(0, math.ceil(p / 100 * len(ordenados)) - 1)]
+
+
+def memoria_rss() -> int:
+    """Memória residente do processo em bytes (Linux; nos demais, o pico)."""
+    try:
+        with open('/proc/self/statm') as arquivo:
+            return int(arquivo.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico if sys.platform == 'darwin' else pico * 1024
+
+
+class AmostradorPool(threading.Thread):
+    """Amostra, em segundo plano, as conexões em uso nos engines do processo."""
+
+    def __init__(self, intervalo: float = INTERVALO_AMOSTRAS):
+        super().__init__(daemon=True)
+        self.intervalo = intervalo
+        self.amostras = []   # (time.time(), conexões em uso)
+        self._parar = threading.Event()
+
+    def run(self):
+        from src.banco_dados import _engines
+
+        while not self._parar.is_set():
+            self.amostras.append((time.time(), sum(
+                getattr(engine.pool, 'checkedout', lambda: 0)() for engine in list(_engines.values())
+            )))
+            self._parar.wait(self.intervalo)
+
+    def parar(self) -> list:
+        self._parar.set()
+        self.join()
+        return self.amostras
+
+
+def somar_amostras(por_processo: list) -> dict:
+    """
+    Máximo e média da soma das conexões em uso de todos os processos.
+
+    Cada processo amostra o próprio pool; em cada instante vale a última
+    amostra de cada um. `time.time()` é o mesmo relógio para todos.
+    """
+    eventos = sorted((t, i, n) for i, amostras in enumerate(por_processo) for t, n in amostras)
+    atuais = [0] * len(por_processo)
+    total = maximo = soma = 0
+    for _, i, n in eventos:
+        total += n - atuais[i]
+        atuais[i] = n
+        maximo = max(maximo, total)
+        soma += total
+    return {'max': maximo, 'media': soma / len(eventos) if eventos else 0.0}
+
+
+# --- Roteiro de uma sessão ---
+
+class Sessao:
+    """Um usuário simulado: uma instância do AppTest percorrendo as páginas."""
+
+    def __init__(self, nome: str, url: str, iteracoes: int, timeout: float):
+        from streamlit.testing.v1 import AppTest
+
+        self.nome = nome
+        self.iteracoes = iteracoes
+        self.timeout = timeout
+        self.tempos = []       # (etapa, segundos) de cada execução
+        self.gravacoes = []    # segundos do clique em salvar até a confirmação
+        self.erro = None
+        self.app = AppTest.from_file(APP, default_timeout=timeout)
+        # Uma sessão por processo: a troca de `st.secrets` feita pelo AppTest não concorre
+        self.app.secrets['connections'] = {'postgresql': {'url': url}}
+
+    def _executar(self, etapa: str):
+        inicio = time.perf_counter()
+        self.app.run(timeout=self.timeout)
+        self.tempos.append((etapa, time.perf_counter() - inicio))
+        if self.app.exception:
+            raise RuntimeError(f"{etapa}: {self.app.exception[0].message}")
+
+    def _botao(self, prefixo: str):
+        return next(b for b in self.app.button if b.label.startswith(prefixo))
+
+    def percorrer(self):
+        try:
+            at = self.app
+            at.switch_page(PAGINA_ENTRADA)
+            self._executar('abrir_entrada')
+            at.text_input(key='nome_terreno').input(self.nome)
+            self._executar('editar')
+
+            salvo = None
+            for i in range(self.iteracoes):
+                for chave, valor in (
+                    ('area_terreno', 1000.0 + 10 * i),
+                    ('preco_medio_vendas', 9000.0 + 50 * i),
+                    ('custo_direto_construcao_m2', 3500.0 + 20 * i),
+                ):
+                    at.number_input(key=chave).set_value(valor)
+                    self._executar('editar')
+
+                self._botao("💾 Salvar").click()
+                inicio = time.perf_counter()
+                self._executar('salvar')
+                salvo = at.session_state['gravacao']['futuro'].result(self.timeout)
+                self.gravacoes.append(time.perf_counter() - inicio)
+
+            at.switch_page(PAGINA_ABRIR)
+            self._executar('abrir_lista')
+            at.text_input(key='busca_viabilidade').input(self.nome)
+            self._executar('buscar')
+            if salvo is not None:
+                at.selectbox[0].set_value(salvo['id'])
+                self._executar('selecionar')
+                self._botao("Carregar Viabilidade").click()
+                self._executar('carregar')
+        except Exception as e:
+            self.erro = f"{type(e).__name__}: {e}"
+
+
+# --- Processo de uma sessão ---
+
+def _resumo_metricas() -> dict:
+    from src.metricas import metricas
+
+    consultas = {}
+    fases = {}
+    for serie in metricas.series():
+        if serie['nome'] == 'consulta':
+            consultas[serie['rotulos']['tipo']] = serie['contagem']
+        elif serie['nome'] == 'fase':
+            r = serie['rotulos']
+            fases[f"{r['pagina']}/{r['fase']}"] = (serie['contagem'], serie['soma_segundos'])
+    return {'consultas': consultas, 'fases': fases}
+
+
+def executar_sessao(nome: str, url: str, iteracoes: int, timeout: float, aquecimento: int,
+                    barreira, resultados):
+    """
+    Corpo do processo de uma sessão: aquece, espera as demais e percorre o roteiro.
+
+    O resultado (ou o erro) vai para a fila `resultados`; a barreira é
+    sempre alcançada, para que um processo com falha não trave o nível.
+    """
+    if RAIZ not in sys.path:
+        sys.path.insert(0, RAIZ)
+
+    resultado = {'nome': nome, 'tempos': [], 'gravacoes': [], 'erro': None}
+    usuario = None
+    try:
+        from src.banco_dados import _engines
+        from src.metricas import metricas
+
+        for i in range(aquecimento):
+            previa = Sessao(f"{nome} aquecimento {i}", url, 1, timeout)
+            previa.percorrer()
+            if previa.erro:
+                raise RuntimeError(f"aquecimento: {previa.erro}")
+        usuario = Sessao(nome, url, iteracoes, timeout)
+        metricas.limpar()
+        engines_antes = len(_engines)
+        gc.collect()
+        memoria_antes = memoria_rss()
+    except Exception as e:
+        resultado['erro'] = f"{type(e).__name__}: {e}"
+        usuario = None
+
+    try:
+        barreira.wait(TEMPO_PREPARO)
+    except threading.BrokenBarrierError:
+        pass
+
+    if usuario is not None:
+        amostrador = AmostradorPool()
+        amostrador.start()
+        resultado['inicio'] = time.time()
+        usuario.percorrer()
+        resultado['fim'] = time.time()
+        resultado['conexoes'] = amostrador.parar()
+        # Medida com a sessão ainda viva: o estado dela continua em memória
+        gc.collect()
+        rss = memoria_rss()
+        resultado.update(
+            tempos=usuario.tempos,
+            gravacoes=usuario.gravacoes,
+            erro=usuario.erro,
+            memoria=rss - memoria_antes,
+            rss=rss,
+            engines_criados=len(_engines) - engines_antes,
+            **_resumo_metricas(),
+        )
+    resultados.put(resultado)
+
+
+# --- Níveis de concorrência ---
+
+def executar_nivel(sessoes: int, url: str, iteracoes: int, timeout: float, aquecimento: int,
+                   prefixo: str) -> dict:
+    """Roda `sessoes` sessões simultâneas, uma por processo, e resume latências, conexões e memória."""
+    # 'spawn': cada processo começa limpo, sem herdar threads nem estado do Streamlit
+    contexto = multiprocessing.get_context('spawn')
+    barreira = contexto.Barrier(sessoes)
+    fila = contexto.Queue()
+    processos = [
+        contexto.Process(
+            target=executar_sessao,
+            args=(f"{prefixo} {sessoes}-{i}", url, iteracoes, timeout, aquecimento, barreira, fila),
+            daemon=True,
+        )
+        for i in range(sessoes)
+    ]
+    for processo in processos:
+        processo.start()
+
+    # O roteiro tem poucas dezenas de execuções, cada uma limitada por `timeout`
+    limite = TEMPO_PREPARO + timeout * (6 + 4 * iteracoes) * (aquecimento + 1)
+    usuarios = []
+    for _ in processos:
+        try:
+            usuarios.append(fila.get(timeout=limite))
+        except queue.Empty:
+            break
+    for processo in processos:
+        processo.join(timeout=5)
+        if processo.is_alive():
+            processo.terminate()
+
+    erros = [u['erro'] for u in usuarios if u['erro']]
+    erros += ["sessão sem resultado"] * (sessoes - len(usuarios))
+    medidos = [u for u in usuarios if 'inicio' in u]
+
+    tempos = [s for u in medidos for _, s in u['tempos']]
+    por_etapa = {}
+    for u in medidos:
+        for etapa, s in u['tempos']:
+            por_etapa.setdefault(etapa, []).append(s)
+    gravacoes = [s for u in medidos for s in u['gravacoes']]
+    consultas = {}
+    fases = {}
+    for u in medidos:
+        for tipo, n in u['consultas'].items():
+            consultas[tipo] = consultas.get(tipo, 0) + n
+        for fase, (n, soma) in u['fases'].items():
+            anterior = fases.get(fase, (0, 0.0))
+            fases[fase] = (anterior[0] + n, anterior[1] + soma)
+    duracao = max((u['fim'] for u in medidos), default=0.0) - min((u['inicio'] for u in medidos), default=0.0)
+    execucoes = len(tempos)
+
+    def media_mb(campo):
+        return sum(u[campo] for u in medidos) / len(medidos) / 2**20 if medidos else 0.0
+
+    return {
+        'sessoes': sessoes,
+        'execucoes': execucoes,
+        'duracao_s': duracao,
+        'execucoes_por_s': execucoes / duracao if duracao else 0.0,
+        'p50_s': percentil(tempos, 50),
+        'p95_s': percentil(tempos, 95),
+        'p99_s': percentil(tempos, 99),
+        'max_s': max(tempos, default=float('nan')),
+        'p95_por_etapa_s': {etapa: percentil(v, 95) for etapa, v in por_etapa.items()},
+        'gravacao_p95_s': percentil(gravacoes, 95),
+        'conexoes_em_uso': somar_amostras([u['conexoes'] for u in medidos]),
+        'memoria_por_sessao_mb': media_mb('memoria'),
+        'rss_por_processo_mb': media_mb('rss'),
+        'engines_criados': sum(u['engines_criados'] for u in medidos),
+        'consultas_por_execucao': sum(consultas.values()) / execucoes if execucoes else 0.0,
+        'ddl': sum(n for tipo, n in consultas.items() if tipo in COMANDOS_DDL),
+        'fases_media_ms': {fase: soma / n * 1000 for fase, (n, soma) in sorted(fases.items())},
+        'erros': erros,
+    }
+
+
+def executar(niveis, url: str = URL_PADRAO, iteracoes: int = 2, timeout: float = 60.0,
+             aquecimento: int = 1, meta_p95: float = 1.0) -> dict:
+    """Um nível por número de sessões, com os processos aquecidos antes da medida; retorna o relatório."""
+    prefixo = f"Carga {time.strftime('%Y%m%d%H%M%S')}"
+    resultados = [executar_nivel(n, url, iteracoes, timeout, aquecimento, prefixo) for n in niveis]
+    capacidade = 0
+    for r in resultados:
+        if r['p95_s'] <= meta_p95 and not r['erros']:
+            capacidade = max(capacidade, r['sessoes'])
+
+    return {
+        'ambiente': {
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'processador': platform.processor(),
+            'cpus': os.cpu_count(),
+            'banco': url.split(':', 1)[0],
+        },
+        'iteracoes': iteracoes,
+        'aquecimento': aquecimento,
+        'meta_p95_s': meta_p95,
+        'capacidade_sessoes': capacidade,
+        'niveis': resultados,
+    }
+
+
+def verificar(relatorio: dict) -> list:
+    """Problemas que não dependem de comparação: erros, engines criados e DDL após o aquecimento."""
+    problemas = []
+    # Sem aquecimento, criar o engine e o schema faz parte da medida
+    aquecido = relatorio.get('aquecimento', 1) > 0
+    for r in relatorio['niveis']:
+        n = r['sessoes']
+        if r['erros']:
+            problemas.append(f"{n} sessões: {len(r['erros'])} com erro ({r['erros'][0]})")
+        if not aquecido:
+            continue
+        if r['engines_criados']:
+            problemas.append(f"{n} sessões: {r['engines_criados']} engine(s) criado(s) durante as execuções")
+        if r['ddl']:
+            problemas.append(f"{n} sessões: {r['ddl']} comando(s) DDL durante as execuções")
+    return problemas
+
+
+def comparar(atual: dict, base: dict, limite_pct: float) -> list:
+    """Níveis cujo p95 piorou mais que `limite_pct`% em relação à base."""
+    anteriores = {r['sessoes']: r for r in base.get('niveis', [])}
+    regressoes = []
+    for r in atual['niveis']:
+        b = anteriores.get(r['sessoes'])
+        if not b or not b.get('p95_s'):
+            continue
+        variacao = (r['p95_s'] / b['p95_s'] - 1) * 100
+        r['variacao_p95_pct'] = variacao
+        if variacao > limite_pct:
+            regressoes.append(f"{r['sessoes']} sessões: p95 {variacao:+.1f}% (limite {limite_pct:.0f}%)")
+    return regressoes
+
+
+def tabela(relatorio: dict) -> str:
+    linhas = [f"{'sessões':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'exec/s':>7} "
+              f"{'conexões':>8} {'MB/sessão':>9} {'erros':>5}"]
+    for r in relatorio['niveis']:
+        linhas.append(
+            f"{r['sessoes']:>7} {r['p50_s'] * 1000:>8.0f} {r['p95_s'] * 1000:>8.0f} {r['p99_s'] * 1000:>8.0f} "
+            f"{r['execucoes_por_s']:>7.1f} {r['conexoes_em_uso']['max']:>8} "
+            f"{r['memoria_por_sessao_mb']:>9.1f} {len(r['erros']):>5}"
+        )
+    linhas.append(
+        f"capacidade (p95 <= {relatorio['meta_p95_s']:.2f} s, {relatorio['ambiente']['cpus']} CPU): "
+        f"{relatorio['capacidade_sessoes']} sessões"
+    )
+    return "\n".join(linhas)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga das páginas com sessões simultâneas.")
+    parser.add_argument('--sessoes', default='1,2,4,8', help="Níveis de concorrência, separados por vírgulas")
+    parser.add_argument('--url', default=URL_PADRAO, help="URL do banco (padrão: SQLite no diretório temporário)")
+    parser.add_argument('--iteracoes', type=int, default=2, help="Ciclos de edição e gravação por sessão")
+    parser.add_argument('--aquecimento', type=int, default=1,
+                        help="Roteiros não medidos que cada processo percorre antes da medida")
+    parser.add_argument('--timeout', type=float, default=60.0, help="Tempo máximo de cada execução (s)")
+    parser.add_argument('--meta-p95', type=float, default=1.0, help="p95 aceitável (s) para a capacidade")
+    parser.add_argument('--saida', help="Arquivo JSON de saída (padrão: stdout)")
+    parser.add_argument('--base', help="Relatório JSON anterior para comparação")
+    parser.add_argument('--limite', type=float, default=20.0,
+                        help="Piora máxima aceita do p95 em %% em relação à base (padrão: 20)")
+    args = parser.parse_args(argv)
+
+    try:
+        niveis = [int(n) for n in args.sessoes.split(',')]
+    except ValueError:
+        parser.error("--sessoes deve ser uma lista de inteiros, ex.: 1,4,8")
+
+    # Os processos das sessões herdam o sys.path (método 'spawn')
+    sys.path.insert(0, RAIZ)
+
+    relatorio = executar(niveis, args.url, args.iteracoes, args.timeout, args.aquecimento, args.meta_p95)
+
+    problemas = verificar(relatorio)
+    if args.base:
+        with open(args.base, encoding='utf-8') as arquivo:
+            problemas += comparar(relatorio, json.load(arquivo), args.limite)
+        relatorio['limite_pct'] = args.limite
+    relatorio['problemas'] = problemas
+
+    texto = json.dumps(relatorio, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(texto + '\n')
+    else:
+        print(texto)
+
+    print(tabela(relatorio), file=sys.stderr)
+    for problema in problemas:
+        print(f"PROBLEMA: {problema}", file=sys.stderr)
+    return 1 if problemas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,301 @@
+# benchmarks/executar.py
+"""
+Benchmarks dos caminhos críticos: cálculo, formatação, editor de custos e persistência.
+
+Uso (na raiz do repositório):
+    python -m benchmarks.executar --saida atual.json
+    python -m benchmarks.executar --base base.json --limite 10   # falha se algo ficar >10% mais lento
+    python -m benchmarks.executar --casos calculo_escalar,calculo_lote
+
+Cada caso roda com entradas fixas (semente fixa), algumas execuções de
+aquecimento e `--repeticoes` medições; compara-se a mediana. Casos cujas
+dependências não estão instaladas são marcados como ignorados.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+
+SEMENTE = 12345
+
+ENTRADAS = {
+    'nome_terreno': 'Benchmark',
+    'area_terreno': 1200.0,
+    'indice_aproveitamento': 2.5,
+    'relacao_privativa_construida': 0.7,
+    'preco_medio_vendas': 9500.0,
+    'custo_direto_construcao_m2': 3800.0,
+    'custos_indiretos': [
+        ['IRPJ/CS/PIS/COFINS', 4.00], ['Corretagem', 3.61], ['Publicidade', 0.90],
+        ['Manutenção', 0.50], ['Custo Fixo IDIBRA', 4.00], ['Assessoria Técnica', 0.70],
+        ['Projetos', 0.52], ['Licenciamento e Incorporação', 0.20],
+    ],
+    'custos_monetarios': {
+        'outorga_onerosa': 250000.0, 'condominio': 12000.0, 'iptu': 8000.0,
+        'preparacao_terreno': 40000.0, 'financiamento_bancario': 150000.0,
+    },
+}
+
+
+# --- Casos ---
+# Cada caso recebe nada e retorna (função medida, operações por chamada).
+
+def caso_calculo_escalar():
+    from src.calculos_financeiros import calcular_viabilidade
+
+    def medir():
+        for _ in range(1_000):
+            calcular_viabilidade(ENTRADAS)
+    return medir, 1_000
+
+
+def caso_calculo_lote():
+    import numpy as np
+
+    from src.calculos_lote import calcular_resultado_negocio_lote
+
+    n = 100_000
+    rng = np.random.default_rng(SEMENTE)
+    args = (
+        rng.uniform(300, 5000, n),
+        rng.uniform(1, 4, n),
+        rng.uniform(2500, 5000, n),
+        rng.uniform(0.6, 0.85, n),
+        rng.uniform(6000, 14000, n),
+        rng.uniform(10, 18, n),
+        rng.uniform(0, 500000, n),
+    )
+
+    def medir():
+        calcular_resultado_negocio_lote(*args)
+    return medir, n
+
+
+def caso_formatacao_cards():
+    from src.calculos_financeiros import calcular_viabilidade
+    from src.formatacao import obter_formatador, renderizar_grade
+
+    r = calcular_viabilidade(ENTRADAS)
+    moedas = ('custo_direto_total', 'custos_indiretos_total', 'custo_total', 'vgv', 'resultado_negocio')
+    decimais = ('margem_lucro', 'area_terreno', 'area_construida', 'area_privativa')
+
+    # Os 11 valores dos cards de resultado da página de entrada e o HTML da grade
+    def medir():
+        fmt = obter_formatador()
+        for _ in range(100):
+            cards = [(campo, fmt.moeda(r[campo]), 'neutral') for campo in moedas]
+            cards += [(campo, fmt.decimal(r[campo]), 'neutral') for campo in decimais]
+            cards.append(('indice', fmt.decimal(ENTRADAS['indice_aproveitamento']), 'neutral'))
+            cards.append(('relacao', fmt.decimal(ENTRADAS['relacao_privativa_construida']), 'neutral'))
+            renderizar_grade([('Resultados', cards)])
+    return medir, 100
+
+
+def caso_formatacao_tabela():
+    import random
+
+    from src.formatacao import obter_formatador
+
+    gerador = random.Random(SEMENTE)
+    n = 5_000
+    valores = [gerador.uniform(-1e7, 1e8) for _ in range(n)]
+
+    # Uma coluna monetária e uma decimal de uma exportação de 5.000 linhas
+    def medir():
+        fmt = obter_formatador()
+        fmt.moedas(valores)
+        fmt.decimais(valores)
+    return medir, n
+
+
+def caso_grafico_carteira():
+    import numpy as np
+
+    from src.visualizacoes import plotar_fluxos_carteira
+
+    # 500 projetos com 10 anos de fluxos diários, reduzidos pelo LTTB
+    fluxos = np.random.default_rng(SEMENTE).normal(size=(500, 3650))
+
+    def medir():
+        plotar_fluxos_carteira(fluxos).to_json()
+    return medir, 1
+
+
+def caso_reajuste_carteira():
+    import os
+    import tempfile
+
+    import numpy as np
+
+    from src.data_model import completar_entradas
+    from src.reajuste import abrir_indices, avaliar_reajustado, mes_ordinal
+
+    # 20 anos de INCC e IGP-M sintéticos; 1000 projetos de 24 a 60 meses
+    rng = np.random.default_rng(SEMENTE)
+    pasta = tempfile.mkdtemp()
+    caminho = os.path.join(pasta, 'indices.csv')
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        arquivo.write('mes,INCC,IGP-M\n')
+        for m in range(240):
+            arquivo.write(f"{2005 + m // 12}-{m % 12 + 1:02d},{rng.uniform(0, 1.2):.4f},{rng.uniform(-0.5, 1.5):.4f}\n")
+    base = abrir_indices([caminho], pasta_cache=os.path.join(pasta, 'cache'))
+
+    n = 1_000
+    projetos = [completar_entradas(dict(ENTRADAS, duracao_projeto=int(d))) for d in rng.integers(24, 61, n)]
+    inicios = mes_ordinal('2022-01') + rng.integers(0, 48, n)
+
+    def medir():
+        avaliar_reajustado(projetos, base, mes_ordinal('2022-01'), inicios, 'INCC', 'IGP-M')
+    return medir, n
+
+
+def caso_editor_custos():
+    import pandas as pd
+
+    from src.data_model import entradas_da_sessao, entradas_para_sessao
+
+    estado = entradas_para_sessao(ENTRADAS)
+    vgv = 1200.0 * 2.5 * 9500.0
+
+    # Mesmo caminho da página a cada rerun: cópia, conversão, coluna de valor,
+    # recorte das colunas editáveis e conversão para as entradas do projeto
+    def medir():
+        for _ in range(100):
+            df = estado['custos_indiretos_padrao'].copy()
+            df['%'] = pd.to_numeric(df['%'])
+            df['Valor (R$)'] = df['%'] * (vgv / 100)
+            estado['custos_indiretos_padrao'] = df[['Custo', '%']]
+            entradas_da_sessao(estado)
+    return medir, 100
+
+
+def caso_persistencia():
+    from src.banco_dados import carregar_versao, carregar_viabilidade, obter_engine, salvar_versao
+    from src.calculos_financeiros import calcular_viabilidade
+    from src.data_model import completar_entradas, montar_registro
+
+    engine = obter_engine('sqlite://')
+    entradas = completar_entradas(ENTRADAS)
+    contador = iter(range(10**9))
+
+    # Uma gravação nova, uma alteração (delta), a leitura atual e a da versão 1
+    def medir():
+        for _ in range(20):
+            nome = f"Benchmark {next(contador)}"
+            e = dict(entradas, nome_terreno=nome)
+            salvo = salvar_versao(engine, nome, montar_registro(e, calcular_viabilidade(e)))
+            e['preco_medio_vendas'] += 100
+            salvar_versao(engine, nome, montar_registro(e, calcular_viabilidade(e)))
+            carregar_viabilidade(engine, salvo['id'])
+            carregar_versao(engine, salvo['id'], 1)
+    return medir, 20
+
+
+CASOS = {
+    'calculo_escalar': caso_calculo_escalar,
+    'calculo_lote': caso_calculo_lote,
+    'formatacao_cards': caso_formatacao_cards,
+    'formatacao_tabela': caso_formatacao_tabela,
+    'grafico_carteira': caso_grafico_carteira,
+    'reajuste_carteira': caso_reajuste_carteira,
+    'editor_custos': caso_editor_custos,
+    'persistencia': caso_persistencia,
+}
+
+
+# --- Execução ---
+
+def medir_caso(preparar, repeticoes: int, aquecimento: int) -> dict:
+    medir, operacoes = preparar()
+    for _ in range(aquecimento):
+        medir()
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        medir()
+        tempos.append(time.perf_counter() - inicio)
+    mediana = statistics.median(tempos)
+    return {
+        'mediana_s': mediana,
+        'min_s': min(tempos),
+        'max_s': max(tempos),
+        'repeticoes': repeticoes,
+        'operacoes': operacoes,
+        'por_operacao_us': mediana / operacoes * 1e6,
+    }
+
+
+def executar(nomes=None, repeticoes: int = 15, aquecimento: int = 3) -> dict:
+    """Roda os casos e retorna o relatório (serializável em JSON)."""
+    resultados = {}
+    for nome in nomes or CASOS:
+        try:
+            resultados[nome] = medir_caso(CASOS[nome], repeticoes, aquecimento)
+        except ImportError as e:
+            resultados[nome] = {'ignorado': f"dependência ausente: {e.name}"}
+    return {
+        'ambiente': {
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'processador': platform.processor(),
+        },
+        'resultados': resultados,
+    }
+
+
+def comparar(atual: dict, base: dict, limite_pct: float) -> list:
+    """Casos cuja mediana piorou mais que `limite_pct`% em relação à base."""
+    regressoes = []
+    for nome, r in atual['resultados'].items():
+        b = base['resultados'].get(nome)
+        if not b or 'mediana_s' not in b or 'mediana_s' not in r:
+            continue
+        variacao = (r['mediana_s'] / b['mediana_s'] - 1) * 100
+        r['variacao_pct'] = variacao
+        if variacao > limite_pct:
+            regressoes.append((nome, variacao))
+    return regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks dos caminhos críticos da viabilidade.")
+    parser.add_argument('--casos', help=f"Lista separada por vírgulas ({', '.join(CASOS)})")
+    parser.add_argument('--repeticoes', type=int, default=15)
+    parser.add_argument('--aquecimento', type=int, default=3)
+    parser.add_argument('--saida', help="Arquivo JSON de saída (padrão: stdout)")
+    parser.add_argument('--base', help="Relatório JSON anterior para comparação")
+    parser.add_argument('--limite', type=float, default=10.0,
+                        help="Piora máxima aceita em %% em relação à base (padrão: 10)")
+    args = parser.parse_args(argv)
+
+    nomes = args.casos.split(',') if args.casos else None
+    desconhecidos = set(nomes or ()) - set(CASOS)
+    if desconhecidos:
+        parser.error(f"Casos desconhecidos: {', '.join(sorted(desconhecidos))}")
+
+    relatorio = executar(nomes, args.repeticoes, args.aquecimento)
+
+    regressoes = []
+    if args.base:
+        with open(args.base, encoding='utf-8') as arquivo:
+            regressoes = comparar(relatorio, json.load(arquivo), args.limite)
+        relatorio['limite_pct'] = args.limite
+        relatorio['regressoes'] = [nome for nome, _ in regressoes]
+
+    texto = json.dumps(relatorio, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(texto + '\n')
+    else:
+        print(texto)
+
+    for nome, variacao in regressoes:
+        print(f"REGRESSÃO: {nome} {variacao:+.1f}% (limite {args.limite:.0f}%)", file=sys.stderr)
+    return 1 if regressoes else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,30 @@
 import streamlit as st
 import pandas as pd
-from babel.numbers import format_currency, format_decimal
-from sqlalchemy import create_engine, text
+
+import queue
+from datetime import date
+
+from src.banco_dados import engine_da_configuracao
+from src.persistencia import obter_gravador
+from src.data_model import (
+    get_empty_project_data, entradas_da_sessao, entradas_para_sessao, chave_registro, montar_registro
+)
+from src.cache_calculos import cache_resultados, chave_entradas
+from src.calculos_financeiros import calcular_resultado_negocio
+from src.simulacao import montar_modelo, simular_viabilidade, distribuicao_triangular
+from src.sensibilidade import decompor_margem, grade_margem, faixas_grade, analisar_tornado
+from src.fluxo_caixa import gerar_fluxo_caixa, fluxo_caixa_df, calcular_indicadores, reajustar_fluxo
+from src.visualizacoes import plotar_fluxo_de_caixa, plotar_mapa_sensibilidade, plotar_tornado
+from src.otimizacao import VARIAVEIS, resolver_margem, preco_minimo_para_tir
+from src.reajuste import abrir_indices, fatores_do_projeto, fontes_configuradas, mes_ordinal, mes_texto
+from src.metricas import iniciar_execucao
+from src.formatacao import (
+    obter_formatador, formatar_moeda, formatar_decimal, formatar_percentual, classe_sinal,
+    renderizar_cards, renderizar_grade
+)
+
+# Tempos por fase desta execução (no-op se VIABILIDADE_METRICAS não estiver ligado)
+execucao = iniciar_execucao('entrada')
 
 # --- Configuração da página ---
 st.set_page_config(
@@ -11,24 +34,14 @@ st.set_page_config(
 )
 
 # --- Conexão com o banco usando secrets.toml ---
+# O engine e o schema são criados uma única vez por processo
 try:
-    DATABASE_URL = st.secrets["connections"]["postgresql"]["url"]
+    engine = engine_da_configuracao(st.secrets["connections"]["postgresql"])
 except KeyError:
     st.error("Não foi possível obter a URL de conexão em secrets.toml.")
     st.stop()
 
-engine = create_engine(DATABASE_URL)
-
-# --- Criação da tabela 'viabilidades' se não existir ---
-with engine.begin() as conn:
-    conn.execute(text("""
-        CREATE TABLE IF NOT EXISTS viabilidades (
-            id SERIAL PRIMARY KEY,
-            nome_terreno VARCHAR(255) UNIQUE,
-            dados JSONB,
-            data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-    """))
+execucao.marcar('engine')
 
 # --- CSS personalizado para os cards ---
 st.markdown("""
@@ -58,11 +71,20 @@ st.markdown("""
     .card.positive { background-color: #e6f7ea; border-color: #c8e6c9; color: #28a745; }
     .card.negative { background-color: #fcebeb; border-color: #f5c6cb; color: #dc3545; }
     .card.neutral  { background-color: #f8f9fa; border-color: #e9ecef; color: #343a40; }
+    .grade-cards { display: grid; grid-template-columns: repeat(var(--colunas), minmax(0, 1fr)); }
     h1, h2, h3 { color: #343a40; font-weight: 600; }
     .stDataFrame { box-shadow: 0 4px 12px rgba(0,0,0,0.08); border-radius: 8px; }
 </style>
 """, unsafe_allow_html=True)
 
+# --- Estado inicial ---
+# Valores padrão das entradas; projetos carregados já preencheram as suas chaves
+for chave, valor in entradas_para_sessao(get_empty_project_data()).items():
+    if chave not in st.session_state:
+        st.session_state[chave] = valor
+
+execucao.marcar('estado_inicial')
+
 st.title("💰 Análise de Viabilidade Imobiliária")
 st.write("Insira os parâmetros para a análise de viabilidade do seu projeto imobiliário.")
 
@@ -78,58 +100,93 @@ def calcular_viabilidade(
     custos_indiretos_percentuais_df,
     custos_indiretos_monetarios_dict
 ):
-    """Calcula métricas de área e financeiras do projeto."""
-    area_privativa = area_terreno * indice_aproveitamento
-    area_construida = (area_privativa / relacao_privativa_construida
-                       if relacao_privativa_construida > 0 else 0)
-    vgv = preco_medio_vendas * area_privativa
-    custo_direto_total = area_construida * custo_direto_construcao_m2
-
-    total_perc = custos_indiretos_percentuais_df['%'].sum()
-    custos_vgv = (total_perc / 100) * vgv
-    custos_monet = sum(custos_indiretos_monetarios_dict.values())
-    custos_indiretos_total = custos_vgv + custos_monet
-
-    custo_total = custo_direto_total + custos_indiretos_total
-    resultado_negocio = vgv - custo_total
-    margem_lucro = (resultado_negocio / vgv) * 100 if vgv > 0 else 0
+    """Calcula métricas de área e financeiras do projeto com o núcleo compartilhado."""
+    resultados = calcular_resultado_negocio(
+        area_terreno,
+        indice_aproveitamento,
+        custo_direto_construcao_m2,
+        relacao_privativa_construida,
+        preco_medio_vendas,
+        custos_indiretos_percentuais_df.to_dict('records'),
+        custos_indiretos_monetarios_dict
+    )
+    return {'nome_terreno': nome_terreno, 'area_terreno': area_terreno, **resultados}
 
+def formatar_resultados(resultados, indice_aproveitamento, relacao_privativa_construida):
+    """Formata (pt_BR) os valores exibidos nos cards de resultado."""
+    fmt = obter_formatador()
     return {
-        'nome_terreno': nome_terreno,
-        'area_terreno': area_terreno,
-        'area_privativa': area_privativa,
-        'area_construida': area_construida,
-        'vgv': vgv,
-        'custo_direto_total': custo_direto_total,
-        'custos_indiretos_total': custos_indiretos_total,
-        'custo_total': custo_total,
-        'resultado_negocio': resultado_negocio,
-        'margem_lucro': margem_lucro
+        'custo_direto_total': fmt.moeda(resultados['custo_direto_total']),
+        'custos_indiretos_total': fmt.moeda(resultados['custos_indiretos_total']),
+        'custo_total': fmt.moeda(resultados['custo_total']),
+        'vgv': fmt.moeda(resultados['vgv']),
+        'resultado_negocio': fmt.moeda(resultados['resultado_negocio']),
+        'margem_lucro': fmt.decimal(resultados['margem_lucro']),
+        'area_terreno': fmt.decimal(resultados['area_terreno']),
+        'indice_aproveitamento': fmt.decimal(indice_aproveitamento),
+        'area_construida': fmt.decimal(resultados['area_construida']),
+        'area_privativa': fmt.decimal(resultados['area_privativa']),
+        'relacao_privativa_construida': fmt.decimal(relacao_privativa_construida),
     }
 
-def salvar_viabilidade(viabilidade):
-    """Salva a viabilidade calculada no banco de dados."""
+def avaliar_viabilidade(*entradas, resultados_salvos=None):
+    """
+    Calcula e formata a viabilidade, reaproveitando o cache compartilhado.
+
+    Entradas iguais (após normalização) pulam o cálculo e a formatação.
+    `resultados_salvos`, de um projeto carregado com as mesmas entradas,
+    dispensam o cálculo.
+    """
+    def _calcular():
+        if resultados_salvos is not None:
+            resultados = {'nome_terreno': entradas[0], 'area_terreno': entradas[1], **resultados_salvos}
+        else:
+            resultados = calcular_viabilidade(*entradas)
+        return resultados, formatar_resultados(resultados, entradas[2], entradas[3])
+
+    return cache_resultados.obter_ou_calcular(chave_entradas('viabilidade', *entradas), _calcular)
+
+def salvar_viabilidade(registro):
+    """
+    Agenda a gravação do projeto como nova versão, sem esperar o banco.
+
+    O `Future` fica na sessão; `mostrar_status_gravacao` acompanha o resultado.
+    """
     try:
-        with engine.begin() as conn:
-            conn.execute(
-                text("INSERT INTO viabilidades (nome_terreno, dados) VALUES (:nome, :dados);"),
-                {"nome": viabilidade['nome_terreno'], "dados": viabilidade}
-            )
-        st.success("Viabilidade salva com sucesso!")
-    except Exception as e:
-        st.error(f"Erro ao salvar a viabilidade: {e}")
+        st.session_state.gravacao = {
+            'nome': registro['entradas']['nome_terreno'],
+            'futuro': obter_gravador(engine).enviar(registro['entradas']['nome_terreno'], registro, timeout=5),
+        }
+    except queue.Full:
+        st.error("Muitas gravações pendentes; tente novamente em instantes.")
+
+def mostrar_status_gravacao(acompanhando: bool):
+    """Situação da última gravação pedida nesta sessão."""
+    gravacao = st.session_state.get('gravacao')
+    if gravacao is None:
+        return
+    futuro = gravacao['futuro']
+    if not futuro.done():
+        st.info(f"Salvando '{gravacao['nome']}' em segundo plano...")
+        return
+    if acompanhando:
+        # Concluída: uma execução completa da página encerra a atualização periódica
+        st.rerun()
+
+    if futuro.exception() is not None:
+        st.error(f"Erro ao salvar a viabilidade: {futuro.exception()}")
+    elif futuro.result()['alterada']:
+        st.success(f"Viabilidade salva com sucesso (versão {futuro.result()['versao']})!")
+    else:
+        st.info(f"Nenhuma alteração desde a versão {futuro.result()['versao']}.")
 
 # --- Entrada de Dados (Interface) ---
 
 with st.expander("1. Terreno e Construção"):
-    if 'nome_terreno' not in st.session_state:
-        st.session_state.nome_terreno = ''
     nome_terreno = st.text_input("Nome do Terreno", key="nome_terreno")
 
     col1, col2, col3 = st.columns(3)
     with col1:
-        if 'area_terreno' not in st.session_state:
-            st.session_state.area_terreno = 0.0
         area_terreno = st.number_input(
             "Área do Terreno (m²)",
             min_value=0.0,
@@ -137,8 +194,6 @@ with st.expander("1. Terreno e Construção"):
             format="%.2f"
         )
     with col2:
-        if 'indice_aproveitamento' not in st.session_state:
-            st.session_state.indice_aproveitamento = 1.00
         indice_aproveitamento = st.slider(
             "Índice de Aproveitamento",
             min_value=1.00,
@@ -148,8 +203,6 @@ with st.expander("1. Terreno e Construção"):
             key="indice_aproveitamento"
         )
     with col3:
-        if 'relacao_privativa_construida' not in st.session_state:
-            st.session_state.relacao_privativa_construida = 0.70
         relacao_privativa_construida = st.slider(
             "Relação AP / AC",
             min_value=0.00,
@@ -160,8 +213,6 @@ with st.expander("1. Terreno e Construção"):
         )
 
 with st.expander("2. Vendas"):
-    if 'preco_medio_vendas' not in st.session_state:
-        st.session_state.preco_medio_vendas = 0.0
     preco_medio_vendas = st.number_input(
         "Preço Médio de Vendas (R$/m²)",
         min_value=0.0,
@@ -170,8 +221,6 @@ with st.expander("2. Vendas"):
     )
 
 with st.expander("3. Custos Diretos"):
-    if 'custo_direto_construcao_m2' not in st.session_state:
-        st.session_state.custo_direto_construcao_m2 = 0.0
     custo_direto_construcao_m2 = st.number_input(
         "Custo Direto de Construção (R$/m²)",
         min_value=0.0,
@@ -179,20 +228,9 @@ with st.expander("3. Custos Diretos"):
         format="%.2f"
     )
 
-with st.expander("4. Custos Indiretos"):
-    # Tabela padrão de custos indiretos (% do VGV)
-    if 'custos_indiretos_padrao' not in st.session_state:
-        st.session_state.custos_indiretos_padrao = pd.DataFrame([
-            {'Custo': 'IRPJ/CS/PIS/COFINS', '%': 4.00},
-            {'Custo': 'Corretagem', '%': 3.61},
-            {'Custo': 'Publicidade', '%': 0.90},
-            {'Custo': 'Manutenção', '%': 0.50},
-            {'Custo': 'Custo Fixo IDIBRA', '%': 4.00},
-            {'Custo': 'Assessoria Técnica', '%': 0.70},
-            {'Custo': 'Projetos', '%': 0.52},
-            {'Custo': 'Licenciamento e Incorporação', '%': 0.20},
-        ])
+execucao.marcar('entradas')
 
+with st.expander("4. Custos Indiretos"):
     # Calcula VGV temporário
     area_privativa_temp = area_terreno * indice_aproveitamento
     vgv_temp = preco_medio_vendas * area_privativa_temp
@@ -224,8 +262,6 @@ with st.expander("4. Custos Indiretos"):
     st.subheader("Custos relacionados ao Terreno / Produto")
     col4, col5, col6, col7, col8 = st.columns(5)
     with col4:
-        if 'outorga_onerosa' not in st.session_state:
-            st.session_state.outorga_onerosa = 0.0
         outorga_onerosa = st.number_input(
             "Outorga Onerosa (R$)",
             min_value=0.0,
@@ -233,8 +269,6 @@ with st.expander("4. Custos Indiretos"):
             format="%.2f"
         )
     with col5:
-        if 'condominio' not in st.session_state:
-            st.session_state.condominio = 0.0
         condominio = st.number_input(
             "Condomínio (R$)",
             min_value=0.0,
@@ -242,8 +276,6 @@ with st.expander("4. Custos Indiretos"):
             format="%.2f"
         )
     with col6:
-        if 'iptu' not in st.session_state:
-            st.session_state.iptu = 0.0
         iptu = st.number_input(
             "IPTU (R$)",
             min_value=0.0,
@@ -251,8 +283,6 @@ with st.expander("4. Custos Indiretos"):
             format="%.2f"
         )
     with col7:
-        if 'preparacao_terreno' not in st.session_state:
-            st.session_state.preparacao_terreno = 0.0
         preparacao_terreno = st.number_input(
             "Preparação do Terreno (R$)",
             min_value=0.0,
@@ -260,8 +290,6 @@ with st.expander("4. Custos Indiretos"):
             format="%.2f"
         )
     with col8:
-        if 'financiamento_bancario' not in st.session_state:
-            st.session_state.financiamento_bancario = 0.0
         financiamento_bancario = st.number_input(
             "Financiamento Bancário (R$)",
             min_value=0.0,
@@ -269,6 +297,8 @@ with st.expander("4. Custos Indiretos"):
             format="%.2f"
         )
 
+execucao.marcar('editor_custos')
+
 # --- Execução do Cálculo ---
 custos_indiretos_monetarios = {
     'outorga_onerosa': outorga_onerosa,
@@ -278,7 +308,14 @@ custos_indiretos_monetarios = {
     'financiamento_bancario': financiamento_bancario
 }
 
-resultados = calcular_viabilidade(
+# Projeto recém-carregado: enquanto as entradas não mudarem, usa os resultados salvos
+entradas_projeto = entradas_da_sessao(st.session_state)
+projeto_carregado = st.session_state.get('projeto_carregado')
+resultados_salvos = None
+if projeto_carregado and projeto_carregado['chave'] == chave_registro(entradas_projeto):
+    resultados_salvos = projeto_carregado['resultados']
+
+resultados, formatados = avaliar_viabilidade(
     st.session_state.nome_terreno,
     st.session_state.area_terreno,
     st.session_state.indice_aproveitamento,
@@ -286,107 +323,316 @@ resultados = calcular_viabilidade(
     st.session_state.preco_medio_vendas,
     st.session_state.custo_direto_construcao_m2,
     st.session_state.custos_indiretos_padrao,
-    custos_indiretos_monetarios
+    custos_indiretos_monetarios,
+    resultados_salvos=resultados_salvos
 )
 
+execucao.marcar('calculo')
+
 # --- Botão de Salvar Viabilidade ---
 st.markdown("---")
 if st.button("💾 Salvar Viabilidade", type="primary"):
     if st.session_state.nome_terreno:
-        salvar_viabilidade(resultados)
+        salvar_viabilidade(montar_registro(entradas_projeto, resultados))
     else:
         st.warning("Digite o nome do terreno antes de salvar.")
 
+# Enquanto a gravação não termina, só este trecho é reexecutado periodicamente
+gravacao = st.session_state.get('gravacao')
+pendente = gravacao is not None and not gravacao['futuro'].done()
+st.fragment(run_every=0.5 if pendente else None)(mostrar_status_gravacao)(pendente)
+
+execucao.marcar('salvar')
+
 # --- Exibição de Resultados ---
+# Toda a grade de cards num único bloco HTML
 st.markdown("---")
-st.header("Resumo de Custos")
-c1, c2, c3 = st.columns(3)
-with c1:
-    st.markdown(f"""
-        <div class="card neutral">
-          <div class="card-title">Custos Diretos</div>
-          <div class="card-metric">{format_currency(resultados['custo_direto_total'], 'BRL', locale='pt_BR')}</div>
-        </div>
-    """, unsafe_allow_html=True)
-with c2:
-    st.markdown(f"""
-        <div class="card neutral">
-          <div class="card-title">Custos Indiretos</div>
-          <div class="card-metric">{format_currency(resultados['custos_indiretos_total'], 'BRL', locale='pt_BR')}</div>
-        </div>
-    """, unsafe_allow_html=True)
-with c3:
-    st.markdown(f"""
-        <div class="card neutral">
-          <div class="card-title">Custo Total</div>
-          <div class="card-metric">{format_currency(resultados['custo_total'], 'BRL', locale='pt_BR')}</div>
-        </div>
-    """, unsafe_allow_html=True)
+st.markdown(renderizar_grade([
+    ("Resumo de Custos", [
+        ("Custos Diretos", formatados['custo_direto_total'], "neutral"),
+        ("Custos Indiretos", formatados['custos_indiretos_total'], "neutral"),
+        ("Custo Total", formatados['custo_total'], "neutral"),
+    ]),
+    ("Resumo Financeiro", [
+        ("V.G.V.", formatados['vgv'], "neutral"),
+        ("Resultado do Negócio", formatados['resultado_negocio'], classe_sinal(resultados['resultado_negocio'])),
+        ("Margem de Lucro", f"{formatados['margem_lucro']}%", classe_sinal(resultados['margem_lucro'])),
+    ]),
+    ("Resumo do Projeto", [
+        ("Área do Terreno", f"{formatados['area_terreno']} m²", "neutral"),
+        ("Índice de Aproveitamento", formatados['indice_aproveitamento'], "neutral"),
+        ("Área Construída", f"{formatados['area_construida']} m²", "neutral"),
+        ("Área Privativa", f"{formatados['area_privativa']} m²", "neutral"),
+        ("Relação AP/AC", formatados['relacao_privativa_construida'], "neutral"),
+    ]),
+]), unsafe_allow_html=True)
+
+execucao.marcar('cards')
+
+# --- Simulação de Risco (Monte Carlo) ---
+st.markdown("---")
+st.header("Simulação de Risco")
+with st.expander("5. Simulação de Monte Carlo"):
+    st.write("Variação máxima (±%) de cada grupo de entradas, com distribuição triangular em torno do valor informado.")
+    s1, s2, s3, s4 = st.columns(4)
+    with s1:
+        var_preco = st.number_input("Preço de Vendas (±%)", min_value=0.0, max_value=100.0, value=10.0, step=1.0, key="mc_var_preco")
+    with s2:
+        var_custo = st.number_input("Custo Direto (±%)", min_value=0.0, max_value=100.0, value=10.0, step=1.0, key="mc_var_custo")
+    with s3:
+        var_perc = st.number_input("Custos Indiretos % (±%)", min_value=0.0, max_value=100.0, value=10.0, step=1.0, key="mc_var_perc")
+    with s4:
+        var_monet = st.number_input("Custos Monetários (±%)", min_value=0.0, max_value=100.0, value=10.0, step=1.0, key="mc_var_monet")
+
+    s5, s6 = st.columns(2)
+    with s5:
+        n_cenarios = st.number_input("Número de Cenários", min_value=1_000, max_value=1_000_000, value=100_000, step=10_000, key="mc_n_cenarios")
+    with s6:
+        semente = st.number_input("Semente", min_value=0, value=42, step=1, key="mc_semente")
+
+    if st.button("🎲 Rodar Simulação"):
+        modelo = montar_modelo(
+            st.session_state.area_terreno,
+            st.session_state.indice_aproveitamento,
+            st.session_state.relacao_privativa_construida,
+            distribuicao_triangular(st.session_state.preco_medio_vendas, var_preco),
+            distribuicao_triangular(st.session_state.custo_direto_construcao_m2, var_custo),
+            [distribuicao_triangular(v, var_perc) for v in st.session_state.custos_indiretos_padrao['%']],
+            [distribuicao_triangular(v, var_monet) for v in custos_indiretos_monetarios.values()]
+        )
+        st.session_state.resultado_simulacao = simular_viabilidade(modelo, int(n_cenarios), int(semente))
+
+    if 'resultado_simulacao' in st.session_state:
+        sim = st.session_state.resultado_simulacao
+        prob = sim['probabilidade_prejuizo']
+        st.markdown(renderizar_cards([
+            ("Margem P5", formatar_percentual(sim['margem_p5']), classe_sinal(sim['margem_p5'])),
+            ("Margem P50", formatar_percentual(sim['margem_p50']), classe_sinal(sim['margem_p50'])),
+            ("Margem P95", formatar_percentual(sim['margem_p95']), classe_sinal(sim['margem_p95'])),
+            ("Probabilidade de Prejuízo", formatar_percentual(prob), "negative" if prob > 0 else "positive"),
+        ]), unsafe_allow_html=True)
+        st.caption(f"{sim['n_cenarios']:,} cenários simulados.".replace(",", "."))
+
+execucao.marcar('simulacao')
+
+# --- Análise de Sensibilidade ---
+with st.expander("6. Análise de Sensibilidade"):
+    sv1, sv2 = st.columns(2)
+    with sv1:
+        var_preco_grade = st.slider("Faixa de Preço da Grade (±%)", min_value=5, max_value=90, value=50, step=5, key="sens_var_preco")
+    with sv2:
+        var_tornado = st.slider("Variação do Tornado (±%)", min_value=1, max_value=50, value=10, step=1, key="sens_var_tornado")
+
+    if st.session_state.preco_medio_vendas > 0:
+        coeficientes = decompor_margem(
+            st.session_state.area_terreno,
+            st.session_state.relacao_privativa_construida,
+            st.session_state.custo_direto_construcao_m2,
+            st.session_state.custos_indiretos_padrao['%'].sum(),
+            sum(custos_indiretos_monetarios.values())
+        )
+        indices, precos = faixas_grade(st.session_state.preco_medio_vendas, 200, var_preco_grade)
+        st.plotly_chart(
+            plotar_mapa_sensibilidade(indices, precos, grade_margem(coeficientes, indices, precos)),
+            use_container_width=True
+        )
+
+        tornado = analisar_tornado(
+            st.session_state.area_terreno,
+            st.session_state.indice_aproveitamento,
+            st.session_state.relacao_privativa_construida,
+            st.session_state.preco_medio_vendas,
+            st.session_state.custo_direto_construcao_m2,
+            dict(zip(st.session_state.custos_indiretos_padrao['Custo'], st.session_state.custos_indiretos_padrao['%'])),
+            custos_indiretos_monetarios,
+            var_tornado
+        )
+        st.plotly_chart(plotar_tornado(tornado), use_container_width=True)
+    else:
+        st.info("Informe o preço médio de vendas para visualizar a sensibilidade.")
+
+execucao.marcar('sensibilidade')
+
+# --- Fluxo de Caixa ---
+# Séries de índices (INCC, IGP-M, CUB...) de VIABILIDADE_INDICES, abertas uma vez por processo
+@st.cache_resource
+def get_base_indices():
+    fontes = fontes_configuradas()
+    return abrir_indices(fontes) if fontes else None
 
 st.markdown("---")
-st.header("Resumo Financeiro")
-f1, f2, f3 = st.columns(3)
-with f1:
-    st.markdown(f"""
-        <div class="card neutral">
-          <div class="card-title">V.G.V.</div>
-          <div class="card-metric">{format_currency(resultados['vgv'], 'BRL', locale='pt_BR')}</div>
-        </div>
-    """, unsafe_allow_html=True)
-with f2:
-    neg = resultados['resultado_negocio']
-    cls = "positive" if neg > 0 else "negative" if neg < 0 else "neutral"
-    st.markdown(f"""
-        <div class="card {cls}">
-          <div class="card-title">Resultado do Negócio</div>
-          <div class="card-metric">{format_currency(neg, 'BRL', locale='pt_BR')}</div>
-        </div>
-    """, unsafe_allow_html=True)
-with f3:
-    mg = resultados['margem_lucro']
-    cls = "positive" if mg > 0 else "negative" if mg < 0 else "neutral"
-    st.markdown(f"""
-        <div class="card {cls}">
-          <div class="card-title">Margem de Lucro</div>
-          <div class="card-metric">{format_decimal(mg, locale='pt_BR')}%</div>
-        </div>
-    """, unsafe_allow_html=True)
+st.header("Fluxo de Caixa")
+with st.expander("7. Prazos e Taxa de Desconto"):
+    fc1, fc2 = st.columns(2)
+    with fc1:
+        duracao_projeto = st.number_input("Duração do Projeto (meses)", min_value=1, max_value=240, step=1, key="duracao_projeto")
+    with fc2:
+        taxa_desconto = st.number_input("Taxa de Desconto (% a.a.)", min_value=0.0, step=0.5, key="taxa_desconto", format="%.2f")
+
+    fc3, fc4, fc5, fc6 = st.columns(4)
+    with fc3:
+        inicio_obra = st.number_input("Início da Obra (mês)", min_value=0, step=1, key="inicio_obra")
+    with fc4:
+        duracao_obra = st.number_input("Duração da Obra (meses)", min_value=1, step=1, key="duracao_obra")
+    with fc5:
+        inicio_vendas = st.number_input("Início das Vendas (mês)", min_value=0, step=1, key="inicio_vendas")
+    with fc6:
+        duracao_vendas = st.number_input("Duração das Vendas (meses)", min_value=1, step=1, key="duracao_vendas")
+
+    base_indices = get_base_indices()
+    reajustar = False
+    if base_indices is None:
+        st.caption("Para reajustar custos e preços por INCC, IGP-M ou CUB, informe os arquivos de índices em VIABILIDADE_INDICES.")
+    else:
+        reajustar = st.checkbox("Reajustar custos e preços pelos índices", key="reajuste_ativo")
+        if reajustar:
+            mes_atual = mes_texto(date.today().year * 12 + date.today().month - 1)
+            ri1, ri2, ri3, ri4 = st.columns(4)
+            with ri1:
+                indice_custos = st.selectbox("Índice dos Custos Diretos", base_indices.indices, key="indice_custos",
+                                             index=base_indices.indices.index('INCC') if 'INCC' in base_indices.indices else 0)
+            with ri2:
+                indice_precos = st.selectbox("Índice dos Preços de Venda", ["Nenhum"] + base_indices.indices, key="indice_precos")
+            with ri3:
+                data_base = st.text_input("Data-base dos Valores (AAAA-MM)", value=mes_atual, key="data_base_reajuste")
+            with ri4:
+                mes_inicio = st.text_input("Mês 1 do Projeto (AAAA-MM)", value=mes_atual, key="mes_inicio_reajuste")
+            st.caption(
+                "Após o fim de cada série, o índice segue a média dos últimos 12 meses. "
+                + " · ".join(f"{nome}: {' a '.join(base_indices.periodo(nome))}" for nome in base_indices.indices)
+            )
+
+percentual_indiretos = st.session_state.custos_indiretos_padrao['%'].sum()
+total_monetarios = sum(custos_indiretos_monetarios.values())
+fluxo = gerar_fluxo_caixa(
+    resultados['vgv'],
+    resultados['custo_direto_total'],
+    percentual_indiretos,
+    total_monetarios,
+    int(st.session_state.duracao_projeto),
+    curva_vendas={'inicio': int(inicio_vendas), 'duracao': int(duracao_vendas)},
+    curva_obra={'inicio': int(inicio_obra), 'duracao': int(duracao_obra)}
+)
+indicadores = {k: v[0] for k, v in calcular_indicadores(fluxo['fluxo'], st.session_state.taxa_desconto).items()}
+
+payback = indicadores['payback']
+st.markdown(renderizar_cards([
+    ("VPL", formatar_moeda(indicadores['vpl']), classe_sinal(indicadores['vpl'])),
+    ("TIR (a.a.)", formatar_percentual(indicadores['tir_anual']), "neutral"),
+    ("Exposição Máxima", formatar_moeda(indicadores['exposicao_maxima']), "neutral"),
+    ("Payback", f'{int(payback)} meses' if payback == payback else '—', "neutral"),
+]), unsafe_allow_html=True)
+
+if reajustar:
+    try:
+        fatores_custos, fatores_receitas = fatores_do_projeto(
+            base_indices,
+            int(st.session_state.duracao_projeto),
+            mes_ordinal(data_base),
+            mes_ordinal(mes_inicio),
+            indice_custos,
+            None if indice_precos == "Nenhum" else indice_precos
+        )
+    except ValueError as e:
+        st.error(f"Reajuste: {e}")
+    else:
+        # Reaproveita as curvas do fluxo nominal; só os fatores são aplicados
+        fluxo = reajustar_fluxo(
+            fluxo, percentual_indiretos, total_monetarios, fatores_custos[0], fatores_receitas[0]
+        )
+        reajustados = {k: v[0] for k, v in calcular_indicadores(fluxo['fluxo'], st.session_state.taxa_desconto).items()}
+        vgv_reajustado = fluxo['receitas'].sum()
+        resultado_reajustado = vgv_reajustado - fluxo['custos'].sum()
+        margem_reajustada = resultado_reajustado / vgv_reajustado * 100 if vgv_reajustado > 0 else 0.0
+
+        st.subheader("Com Reajuste")
+        st.markdown(renderizar_cards([
+            ("V.G.V. Reajustado", formatar_moeda(vgv_reajustado), "neutral"),
+            ("Resultado Reajustado", formatar_moeda(resultado_reajustado), classe_sinal(resultado_reajustado)),
+            ("Margem Reajustada", formatar_percentual(margem_reajustada), classe_sinal(margem_reajustada)),
+            ("VPL", formatar_moeda(reajustados['vpl']), classe_sinal(reajustados['vpl'])),
+            ("TIR (a.a.)", formatar_percentual(reajustados['tir_anual']), "neutral"),
+        ]), unsafe_allow_html=True)
+        projetados = base_indices.meses_projetados(indice_custos, mes_ordinal(mes_inicio), int(st.session_state.duracao_projeto))[0]
+        if projetados:
+            st.caption(f"{projetados} mês(es) do fluxo usam valores projetados de {indice_custos}.")
+
+st.plotly_chart(plotar_fluxo_de_caixa(fluxo_caixa_df(fluxo)), use_container_width=True)
+
+execucao.marcar('fluxo_caixa')
+
+# --- Otimizador ---
+# Limites dos widgets em que a solução pode ser aplicada diretamente
+LIMITES_APLICAVEIS = {
+    'preco_medio_vendas': (0.0, float('inf')),
+    'indice_aproveitamento': (1.00, 4.00),
+    'relacao_privativa_construida': (0.00, 1.00),
+    'custo_direto_construcao_m2': (0.0, float('inf')),
+}
+
+def aplicar_solucao(variavel, valor):
+    """Callback: grava a solução no widget antes do próximo rerun."""
+    st.session_state[variavel] = valor
 
 st.markdown("---")
-st.header("Resumo do Projeto")
-p1, p2, p3, p4, p5 = st.columns(5)
-with p1:
-    st.markdown(f"""
-        <div class="card neutral">
-          <div class="card-title">Área do Terreno</div>
-          <div class="card-metric">{format_decimal(resultados['area_terreno'], locale='pt_BR')} m²</div>
-        </div>
-    """, unsafe_allow_html=True)
-with p2:
-    st.markdown(f"""
-        <div class="card neutral">
-          <div class="card-title">Índice de Aproveitamento</div>
-          <div class="card-metric">{format_decimal(st.session_state.indice_aproveitamento, locale='pt_BR')}</div>
-        </div>
-    """, unsafe_allow_html=True)
-with p3:
-    st.markdown(f"""
-        <div class="card neutral">
-          <div class="card-title">Área Construída</div>
-          <div class="card-metric">{format_decimal(resultados['area_construida'], locale='pt_BR')} m²</div>
-        </div>
-    """, unsafe_allow_html=True)
-with p4:
-    st.markdown(f"""
-        <div class="card neutral">
-          <div class="card-title">Área Privativa</div>
-          <div class="card-metric">{format_decimal(resultados['area_privativa'], locale='pt_BR')} m²</div>
-        </div>
-    """, unsafe_allow_html=True)
-with p5:
-    st.markdown(f"""
-        <div class="card neutral">
-          <div class="card-title">Relação AP/AC</div>
-          <div class="card-metric">{format_decimal(st.session_state.relacao_privativa_construida, locale='pt_BR')}</div>
-        </div>
-    """, unsafe_allow_html=True)
+st.header("Otimizador")
+with st.expander("8. Metas de Margem e TIR"):
+    o1, o2 = st.columns(2)
+    with o1:
+        variavel_otim = st.selectbox("Resolver para", options=list(VARIAVEIS), format_func=VARIAVEIS.get, key="otim_variavel")
+    with o2:
+        margem_alvo = st.number_input("Margem-alvo (%)", min_value=-100.0, max_value=99.0, value=20.0, step=0.5, key="otim_margem")
+
+    total_perc = st.session_state.custos_indiretos_padrao['%'].sum()
+    total_monet = sum(custos_indiretos_monetarios.values())
+    solucao = float(resolver_margem(
+        variavel_otim,
+        margem_alvo,
+        st.session_state.area_terreno,
+        st.session_state.indice_aproveitamento,
+        st.session_state.relacao_privativa_construida,
+        st.session_state.preco_medio_vendas,
+        st.session_state.custo_direto_construcao_m2,
+        total_perc,
+        total_monet
+    ))
+
+    if solucao != solucao:
+        st.warning("Meta inatingível com as demais entradas.")
+    else:
+        monetaria = variavel_otim in ('preco_medio_vendas', 'custo_direto_construcao_m2', 'preco_terreno')
+        texto = formatar_moeda(solucao) if monetaria else formatar_decimal(round(solucao, 4))
+        st.markdown(renderizar_cards([(VARIAVEIS[variavel_otim], texto, "neutral")]), unsafe_allow_html=True)
+
+        if variavel_otim in LIMITES_APLICAVEIS:
+            minimo, maximo = LIMITES_APLICAVEIS[variavel_otim]
+            if minimo <= solucao <= maximo:
+                st.button("Aplicar ao projeto", on_click=aplicar_solucao, args=(variavel_otim, round(solucao, 2)))
+            else:
+                st.caption("A solução está fora da faixa aceita pelo campo e não pode ser aplicada.")
+
+    tir_alvo = st.number_input("TIR-alvo (% a.a.)", min_value=0.0, value=20.0, step=1.0, key="otim_tir")
+    entradas_tir = (
+        tir_alvo,
+        st.session_state.area_terreno,
+        st.session_state.indice_aproveitamento,
+        st.session_state.relacao_privativa_construida,
+        st.session_state.custo_direto_construcao_m2,
+        total_perc,
+        total_monet,
+        int(st.session_state.duracao_projeto),
+        {'inicio': int(inicio_vendas), 'duracao': int(duracao_vendas)},
+        {'inicio': int(inicio_obra), 'duracao': int(duracao_obra)},
+    )
+    # O expander roda mesmo fechado: o preço só é recalculado quando as entradas mudam
+    preco_tir = cache_resultados.obter_ou_calcular(
+        chave_entradas('preco_tir', *entradas_tir),
+        lambda: float(preco_minimo_para_tir(*entradas_tir))
+    )
+    if preco_tir != preco_tir:
+        st.warning("Nenhum preço de vendas atinge essa TIR.")
+    else:
+        st.write(f"Preço médio de vendas mínimo para a TIR-alvo: **{formatar_moeda(preco_tir)}/m²**")
+
+execucao.marcar('otimizador')
+execucao.finalizar()
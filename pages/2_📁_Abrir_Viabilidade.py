@@ -1,6 +1,10 @@
 import streamlit as st
-import pandas as pd
-from sqlalchemy import text
+
+from src.banco_dados import (
+    engine_da_configuracao, listar_versoes, carregar_versao, diferenca_versoes
+)
+from src.persistencia import obter_listagem, pre_carregar, dados_pre_carregados
+from src.data_model import ler_registro, entradas_para_sessao
 
 # --- Configuração da Página e Conexão com o Banco ---
 st.set_page_config(
@@ -9,44 +13,111 @@ st.set_page_config(
     layout="wide"
 )
 
-# Estabelece a conexão com o banco de dados
-conn = st.connection("postgresql", type="sql")
+# Usa o mesmo engine (pool de conexões) compartilhado com as demais páginas
+try:
+    engine = engine_da_configuracao(st.secrets["connections"]["postgresql"])
+except KeyError:
+    st.error("Não foi possível obter a URL de conexão em secrets.toml.")
+    st.stop()
 
 st.title("📁 Abrir Viabilidade Existente")
 st.write("Selecione uma viabilidade da lista abaixo para carregar os dados.")
 
-# Carrega a lista de viabilidades do banco de dados
-# O "@st.cache_data" garante que a query só rode uma vez
-# a menos que os parâmetros mudem.
-@st.cache_data(ttl=600)  # Cache por 10 minutos
-def get_viabilidades_from_db():
-    return conn.query(text("SELECT id, nome_terreno, data_criacao FROM viabilidades;"))
+# Busca e paginação feitas no banco: cada página traz no máximo TAMANHO_PAGINA itens
+# As páginas ficam em cache no processo, sem prazo de validade: cada gravação
+# (inclusive de outros servidores, via LISTEN/NOTIFY no PostgreSQL) atualiza
+# as páginas afetadas, e um projeto salvo aparece na lista imediatamente.
+def get_viabilidades_from_db(termo, modo, cursor):
+    return obter_listagem(engine).pagina(termo, modo, cursor)
+
+b1, b2 = st.columns([3, 1])
+with b1:
+    termo_busca = st.text_input("Buscar pelo nome do terreno", key="busca_viabilidade")
+with b2:
+    modo_busca = st.radio(
+        "Tipo de busca",
+        options=["prefixo", "contem"],
+        format_func=lambda m: "Começa com" if m == "prefixo" else "Contém",
+        horizontal=True,
+        key="modo_busca_viabilidade"
+    )
+
+# Pilha de cursores das páginas visitadas; reinicia quando a busca muda
+if st.session_state.get('busca_anterior') != (termo_busca, modo_busca):
+    st.session_state.busca_anterior = (termo_busca, modo_busca)
+    st.session_state.cursores_paginas = [None]
+cursores = st.session_state.cursores_paginas
 
-viabilidades_salvas = get_viabilidades_from_db()
+viabilidades_salvas, proximo_cursor = get_viabilidades_from_db(termo_busca, modo_busca, cursores[-1])
 
-if viabilidades_salvas.empty:
-    st.info("Nenhuma viabilidade salva ainda. Crie uma na página 'Análise de Viabilidade Imobiliária'.")
+if not viabilidades_salvas and len(cursores) == 1:
+    if termo_busca:
+        st.info("Nenhuma viabilidade encontrada para a busca.")
+    else:
+        st.info("Nenhuma viabilidade salva ainda. Crie uma na página 'Análise de Viabilidade Imobiliária'.")
 else:
-    nomes_viabilidades = viabilidades_salvas['nome_terreno'].tolist()
-    
+    nomes_viabilidades = {v['id']: v['nome_terreno'] for v in viabilidades_salvas}
+
     viabilidade_selecionada = st.selectbox(
         "Escolha uma viabilidade para carregar:",
-        options=nomes_viabilidades,
+        options=list(nomes_viabilidades),
+        format_func=nomes_viabilidades.get,
         index=None,
         placeholder="Selecione um projeto..."
     )
 
+    # Histórico do projeto selecionado; sem escolha, carrega a versão atual
+    versao_selecionada = None
+    if viabilidade_selecionada is not None:
+        # Começa a ler os dados do projeto já na seleção, antes do clique em "Carregar"
+        st.session_state.pre_carga = pre_carregar(
+            engine, viabilidade_selecionada, st.session_state.get('pre_carga')
+        )
+        versoes = [v['versao'] for v in listar_versoes(engine, viabilidade_selecionada)]
+        if len(versoes) > 1:
+            versao_selecionada = st.selectbox(
+                "Versão:",
+                options=versoes,
+                format_func=lambda v: f"Versão {v}" + (" (atual)" if v == versoes[0] else ""),
+            )
+            with st.expander("Comparar versões"):
+                d1, d2 = st.columns(2)
+                with d1:
+                    versao_a = st.selectbox("De", options=versoes, index=1, key="diff_versao_a")
+                with d2:
+                    versao_b = st.selectbox("Para", options=versoes, index=0, key="diff_versao_b")
+                st.json(diferenca_versoes(engine, viabilidade_selecionada, versao_a, versao_b))
+
+    n1, n2, n3 = st.columns([1, 1, 4])
+    with n1:
+        if st.button("◀ Anterior", disabled=len(cursores) == 1):
+            cursores.pop()
+            st.rerun()
+    with n2:
+        if st.button("Próxima ▶", disabled=proximo_cursor is None):
+            cursores.append(proximo_cursor)
+            st.rerun()
+    with n3:
+        st.caption(f"Página {len(cursores)}")
+
     if st.button("Carregar Viabilidade", type="primary"):
-        if viabilidade_selecionada:
-            # Busca a viabilidade completa pelo nome e carrega o JSON
-            query = text("SELECT dados FROM viabilidades WHERE nome_terreno = :nome;")
-            dados_viabilidade = conn.query(query, params={"nome": viabilidade_selecionada}).iloc[0]['dados']
-            
-            # Atualiza o estado da sessão com os dados do projeto carregado
-            for key, value in dados_viabilidade.items():
+        if viabilidade_selecionada is not None:
+            # Usa os dados pré-carregados na seleção (ou reconstrói a versão escolhida)
+            if versao_selecionada is None or versao_selecionada == versoes[0]:
+                dados_viabilidade = dados_pre_carregados(engine, st.session_state.pre_carga)
+            else:
+                dados_viabilidade = carregar_versao(engine, viabilidade_selecionada, versao_selecionada)
+
+            # Restaura todas as entradas na sessão; os resultados salvos são
+            # reaproveitados até que alguma entrada mude
+            registro = ler_registro(dados_viabilidade)
+            for key, value in entradas_para_sessao(registro['entradas']).items():
                 st.session_state[key] = value
-            
-            st.success(f"Viabilidade '{viabilidade_selecionada}' carregada com sucesso!")
+            st.session_state.projeto_carregado = registro
+            # Descarta edições pendentes da tabela de custos do projeto anterior
+            st.session_state.pop('data_editor_custos', None)
+
+            st.success(f"Viabilidade '{nomes_viabilidades[viabilidade_selecionada]}' carregada com sucesso!")
             st.info("Volte para a página 'Análise de Viabilidade Imobiliária' para ver os dados e resultados atualizados.")
         else:
             st.warning("Por favor, selecione uma viabilidade para carregar.")
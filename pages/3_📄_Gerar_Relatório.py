@@ -1,5 +1,10 @@
+import os
+
 import streamlit as st
 
+from src.data_model import entradas_da_sessao
+from src.relatorios import gerar_relatorio_async
+
 st.set_page_config(
     page_title="Gerar Relatório PDF",
     page_icon="📄",
@@ -7,16 +12,55 @@ st.set_page_config(
 )
 
 st.title("📄 Gerar Relatório em PDF")
-st.write("Esta página é dedicada à geração e exportação de relatórios.")
+st.write("Gera um PDF com os resultados, a tabela de custos e o fluxo de caixa do projeto atual.")
 
-st.info("Esta é uma funcionalidade futura. O botão abaixo é apenas um placeholder.")
+entradas = entradas_da_sessao(st.session_state)
 
-st.button("Gerar e Baixar Relatório (PDF)")
+if not entradas['nome_terreno']:
+    st.warning("Nenhum dado de viabilidade disponível na sessão. Por favor, crie ou carregue um projeto primeiro.")
+    st.stop()
 
-st.write("---")
+st.subheader(f"Projeto: {entradas['nome_terreno']}")
 
-if 'resultados_viabilidade' in st.session_state:
-    st.subheader("Dados Atuais da Viabilidade")
-    st.json(st.session_state['resultados_viabilidade'])
-else:
-    st.warning("Nenhum dado de viabilidade disponível na sessão. Por favor, crie ou carregue um projeto primeiro.")
+
+def mostrar_relatorio(acompanhando: bool):
+    """Situação do relatório pedido nesta sessão e, quando pronto, o download."""
+    futuro = st.session_state.get('relatorio_futuro')
+    if futuro is None:
+        return
+    if not futuro.done():
+        st.info("Gerando o relatório em segundo plano...")
+        return
+    if acompanhando:
+        # Pronto: uma execução completa da página encerra a atualização periódica
+        st.rerun()
+
+    if futuro.exception() is not None:
+        st.error(f"Erro ao gerar o relatório: {futuro.exception()}")
+    else:
+        caminho = futuro.result()
+        try:
+            with open(caminho, 'rb') as arquivo:
+                pdf = arquivo.read()
+        except FileNotFoundError:
+            # Outra sessão apagou o PDF ao limitar o cache: gera de novo
+            del st.session_state['relatorio_futuro']
+            st.session_state.relatorio_futuro = gerar_relatorio_async(entradas)
+            st.rerun()
+        st.download_button(
+            "Baixar Relatório (PDF)",
+            data=pdf,
+            file_name=f"viabilidade_{entradas['nome_terreno']}.pdf",
+            mime="application/pdf"
+        )
+        st.caption(f"Arquivo em cache: {os.path.basename(caminho)}")
+
+
+# A renderização roda no pool de processos; a página só acompanha o Future
+if st.button("Gerar Relatório (PDF)", type="primary"):
+    st.session_state.relatorio_futuro = gerar_relatorio_async(entradas)
+
+# Enquanto o relatório não fica pronto, só este trecho é reexecutado periodicamente
+futuro = st.session_state.get('relatorio_futuro')
+pendente = futuro is not None and not futuro.done()
+st.fragment(run_every=1.0 if pendente else None)(mostrar_relatorio)(pendente)
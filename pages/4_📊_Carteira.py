@@ -0,0 +1,96 @@
+import streamlit as st
+
+from src.banco_dados import engine_da_configuracao
+from src.formatacao import formatar_moeda, formatar_percentual
+from src.carteira import (
+    LIMITE_FLUXOS, atualizar_resumos, contar_pendentes, distribuicao_margens, fluxos_carteira,
+    ranking_resultado_m2, totais_carteira
+)
+from src.visualizacoes import plotar_distribuicao_margens, plotar_faixas_fluxo, plotar_fluxos_carteira
+
+st.set_page_config(
+    page_title="Carteira de Projetos",
+    page_icon="📊",
+    layout="wide"
+)
+
+# Usa o mesmo engine (pool de conexões) compartilhado com as demais páginas
+try:
+    engine = engine_da_configuracao(st.secrets["connections"]["postgresql"])
+except KeyError:
+    st.error("Não foi possível obter a URL de conexão em secrets.toml.")
+    st.stop()
+
+st.title("📊 Carteira de Projetos")
+st.write("Indicadores agregados de todas as viabilidades salvas.")
+
+# As consultas leem só a tabela de resumo (atualizada a cada gravação); a
+# contagem dos projetos sem resumo fica no mesmo cache e é limpa com ele
+@st.cache_data(ttl=30)
+def get_painel_carteira():
+    return {
+        'pendentes': contar_pendentes(engine),
+        'totais': totais_carteira(engine),
+        'distribuicao': distribuicao_margens(engine),
+        'melhores': ranking_resultado_m2(engine, limite=20),
+        'piores': ranking_resultado_m2(engine, limite=20, crescente=True),
+    }
+
+@st.cache_data(ttl=30)
+def get_fluxos_carteira():
+    return fluxos_carteira(engine)
+
+painel = get_painel_carteira()
+totais = painel['totais']
+
+if painel['pendentes']:
+    st.warning(f"{painel['pendentes']} projeto(s) ainda sem resumo não entram nos indicadores.")
+    if st.button("Atualizar resumos"):
+        with st.spinner("Calculando resumos..."):
+            atualizar_resumos(engine)
+        get_painel_carteira.clear()
+        st.rerun()
+
+if not totais['projetos']:
+    st.info("Nenhuma viabilidade salva ainda.")
+    st.stop()
+
+t1, t2, t3, t4, t5 = st.columns(5)
+t1.metric("Projetos", f"{totais['projetos']:,}".replace(",", "."))
+t2.metric("V.G.V. Total", formatar_moeda(totais['vgv']))
+t3.metric("Resultado Total", formatar_moeda(totais['resultado_negocio']))
+t4.metric("Exposição Total", formatar_moeda(totais['exposicao_maxima']))
+t5.metric("Margem Média", formatar_percentual(totais['margem_media'] or 0))
+
+st.plotly_chart(plotar_distribuicao_margens(painel['distribuicao']), use_container_width=True)
+
+with st.expander(f"Fluxos de caixa acumulados (até {LIMITE_FLUXOS} projetos mais recentes)"):
+    nomes, fluxos = get_fluxos_carteira()
+    exibicao = st.radio("Exibir", ["Projetos sobrepostos", "Faixas de percentis"], horizontal=True, key="exibicao_fluxos")
+    if exibicao == "Faixas de percentis":
+        grafico = plotar_faixas_fluxo(fluxos, titulo="Faixas do Fluxo de Caixa Acumulado da Carteira")
+    else:
+        grafico = plotar_fluxos_carteira(fluxos, nomes)
+    st.plotly_chart(grafico, use_container_width=True)
+
+colunas = {
+    'nome_terreno': "Terreno",
+    'resultado_m2': "Resultado (R$/m² de terreno)",
+    'resultado_negocio': "Resultado (R$)",
+    'margem_lucro': "Margem (%)",
+    'vgv': "V.G.V. (R$)",
+    'exposicao_maxima': "Exposição Máxima (R$)",
+}
+
+r1, r2 = st.columns(2)
+for coluna, titulo, linhas in (
+    (r1, "Melhores Resultados por m²", painel['melhores']),
+    (r2, "Piores Resultados por m²", painel['piores']),
+):
+    with coluna:
+        st.subheader(titulo)
+        st.dataframe(
+            [{rotulo: linha[campo] for campo, rotulo in colunas.items()} for linha in linhas],
+            hide_index=True,
+            use_container_width=True
+        )
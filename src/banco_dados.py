@@ -0,0 +1,441 @@
+# src/banco_dados.py
+
+import logging
+import threading
+
+from sqlalchemy import (
+    JSON, Column, DateTime, Float, ForeignKey, Index, Integer, MetaData, String,
+    Table, UniqueConstraint, create_engine, func, literal, select, text, tuple_
+)
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from src.eventos import Alteracao, notificar_alteracoes, publicar_alteracoes
+from src.metricas import instrumentar_engine
+from src.versionamento import calcular_delta, reconstruir, tipo_da_versao
+
+# Configuração padrão do pool (pode ser sobrescrita em [connections.postgresql])
+POOL_PADRAO = {
+    'pool_size': 5,
+    'max_overflow': 10,
+    'pool_pre_ping': True,
+    'pool_recycle': 1800,
+}
+
+# No SQLite as datas são texto; usar o mesmo formato de CURRENT_TIMESTAMP (sem
+# microssegundos) mantém a comparação do cursor de paginação coerente entre
+# linhas gravadas pelo default do banco e pelo Python.
+DATA_CRIACAO = DateTime().with_variant(
+    sqlite.DATETIME(
+        storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d",
+        regexp=r"(\d+)-(\d+)-(\d+) (\d+):(\d+):(\d+)"
+    ),
+    'sqlite'
+)
+
+metadata = MetaData()
+
+viabilidades = Table(
+    'viabilidades',
+    metadata,
+    Column('id', Integer, primary_key=True),
+    Column('nome_terreno', String(255), unique=True),
+    Column('dados', JSON().with_variant(JSONB, 'postgresql')),
+    Column('data_criacao', DATA_CRIACAO, server_default=func.current_timestamp()),
+)
+
+# Histórico: `viabilidades.dados` guarda a versão mais recente; cada versão
+# anterior é um delta em relação à anterior, com snapshots periódicos.
+viabilidades_versoes = Table(
+    'viabilidades_versoes',
+    metadata,
+    Column('id', Integer, primary_key=True),
+    Column('viabilidade_id', Integer, ForeignKey('viabilidades.id', ondelete='CASCADE'), nullable=False),
+    Column('versao', Integer, nullable=False),
+    Column('tipo', String(10), nullable=False),
+    Column('conteudo', JSON().with_variant(JSONB, 'postgresql')),
+    Column('data_criacao', DateTime, server_default=func.current_timestamp()),
+    UniqueConstraint('viabilidade_id', 'versao'),
+)
+
+# Resumo numérico de cada projeto para os painéis da carteira. Atualizado na
+# mesma transação de cada gravação, evita ler os blobs `dados` nas agregações.
+viabilidades_resumo = Table(
+    'viabilidades_resumo',
+    metadata,
+    Column('viabilidade_id', Integer, ForeignKey('viabilidades.id', ondelete='CASCADE'), primary_key=True),
+    Column('nome_terreno', String(255)),
+    Column('area_terreno', Float),
+    Column('vgv', Float),
+    Column('custo_total', Float),
+    Column('resultado_negocio', Float),
+    Column('margem_lucro', Float),
+    Column('resultado_m2', Float),
+    Column('exposicao_maxima', Float),
+    Column('atualizado_em', DateTime, server_default=func.current_timestamp()),
+    Index('ix_viabilidades_resumo_resultado_m2', 'resultado_m2'),
+    Index('ix_viabilidades_resumo_margem_lucro', 'margem_lucro'),
+)
+
+# Índices criados fora do metadata para valerem também em tabelas já existentes.
+# A listagem é paginada por (data_criacao, id); a busca usa o nome em minúsculas
+# (prefixo) e, no PostgreSQL, um índice de trigramas (trecho do nome).
+INDICES = {
+    'comum': [
+        "CREATE INDEX IF NOT EXISTS ix_viabilidades_data_criacao_id "
+        "ON viabilidades (data_criacao DESC, id DESC)",
+    ],
+    'postgresql': [
+        "CREATE INDEX IF NOT EXISTS ix_viabilidades_nome_prefixo "
+        "ON viabilidades (lower(nome_terreno) text_pattern_ops)",
+    ],
+    'sqlite': [
+        "CREATE INDEX IF NOT EXISTS ix_viabilidades_nome_prefixo "
+        "ON viabilidades (lower(nome_terreno))",
+    ],
+}
+
+INDICE_TRIGRAMA = (
+    "CREATE INDEX IF NOT EXISTS ix_viabilidades_nome_trgm "
+    "ON viabilidades USING gin (nome_terreno gin_trgm_ops)"
+)
+
+TAMANHO_PAGINA = 50
+
+_log = logging.getLogger(__name__)
+
+_engines = {}
+_lock = threading.Lock()
+
+
+# --- Engine e schema ---
+
+def criar_schema(engine):
+    """Cria as tabelas e os índices que ainda não existem."""
+    metadata.create_all(engine, checkfirst=True)
+    dialeto = engine.dialect.name
+    with engine.begin() as conn:
+        for ddl in INDICES['comum'] + INDICES.get(dialeto, []):
+            conn.execute(text(ddl))
+
+    if dialeto == 'postgresql':
+        # pg_trgm pode não estar disponível (ou exigir permissão de superusuário);
+        # sem ele a busca por trecho continua funcionando, só que sem índice.
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        except (ProgrammingError, OperationalError) as erro:
+            # Permissão negada ou extensão não instalada; queda de conexão não
+            if erro.connection_invalidated:
+                raise
+            _log.warning("Extensão pg_trgm indisponível; busca por trecho sem índice: %s", erro.orig)
+        else:
+            with engine.begin() as conn:
+                conn.execute(text(INDICE_TRIGRAMA))
+
+
+def obter_engine(url: str, **config):
+    """
+    Retorna o engine compartilhado do processo para `url`.
+
+    O engine (e seu pool de conexões) é criado na primeira chamada e
+    reaproveitado por todas as páginas e sessões; o schema é criado nesse
+    mesmo momento, uma única vez por processo.
+
+    Args:
+        url: URL de conexão do SQLAlchemy.
+        **config: Opções do pool (`pool_size`, `max_overflow`,
+            `pool_pre_ping`, `pool_recycle`) que substituem `POOL_PADRAO`.
+    """
+    opcoes = {**POOL_PADRAO, **config}
+    if url.startswith('sqlite'):
+        # SQLite não usa QueuePool configurável em todos os modos
+        opcoes.pop('pool_size')
+        opcoes.pop('max_overflow')
+
+    chave = (url, tuple(sorted(opcoes.items())))
+    engine = _engines.get(chave)
+    if engine is not None:
+        return engine
+
+    with _lock:
+        engine = _engines.get(chave)
+        if engine is None:
+            engine = create_engine(url, **opcoes)
+            instrumentar_engine(engine)
+            criar_schema(engine)
+            _engines[chave] = engine
+    return engine
+
+
+def engine_da_configuracao(config):
+    """
+    Engine compartilhado a partir de um mapeamento como
+    `st.secrets["connections"]["postgresql"]`.
+
+    Além de `url`, lê as chaves opcionais de `POOL_PADRAO`.
+    """
+    opcoes = {k: config[k] for k in POOL_PADRAO if k in config}
+    return obter_engine(config['url'], **opcoes)
+
+
+# --- Acesso aos dados ---
+
+def _escapar_like(termo: str) -> str:
+    return termo.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def listar_viabilidades(
+    engine,
+    termo: str = None,
+    modo: str = 'prefixo',
+    apos: tuple = None,
+    limite: int = TAMANHO_PAGINA
+) -> tuple:
+    """
+    Lista uma página de viabilidades, das mais recentes para as mais antigas.
+
+    A paginação é por chave (keyset): `apos` é o cursor `(data_criacao, id)`
+    do último item da página anterior, de modo que o custo de cada página
+    não cresce com o tamanho da tabela.
+
+    Args:
+        engine: Engine do SQLAlchemy.
+        termo: Texto buscado em `nome_terreno` (sem distinção de maiúsculas).
+        modo: 'prefixo' (nome começa com o termo) ou 'contem' (trecho do nome).
+        apos: Cursor retornado pela página anterior.
+        limite: Itens por página.
+
+    Returns:
+        Tupla (itens, proximo_cursor); `proximo_cursor` é None na última página.
+    """
+    c = viabilidades.c
+    consulta = select(c.id, c.nome_terreno, c.data_criacao)
+
+    if termo:
+        padrao = _escapar_like(termo.lower())
+        if modo == 'contem':
+            consulta = consulta.where(c.nome_terreno.ilike(f"%{padrao}%", escape='\\'))
+        else:
+            consulta = consulta.where(func.lower(c.nome_terreno).like(f"{padrao}%", escape='\\'))
+    if apos is not None:
+        # Comparação de linha (data, id) < cursor, usando o índice composto
+        cursor = tuple_(literal(apos[0], c.data_criacao.type), literal(apos[1], c.id.type))
+        consulta = consulta.where(tuple_(c.data_criacao, c.id) < cursor)
+
+    consulta = consulta.order_by(c.data_criacao.desc(), c.id.desc()).limit(limite + 1)
+
+    with engine.connect() as conn:
+        itens = [dict(linha._mapping) for linha in conn.execute(consulta)]
+
+    proximo = None
+    if len(itens) > limite:
+        itens = itens[:limite]
+        proximo = (itens[-1]['data_criacao'], itens[-1]['id'])
+    return itens, proximo
+
+
+def carregar_viabilidade(engine, id_viabilidade: int):
+    """Retorna o dicionário `dados` da viabilidade, ou None se não existir."""
+    consulta = select(viabilidades.c.dados).where(viabilidades.c.id == id_viabilidade)
+    with engine.connect() as conn:
+        return conn.execute(consulta).scalar_one_or_none()
+
+
+# --- Versões ---
+
+def _linha_versao(id_viabilidade: int, versao: int, anterior: dict, dados: dict) -> dict:
+    tipo = tipo_da_versao(versao)
+    conteudo = dados if tipo == 'snapshot' else calcular_delta(anterior, dados)
+    return {'viabilidade_id': id_viabilidade, 'versao': versao, 'tipo': tipo, 'conteudo': conteudo}
+
+
+def _gravar_versao(conn, id_viabilidade: int, versao: int, anterior: dict, dados: dict):
+    conn.execute(viabilidades_versoes.insert().values(
+        **_linha_versao(id_viabilidade, versao, anterior, dados)
+    ))
+
+
+def registrar_versoes(conn, gravados: list):
+    """
+    Acrescenta ao histórico os projetos gravados fora de `salvar_versao`.
+
+    Usado pela carga em massa, dentro da transação que reescreveu
+    `viabilidades.dados`, para que o histórico continue terminando no
+    conteúdo atual de cada projeto.
+
+    Args:
+        gravados: Tuplas (id, dados_anteriores, dados), com
+            `dados_anteriores` None para projetos recém-inseridos.
+    """
+    if not gravados:
+        return
+    v = viabilidades_versoes.c
+    ids = [id_viabilidade for id_viabilidade, _, _ in gravados]
+    ultimas = dict(conn.execute(
+        select(v.viabilidade_id, func.max(v.versao))
+        .where(v.viabilidade_id.in_(ids))
+        .group_by(v.viabilidade_id)
+    ).all())
+
+    linhas = []
+    for id_viabilidade, anterior, dados in gravados:
+        versao = ultimas.get(id_viabilidade, 0)
+        if anterior is not None and versao == 0:
+            # Projeto sem histórico: a versão 1 é o conteúdo anterior à carga
+            versao = 1
+            linhas.append(_linha_versao(id_viabilidade, versao, None, anterior))
+        linhas.append(_linha_versao(id_viabilidade, versao + 1, anterior, dados))
+    conn.execute(viabilidades_versoes.insert(), linhas)
+
+
+def _registros_versao(conn, id_viabilidade: int, versao: int = None) -> list:
+    # Último snapshot até `versao` (ou até a última versão) e os deltas seguintes
+    v = viabilidades_versoes.c
+    limite = [v.versao <= versao] if versao is not None else []
+    ultimo_snapshot = (
+        select(func.max(v.versao))
+        .where(v.viabilidade_id == id_viabilidade, v.tipo == 'snapshot', *limite)
+        .scalar_subquery()
+    )
+    consulta = (
+        select(v.versao, v.tipo, v.conteudo)
+        .where(v.viabilidade_id == id_viabilidade, v.versao >= ultimo_snapshot, *limite)
+        .order_by(v.versao)
+    )
+    return [dict(linha._mapping) for linha in conn.execute(consulta)]
+
+
+def _salvar_versao(conn, nome_terreno: str, dados: dict, alteracoes: list) -> dict:
+    c = viabilidades.c
+    atual = conn.execute(
+        select(c.id, c.dados).where(c.nome_terreno == nome_terreno).with_for_update()
+    ).first()
+
+    if atual is None:
+        resultado = conn.execute(
+            viabilidades.insert().values(nome_terreno=nome_terreno, dados=dados)
+            .return_defaults(c.data_criacao)
+        )
+        id_viabilidade = resultado.inserted_primary_key[0]
+        _gravar_versao(conn, id_viabilidade, 1, None, dados)
+        gravar_resumo(conn, id_viabilidade, nome_terreno, dados)
+        alteracoes.append(Alteracao(id_viabilidade, nome_terreno, resultado.returned_defaults.data_criacao, True))
+        return {'id': id_viabilidade, 'versao': 1, 'alterada': True}
+
+    id_viabilidade, anterior = atual
+    registros = _registros_versao(conn, id_viabilidade)
+    if not registros:
+        versao = 1
+        _gravar_versao(conn, id_viabilidade, versao, None, anterior)
+    else:
+        # O delta novo parte da última versão; se `dados` foi reescrito por
+        # fora do histórico, esse conteúdo entra antes como uma versão própria
+        versao = registros[-1]['versao']
+        ultima = reconstruir(registros)
+        if calcular_delta(ultima, anterior):
+            versao += 1
+            _gravar_versao(conn, id_viabilidade, versao, ultima, anterior)
+
+    if not calcular_delta(anterior, dados):
+        return {'id': id_viabilidade, 'versao': versao, 'alterada': False}
+
+    versao += 1
+    _gravar_versao(conn, id_viabilidade, versao, anterior, dados)
+    conn.execute(viabilidades.update().where(c.id == id_viabilidade).values(dados=dados))
+    gravar_resumo(conn, id_viabilidade, nome_terreno, dados)
+    alteracoes.append(Alteracao(id_viabilidade, nome_terreno))
+    return {'id': id_viabilidade, 'versao': versao, 'alterada': True}
+
+
+def salvar_versao(engine, nome_terreno: str, dados: dict) -> dict:
+    """
+    Salva `dados` como nova versão do projeto `nome_terreno`, criando-o se preciso.
+
+    Só o delta em relação à versão anterior é gravado no histórico (com um
+    snapshot completo a cada `INTERVALO_SNAPSHOT` versões), e nada é
+    gravado quando os dados não mudaram. Projetos sem histórico ganham a
+    versão 1 com o conteúdo atual, e um conteúdo atual que não confere com
+    a última versão (gravado por fora do histórico) vira uma versão antes
+    da nova.
+    O resumo da carteira é atualizado na mesma transação, e a alteração é
+    avisada aos caches (ver `src.eventos`) após o commit.
+
+    Returns:
+        Dicionário com `id`, `versao` e `alterada` (False se nada mudou).
+    """
+    alteracoes = []
+    with engine.begin() as conn:
+        resultado = _salvar_versao(conn, nome_terreno, dados, alteracoes)
+        notificar_alteracoes(conn, alteracoes)
+    publicar_alteracoes(engine, alteracoes)
+    return resultado
+
+
+def salvar_versoes(engine, itens) -> list:
+    """
+    Como `salvar_versao`, para vários projetos numa única transação.
+
+    Args:
+        itens: Sequência de (nome_terreno, dados), com nomes distintos.
+
+    Returns:
+        Os dicionários de `salvar_versao`, na ordem de `itens`. Se uma
+        gravação falhar, nenhuma do lote é confirmada.
+    """
+    alteracoes = []
+    with engine.begin() as conn:
+        resultados = [_salvar_versao(conn, nome, dados, alteracoes) for nome, dados in itens]
+        notificar_alteracoes(conn, alteracoes)
+    publicar_alteracoes(engine, alteracoes)
+    return resultados
+
+
+def listar_versoes(engine, id_viabilidade: int) -> list:
+    """Lista `versao`, `tipo` e `data_criacao` do histórico, da mais recente para a mais antiga."""
+    v = viabilidades_versoes.c
+    consulta = (
+        select(v.versao, v.tipo, v.data_criacao)
+        .where(v.viabilidade_id == id_viabilidade)
+        .order_by(v.versao.desc())
+    )
+    with engine.connect() as conn:
+        return [dict(linha._mapping) for linha in conn.execute(consulta)]
+
+
+def carregar_versao(engine, id_viabilidade: int, versao: int):
+    """
+    Reconstrói os `dados` de uma versão, ou retorna None se ela não existir.
+
+    Lê apenas o último snapshot até `versao` e os deltas seguintes, no
+    máximo `INTERVALO_SNAPSHOT` linhas.
+    """
+    with engine.connect() as conn:
+        registros = _registros_versao(conn, id_viabilidade, versao)
+
+    if not registros or registros[-1]['versao'] != versao:
+        return None
+    return reconstruir(registros)
+
+
+def diferenca_versoes(engine, id_viabilidade: int, versao_a: int, versao_b: int) -> list:
+    """Operações (ver `calcular_delta`) que levam da `versao_a` à `versao_b`."""
+    dados_a = carregar_versao(engine, id_viabilidade, versao_a)
+    dados_b = carregar_versao(engine, id_viabilidade, versao_b)
+    if dados_a is None or dados_b is None:
+        raise ValueError("Versão inexistente.")
+    return calcular_delta(dados_a, dados_b)
+
+
+# --- Resumo da carteira ---
+
+def gravar_resumo(conn, id_viabilidade: int, nome_terreno: str, dados: dict):
+    """Substitui a linha de `viabilidades_resumo` do projeto, dentro da transação de `conn`."""
+    # Import local: src.carteira importa este módulo
+    from src.carteira import resumo_do_registro
+
+    conn.execute(viabilidades_resumo.delete().where(viabilidades_resumo.c.viabilidade_id == id_viabilidade))
+    conn.execute(viabilidades_resumo.insert().values(
+        viabilidade_id=id_viabilidade, nome_terreno=nome_terreno, **resumo_do_registro(dados)
+    ))
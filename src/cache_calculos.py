@@ -0,0 +1,122 @@
+# src/cache_calculos.py
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from numbers import Number
+
+
+def normalizar(valor):
+    """
+    Converte entradas em uma estrutura imutável e canônica para gerar a chave.
+
+    Números viram `float`, dicionários viram tuplas ordenadas por chave,
+    listas/tuplas viram tuplas e DataFrames viram a tupla de seus registros.
+    """
+    if isinstance(valor, bool) or valor is None or isinstance(valor, str):
+        return valor
+    if isinstance(valor, Number):
+        return float(valor)
+    if isinstance(valor, dict):
+        return tuple(sorted((str(k), normalizar(v)) for k, v in valor.items()))
+    if isinstance(valor, (list, tuple)):
+        return tuple(normalizar(v) for v in valor)
+    if hasattr(valor, 'to_dict') and hasattr(valor, 'columns'):
+        return normalizar(valor.to_dict('records'))
+    if hasattr(valor, 'tolist'):
+        return normalizar(valor.tolist())
+    return repr(valor)
+
+
+def chave_entradas(*partes) -> str:
+    """Hash estável das entradas normalizadas."""
+    return hashlib.blake2b(repr(normalizar(partes)).encode(), digest_size=16).hexdigest()
+
+
+class CacheCalculos:
+    """
+    Cache LRU com limite de itens, seguro entre threads.
+
+    Uma instância em nível de módulo é compartilhada por todas as sessões do
+    servidor Streamlit, que rodam como threads do mesmo processo. Os valores
+    guardados são compartilhados: quem os recebe não deve modificá-los.
+    """
+
+    def __init__(self, tamanho_maximo: int = 1024):
+        self.tamanho_maximo = tamanho_maximo
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.despejos = 0
+        self.tempo_calculo = 0.0
+        self.tempo_economizado = 0.0
+
+    def obter_ou_calcular(self, chave: str, calcular):
+        """Retorna o valor da `chave`, chamando `calcular()` apenas em caso de falha."""
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                self.tempo_economizado += item[1]
+                return item[0]
+
+        inicio = time.perf_counter()
+        valor = calcular()
+        duracao = time.perf_counter() - inicio
+
+        with self._lock:
+            self.falhas += 1
+            self.tempo_calculo += duracao
+            self._itens[chave] = (valor, duracao)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho_maximo:
+                self._itens.popitem(last=False)
+                self.despejos += 1
+        return valor
+
+    def limpar(self):
+        """Remove todos os itens (as estatísticas são mantidas)."""
+        with self._lock:
+            self._itens.clear()
+
+    def estatisticas(self) -> dict:
+        """Contadores de uso do cache."""
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                'itens': len(self._itens),
+                'tamanho_maximo': self.tamanho_maximo,
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'despejos': self.despejos,
+                'taxa_acerto': self.acertos / consultas if consultas else 0.0,
+                'tempo_calculo_segundos': self.tempo_calculo,
+                'tempo_economizado_segundos': self.tempo_economizado,
+            }
+
+    def metricas_prometheus(self, nome: str = 'viabilidade_cache') -> str:
+        """Estatísticas no formato texto do Prometheus."""
+        est = self.estatisticas()
+        linhas = []
+        for campo, tipo in (
+            ('itens', 'gauge'),
+            ('acertos', 'counter'),
+            ('falhas', 'counter'),
+            ('despejos', 'counter'),
+            ('taxa_acerto', 'gauge'),
+            ('tempo_calculo_segundos', 'counter'),
+            ('tempo_economizado_segundos', 'counter'),
+        ):
+            linhas.append(f"# TYPE {nome}_{campo} {tipo}")
+            linhas.append(f"{nome}_{campo} {est[campo]}")
+        return "\n".join(linhas) + "\n"
+
+
+# Cache de resultados compartilhado por todas as sessões do processo
+cache_resultados = CacheCalculos(
+    tamanho_maximo=int(os.environ.get('VIABILIDADE_CACHE_TAMANHO', 2048))
+)
@@ -1,11 +1,16 @@
 # src/calculos_financeiros.py
+# Núcleo de cálculo usado pela interface, pela CLI e pelos jobs em lote.
+# Só usa a biblioteca padrão: importar este módulo não carrega NumPy,
+# pandas, Streamlit nem SQLAlchemy.
+
 def calcular_resultado_negocio(
     area_terreno: float,
     indice_aproveitamento: float,
     custo_direto_construcao_m2: float,
     relacao_privativa_construida: float,
     preco_medio_vendas: float,
-    custos_indiretos_data: list
+    custos_indiretos_data: list,
+    custos_indiretos_monetarios: dict = None
 ) -> dict:
     """
     Calcula a viabilidade financeira de um projeto imobiliário.
@@ -17,7 +22,8 @@ def calcular_resultado_negocio(
         relacao_privativa_construida: Relação entre área privativa e área construída.
         preco_medio_vendas: Preço médio de vendas por m² de área privativa.
         custos_indiretos_data: Lista de dicionários com os custos indiretos (percentuais).
-    
+        custos_indiretos_monetarios: Dicionário com os custos indiretos em R$.
+
     Returns:
         Um dicionário contendo os resultados financeiros do projeto.
     """
@@ -29,17 +35,19 @@ def calcular_resultado_negocio(
         area_construida = area_privativa / relacao_privativa_construida
 
     vgv = preco_medio_vendas * area_privativa
-    
+
     custo_direto_total = area_construida * custo_direto_construcao_m2
-    
-    # Novo cálculo: agora somamos os percentuais para obter o total dos custos indiretos
+
+    # Percentuais sobre o VGV mais os custos em R$ (outorga, IPTU...)
     total_percentual_custos_indiretos = sum(item['%'] for item in custos_indiretos_data)
-    custos_indiretos_total = (total_percentual_custos_indiretos / 100) * vgv
-    
+    custos_indiretos_total = ((total_percentual_custos_indiretos / 100) * vgv
+                              + sum((custos_indiretos_monetarios or {}).values()))
+
     custo_total = custo_direto_total + custos_indiretos_total
-    
+
     resultado_negocio = vgv - custo_total
-    
+    margem_lucro = (resultado_negocio / vgv) * 100 if vgv > 0 else 0
+
     return {
         'area_privativa': area_privativa,
         'area_construida': area_construida,
@@ -47,5 +55,33 @@ def calcular_resultado_negocio(
         'custo_direto_total': custo_direto_total,
         'custos_indiretos_total': custos_indiretos_total,
         'custo_total': custo_total,
-        'resultado_negocio': resultado_negocio
+        'resultado_negocio': resultado_negocio,
+        'margem_lucro': margem_lucro
+    }
+
+
+def calcular_viabilidade(entradas: dict) -> dict:
+    """
+    Resultados de um projeto a partir das suas entradas.
+
+    Args:
+        entradas: Entradas no formato de `data_model.EntradasProjeto`.
+
+    Returns:
+        Os resultados de `calcular_resultado_negocio`, acrescidos de
+        `nome_terreno` e `area_terreno`.
+    """
+    resultados = calcular_resultado_negocio(
+        entradas['area_terreno'],
+        entradas['indice_aproveitamento'],
+        entradas['custo_direto_construcao_m2'],
+        entradas['relacao_privativa_construida'],
+        entradas['preco_medio_vendas'],
+        [{'%': pct} for _, pct in entradas['custos_indiretos']],
+        entradas['custos_monetarios']
+    )
+    return {
+        'nome_terreno': entradas['nome_terreno'],
+        'area_terreno': entradas['area_terreno'],
+        **resultados
     }
@@ -0,0 +1,190 @@
+# src/calculos_lote.py
+
+import numpy as np
+
+# Colunas lidas de um DataFrame de terrenos (mesmos nomes dos argumentos escalares)
+COLUNAS_ENTRADA = (
+    'area_terreno',
+    'indice_aproveitamento',
+    'custo_direto_construcao_m2',
+    'relacao_privativa_construida',
+    'preco_medio_vendas',
+)
+
+COLUNAS_RESULTADO = (
+    'area_privativa',
+    'area_construida',
+    'vgv',
+    'custo_direto_total',
+    'custos_indiretos_total',
+    'custo_total',
+    'resultado_negocio',
+    'margem_lucro',
+)
+
+
+def _somar_colunas(valores, n: int) -> np.ndarray:
+    """
+    Reduz custos por terreno a um vetor de totais.
+
+    Aceita um escalar, um vetor (um total por terreno) ou uma matriz (n, k)
+    com um custo por coluna. A soma é feita coluna a coluna, da esquerda
+    para a direita, reproduzindo a ordem de `sum()` da versão escalar e,
+    portanto, os mesmos arredondamentos.
+    """
+    arr = np.asarray(valores, dtype=float)
+    if arr.ndim < 2:
+        return np.broadcast_to(arr, (n,)).astype(float)
+
+    total = np.zeros(n)
+    for j in range(arr.shape[1]):
+        total = total + arr[:, j]
+    return total
+
+
+def calcular_resultado_negocio_lote(
+    area_terreno,
+    indice_aproveitamento,
+    custo_direto_construcao_m2,
+    relacao_privativa_construida,
+    preco_medio_vendas,
+    percentuais_custos_indiretos,
+    custos_indiretos_monetarios=0.0
+) -> dict:
+    """
+    Versão vetorizada de `calcular_resultado_negocio` para muitos terrenos.
+
+    Todos os argumentos aceitam escalares ou vetores de mesmo tamanho
+    (broadcast do NumPy). Os resultados são idênticos aos da função
+    escalar, inclusive a regra de `relacao_privativa_construida <= 0`
+    (áreas zeradas) e a margem zerada quando `vgv <= 0`.
+
+    Args:
+        area_terreno: Área total do terreno em m².
+        indice_aproveitamento: Índice de aproveitamento do terreno.
+        custo_direto_construcao_m2: Custo direto de construção por m².
+        relacao_privativa_construida: Relação entre área privativa e área construída.
+        preco_medio_vendas: Preço médio de vendas por m² de área privativa.
+        percentuais_custos_indiretos: Percentual total sobre o VGV por terreno,
+            ou matriz (n, k) com um percentual por linha de custo.
+        custos_indiretos_monetarios: Custos em R$ por terreno, ou matriz (n, k)
+            com um custo por coluna.
+
+    Returns:
+        Um dicionário com um vetor por coluna de `COLUNAS_RESULTADO`.
+    """
+    area_terreno, indice_aproveitamento, custo_direto_construcao_m2, \
+        relacao_privativa_construida, preco_medio_vendas = np.broadcast_arrays(
+            *(np.asarray(v, dtype=float) for v in (
+                area_terreno,
+                indice_aproveitamento,
+                custo_direto_construcao_m2,
+                relacao_privativa_construida,
+                preco_medio_vendas,
+            ))
+        )
+    n = area_terreno.size
+    area_terreno = area_terreno.reshape(n)
+    indice_aproveitamento = indice_aproveitamento.reshape(n)
+    custo_direto_construcao_m2 = custo_direto_construcao_m2.reshape(n)
+    relacao_privativa_construida = relacao_privativa_construida.reshape(n)
+    preco_medio_vendas = preco_medio_vendas.reshape(n)
+
+    valida = relacao_privativa_construida > 0
+    area_privativa = np.where(valida, area_terreno * indice_aproveitamento, 0.0)
+    area_construida = np.divide(
+        area_privativa, relacao_privativa_construida,
+        out=np.zeros(n), where=valida
+    )
+
+    vgv = preco_medio_vendas * area_privativa
+    custo_direto_total = area_construida * custo_direto_construcao_m2
+
+    total_percentual = _somar_colunas(percentuais_custos_indiretos, n)
+    custos_monetarios = _somar_colunas(custos_indiretos_monetarios, n)
+    custos_indiretos_total = (total_percentual / 100) * vgv + custos_monetarios
+
+    custo_total = custo_direto_total + custos_indiretos_total
+    resultado_negocio = vgv - custo_total
+    margem_lucro = np.divide(
+        resultado_negocio, vgv, out=np.zeros(n), where=vgv > 0
+    ) * 100
+
+    return {
+        'area_privativa': area_privativa,
+        'area_construida': area_construida,
+        'vgv': vgv,
+        'custo_direto_total': custo_direto_total,
+        'custos_indiretos_total': custos_indiretos_total,
+        'custo_total': custo_total,
+        'resultado_negocio': resultado_negocio,
+        'margem_lucro': margem_lucro
+    }
+
+
+def verificar_colunas(terrenos):
+    """Levanta ValueError se faltar alguma coluna de `COLUNAS_ENTRADA` no DataFrame."""
+    faltando = [c for c in COLUNAS_ENTRADA if c not in terrenos.columns]
+    if faltando:
+        raise ValueError(f"Colunas ausentes no arquivo de terrenos: {', '.join(faltando)}")
+
+
+def custos_indiretos_df(
+    terrenos,
+    custos_indiretos_data: list = None,
+    custos_indiretos_monetarios: dict = None
+) -> tuple:
+    """
+    Percentual e custos em R$ indiretos de cada terreno do DataFrame.
+
+    As colunas opcionais `percentual_custos_indiretos` e
+    `custos_indiretos_monetarios` têm precedência sobre os argumentos, que
+    valem para todos os terrenos.
+
+    Returns:
+        Tupla (percentuais, monetarios), cada um vetor ou escalar.
+    """
+    if 'percentual_custos_indiretos' in terrenos.columns:
+        percentuais = terrenos['percentual_custos_indiretos'].to_numpy(dtype=float)
+    else:
+        percentuais = sum(item['%'] for item in (custos_indiretos_data or []))
+
+    if 'custos_indiretos_monetarios' in terrenos.columns:
+        monetarios = terrenos['custos_indiretos_monetarios'].to_numpy(dtype=float)
+    else:
+        monetarios = sum((custos_indiretos_monetarios or {}).values())
+    return percentuais, monetarios
+
+
+def calcular_terrenos_df(
+    terrenos,
+    custos_indiretos_data: list = None,
+    custos_indiretos_monetarios: dict = None
+):
+    """
+    Calcula a viabilidade de todas as linhas de um DataFrame de terrenos.
+
+    O DataFrame deve ter as colunas de `COLUNAS_ENTRADA`; os custos
+    indiretos seguem as regras de `custos_indiretos_df`.
+
+    Args:
+        terrenos: DataFrame com uma linha por terreno.
+        custos_indiretos_data: Lista de dicionários com os custos indiretos (percentuais).
+        custos_indiretos_monetarios: Dicionário com os custos indiretos em R$.
+
+    Returns:
+        Uma cópia do DataFrame com as colunas de resultado acrescentadas.
+    """
+    verificar_colunas(terrenos)
+    percentuais, monetarios = custos_indiretos_df(terrenos, custos_indiretos_data, custos_indiretos_monetarios)
+
+    resultados = calcular_resultado_negocio_lote(
+        *(terrenos[c].to_numpy(dtype=float) for c in COLUNAS_ENTRADA),
+        percentuais_custos_indiretos=percentuais,
+        custos_indiretos_monetarios=monetarios
+    )
+
+    saida = terrenos.copy()
+    for coluna, valores in resultados.items():
+        saida[coluna] = valores
+    return saida
@@ -0,0 +1,182 @@
+# src/carteira.py
+
+from sqlalchemy import case, func, select
+
+from src.banco_dados import gravar_resumo, viabilidades, viabilidades_resumo
+from src.calculos_financeiros import calcular_viabilidade
+from src.data_model import ler_registro
+
+# Limites (em %) das faixas de margem do histograma da carteira
+FAIXAS_MARGEM = (0, 5, 10, 15, 20, 25, 30)
+
+TAMANHO_LOTE = 1_000
+
+# Projetos sobrepostos no gráfico de fluxos da carteira
+LIMITE_FLUXOS = 500
+
+
+def resumo_do_registro(dados: dict) -> dict:
+    """
+    Números de um projeto usados nos painéis da carteira.
+
+    Usa os resultados salvos no registro (ou os recalcula, se ausentes) e o
+    fluxo de caixa das entradas para a exposição máxima. `resultado_m2` é o
+    resultado do negócio por m² de terreno.
+    """
+    from src.fluxo_caixa import calcular_indicadores, fluxo_do_projeto
+
+    registro = ler_registro(dados)
+    entradas = registro['entradas']
+    if 'vgv' in registro['resultados']:
+        resultados = {'area_terreno': entradas['area_terreno'], **registro['resultados']}
+    else:
+        resultados = calcular_viabilidade(entradas)
+
+    fluxo = fluxo_do_projeto(entradas, resultados)
+    exposicao = calcular_indicadores(fluxo['fluxo'], entradas['taxa_desconto'])['exposicao_maxima'][0]
+    area = resultados['area_terreno']
+
+    return {
+        'area_terreno': area,
+        'vgv': resultados['vgv'],
+        'custo_total': resultados['custo_total'],
+        'resultado_negocio': resultados['resultado_negocio'],
+        'margem_lucro': resultados['margem_lucro'],
+        'resultado_m2': resultados['resultado_negocio'] / area if area > 0 else None,
+        'exposicao_maxima': float(exposicao),
+    }
+
+
+def contar_pendentes(engine) -> int:
+    """Projetos ainda sem linha em `viabilidades_resumo` (ex.: salvos antes dela existir)."""
+    r = viabilidades_resumo.c
+    consulta = (
+        select(func.count())
+        .select_from(viabilidades.outerjoin(viabilidades_resumo, r.viabilidade_id == viabilidades.c.id))
+        .where(r.viabilidade_id.is_(None))
+    )
+    with engine.connect() as conn:
+        return conn.execute(consulta).scalar()
+
+
+def atualizar_resumos(engine, tamanho_lote: int = TAMANHO_LOTE) -> int:
+    """
+    Cria o resumo dos projetos que ainda não o têm, em lotes.
+
+    Gravações feitas por `salvar_versao` já atualizam o resumo; isto cobre
+    linhas antigas e as alteradas pela carga em massa.
+
+    Returns:
+        Número de resumos criados.
+    """
+    c = viabilidades.c
+    r = viabilidades_resumo.c
+    total = 0
+    while True:
+        consulta = (
+            select(c.id, c.nome_terreno, c.dados)
+            .select_from(viabilidades.outerjoin(viabilidades_resumo, r.viabilidade_id == c.id))
+            .where(r.viabilidade_id.is_(None))
+            .order_by(c.id)
+            .limit(tamanho_lote)
+        )
+        with engine.begin() as conn:
+            linhas = conn.execute(consulta).all()
+            for id_viabilidade, nome_terreno, dados in linhas:
+                gravar_resumo(conn, id_viabilidade, nome_terreno, dados or {})
+        total += len(linhas)
+        if len(linhas) < tamanho_lote:
+            return total
+
+
+# --- Consultas dos painéis ---
+
+def totais_carteira(engine) -> dict:
+    """Quantidade de projetos, VGV, custo, resultado e exposição totais e margem média."""
+    r = viabilidades_resumo.c
+    consulta = select(
+        func.count().label('projetos'),
+        func.coalesce(func.sum(r.vgv), 0.0).label('vgv'),
+        func.coalesce(func.sum(r.custo_total), 0.0).label('custo_total'),
+        func.coalesce(func.sum(r.resultado_negocio), 0.0).label('resultado_negocio'),
+        func.coalesce(func.sum(r.exposicao_maxima), 0.0).label('exposicao_maxima'),
+        func.avg(r.margem_lucro).label('margem_media'),
+    )
+    with engine.connect() as conn:
+        return dict(conn.execute(consulta).one()._mapping)
+
+
+def distribuicao_margens(engine, faixas: tuple = FAIXAS_MARGEM) -> list:
+    """
+    Quantidade de projetos por faixa de margem de lucro.
+
+    Returns:
+        Lista de (rótulo, quantidade) na ordem das faixas, incluindo as vazias.
+    """
+    r = viabilidades_resumo.c
+    rotulos = [f"< {faixas[0]}%"]
+    rotulos += [f"{a}% a {b}%" for a, b in zip(faixas, faixas[1:])]
+    rotulos += [f">= {faixas[-1]}%"]
+
+    indice = case(
+        *((r.margem_lucro < limite, i) for i, limite in enumerate(faixas)),
+        else_=len(faixas)
+    ).label('faixa')
+    consulta = select(indice, func.count()).group_by(indice)
+
+    with engine.connect() as conn:
+        contagens = dict(conn.execute(consulta).all())
+    return [(rotulo, contagens.get(i, 0)) for i, rotulo in enumerate(rotulos)]
+
+
+def ranking_resultado_m2(engine, limite: int = 20, crescente: bool = False) -> list:
+    """Projetos ordenados pelo resultado por m² de terreno (melhores primeiro, por padrão)."""
+    r = viabilidades_resumo.c
+    ordem = r.resultado_m2.asc() if crescente else r.resultado_m2.desc()
+    consulta = (
+        select(
+            r.viabilidade_id, r.nome_terreno, r.resultado_m2, r.resultado_negocio,
+            r.margem_lucro, r.vgv, r.exposicao_maxima
+        )
+        .where(r.resultado_m2.is_not(None))
+        .order_by(ordem)
+        .limit(limite)
+    )
+    with engine.connect() as conn:
+        return [dict(linha._mapping) for linha in conn.execute(consulta)]
+
+
+def fluxos_carteira(engine, limite: int = LIMITE_FLUXOS) -> tuple:
+    """
+    Fluxos de caixa mensais dos `limite` projetos mais recentes, para sobreposição.
+
+    Prazos diferentes são completados com zero após o fim de cada projeto,
+    de modo que o acumulado permanece no valor final.
+
+    Returns:
+        Tupla (nomes, matriz (n, meses)).
+    """
+    import numpy as np
+
+    from src.fluxo_caixa import fluxo_do_projeto
+
+    c = viabilidades.c
+    consulta = select(c.nome_terreno, c.dados).order_by(c.id.desc()).limit(limite)
+    with engine.connect() as conn:
+        linhas = conn.execute(consulta).all()
+
+    nomes, fluxos = [], []
+    for nome_terreno, dados in linhas:
+        registro = ler_registro(dados or {})
+        entradas = registro['entradas']
+        if 'vgv' in registro['resultados']:
+            resultados = registro['resultados']
+        else:
+            resultados = calcular_viabilidade(entradas)
+        nomes.append(nome_terreno)
+        fluxos.append(fluxo_do_projeto(entradas, resultados)['fluxo'])
+
+    matriz = np.zeros((len(fluxos), max((len(f) for f in fluxos), default=0)))
+    for i, fluxo in enumerate(fluxos):
+        matriz[i, :len(fluxo)] = fluxo
+    return nomes, matriz
@@ -0,0 +1,94 @@
+# src/cli.py
+"""
+Avalia projetos de viabilidade sem a interface.
+
+Uso:
+    ./viabilidade projeto.json outros.jsonl      # arquivos
+    cat projetos.jsonl | ./viabilidade           # stdin (um projeto por linha)
+    ./viabilidade --fluxo projeto.json           # inclui VPL, TIR, exposição e payback
+
+Cada projeto é um objeto JSON com as entradas de `data_model.EntradasProjeto`
+(campos ausentes ficam com o padrão) ou um registro salvo no banco. A saída
+é uma linha JSON por projeto, na mesma ordem da entrada.
+
+Este módulo é o caminho rápido: importa apenas a biblioteca padrão e o
+núcleo de cálculo; NumPy só é carregado com `--fluxo`.
+"""
+
+import argparse
+import json
+import sys
+
+from src.calculos_financeiros import calcular_viabilidade
+from src.data_model import completar_entradas, ler_registro
+
+
+def ler_projetos(arquivo):
+    """Gera os projetos de um arquivo JSON (objeto ou lista) ou JSONL."""
+    primeiro = ''
+    for linha in arquivo:
+        if linha.strip():
+            primeiro = linha
+            break
+    if not primeiro:
+        return
+
+    try:
+        item = json.loads(primeiro)
+    except json.JSONDecodeError:
+        # Não é JSONL: um único documento JSON em várias linhas
+        item = json.loads(primeiro + arquivo.read())
+        yield from (item if isinstance(item, list) else [item])
+        return
+
+    yield item
+    for linha in arquivo:
+        if linha.strip():
+            yield json.loads(linha)
+
+
+def entradas_do_projeto(projeto: dict) -> dict:
+    """Entradas completas de um objeto de entradas ou de um registro salvo."""
+    if 'versao_esquema' in projeto:
+        return ler_registro(projeto)['entradas']
+    return completar_entradas(projeto)
+
+
+def avaliar_projeto(projeto: dict, fluxo: bool = False) -> dict:
+    """
+    Resultados de um projeto (e, com `fluxo=True`, os indicadores do fluxo de caixa).
+
+    É a mesma rotina usada pela interface, disponível para jobs e serviços.
+    """
+    entradas = entradas_do_projeto(projeto)
+    resultados = calcular_viabilidade(entradas)
+    if fluxo:
+        from src.fluxo_caixa import calcular_indicadores, fluxo_do_projeto
+
+        fluxo_caixa = fluxo_do_projeto(entradas, resultados)
+        for campo, valores in calcular_indicadores(fluxo_caixa['fluxo'], entradas['taxa_desconto']).items():
+            valor = float(valores[0])
+            resultados[campo] = valor if valor == valor else None
+    return resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='viabilidade', description="Avalia projetos de viabilidade imobiliária.")
+    parser.add_argument('arquivos', nargs='*', help="Arquivos JSON/JSONL ('-' ou nenhum = stdin)")
+    parser.add_argument('--fluxo', action='store_true', help="Inclui VPL, TIR, exposição máxima e payback")
+    args = parser.parse_args(argv)
+
+    saida = sys.stdout
+    for caminho in args.arquivos or ['-']:
+        arquivo = sys.stdin if caminho == '-' else open(caminho, encoding='utf-8')
+        try:
+            for projeto in ler_projetos(arquivo):
+                saida.write(json.dumps(avaliar_projeto(projeto, args.fluxo), ensure_ascii=False) + '\n')
+        finally:
+            if arquivo is not sys.stdin:
+                arquivo.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
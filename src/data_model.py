@@ -1,15 +1,150 @@
 # src/data_model.py
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, TypedDict
 
-def get_empty_project_data() -> Dict[str, Any]:
-    """Retorna um dicionário com a estrutura de dados do projeto."""
+from src.cache_calculos import chave_entradas
+
+# Versão do formato gravado em `viabilidades.dados`; registros sem o campo
+# `versao_esquema` são do formato antigo (apenas resultados).
+VERSAO_ESQUEMA = 1
+
+CUSTOS_INDIRETOS_PADRAO = [
+    ['IRPJ/CS/PIS/COFINS', 4.00],
+    ['Corretagem', 3.61],
+    ['Publicidade', 0.90],
+    ['Manutenção', 0.50],
+    ['Custo Fixo IDIBRA', 4.00],
+    ['Assessoria Técnica', 0.70],
+    ['Projetos', 0.52],
+    ['Licenciamento e Incorporação', 0.20],
+]
+
+CUSTOS_MONETARIOS = (
+    'outorga_onerosa',
+    'condominio',
+    'iptu',
+    'preparacao_terreno',
+    'financiamento_bancario',
+)
+
+
+class EntradasProjeto(TypedDict):
+    nome_terreno: str
+    area_terreno: float
+    indice_aproveitamento: float
+    relacao_privativa_construida: float
+    preco_medio_vendas: float
+    custo_direto_construcao_m2: float
+    custos_indiretos: List[list]          # pares [nome, %], na ordem da tabela
+    custos_monetarios: Dict[str, float]   # chaves de CUSTOS_MONETARIOS, em R$
+    duracao_projeto: int
+    taxa_desconto: float
+    inicio_obra: int
+    duracao_obra: int
+    inicio_vendas: int
+    duracao_vendas: int
+
+
+class RegistroProjeto(TypedDict):
+    versao_esquema: int
+    entradas: EntradasProjeto
+    resultados: Dict[str, Any]
+    chave: Optional[str]
+
+
+def get_empty_project_data() -> EntradasProjeto:
+    """Retorna as entradas de um projeto novo, com os valores padrão da interface."""
     return {
+        "nome_terreno": "",
         "area_terreno": 0.0,
-        "area_construida": 0.0,
-        "custo_por_metro_quadrado": 0.0,
-        "preco_venda_por_metro_quadrado": 0.0,
-        "taxa_deducao_vendas": 0.0,
-        "taxa_desconto": 0.0,
-        "duracao_projeto": 0,
+        "indice_aproveitamento": 1.00,
+        "relacao_privativa_construida": 0.70,
+        "preco_medio_vendas": 0.0,
+        "custo_direto_construcao_m2": 0.0,
+        "custos_indiretos": [list(item) for item in CUSTOS_INDIRETOS_PADRAO],
+        "custos_monetarios": {nome: 0.0 for nome in CUSTOS_MONETARIOS},
+        "duracao_projeto": 36,
+        "taxa_desconto": 12.0,
+        "inicio_obra": 0,
+        "duracao_obra": 24,
+        "inicio_vendas": 6,
+        "duracao_vendas": 30,
+    }
+
+
+def chave_registro(entradas: EntradasProjeto) -> str:
+    """Hash das entradas; registros com a mesma chave têm os mesmos resultados."""
+    return chave_entradas('projeto', entradas)
+
+
+def montar_registro(entradas: EntradasProjeto, resultados: dict) -> RegistroProjeto:
+    """Registro com entradas e resultados, no formato gravado no banco."""
+    return {
+        'versao_esquema': VERSAO_ESQUEMA,
+        'entradas': entradas,
+        'resultados': {k: v for k, v in resultados.items() if k not in entradas},
+        'chave': chave_registro(entradas),
     }
+
+
+def ler_registro(dados: dict) -> RegistroProjeto:
+    """
+    Interpreta `dados` salvos em qualquer versão do formato.
+
+    Registros antigos só guardavam os resultados de `calcular_viabilidade`;
+    deles aproveitamos `nome_terreno` e `area_terreno`, o restante das
+    entradas fica com o padrão e `chave` fica None (os resultados precisam
+    ser recalculados).
+    """
+    if dados.get('versao_esquema') is None:
+        entradas = get_empty_project_data()
+        for campo in ('nome_terreno', 'area_terreno'):
+            if campo in dados:
+                entradas[campo] = dados[campo]
+        resultados = {k: v for k, v in dados.items() if k not in entradas}
+        return {'versao_esquema': VERSAO_ESQUEMA, 'entradas': entradas, 'resultados': resultados, 'chave': None}
+
+    if dados['versao_esquema'] > VERSAO_ESQUEMA:
+        raise ValueError(f"Registro na versão {dados['versao_esquema']}, mais nova que a suportada ({VERSAO_ESQUEMA}).")
+
+    # Campos novos ausentes em registros mais antigos ficam com o padrão
+    return {**dados, 'entradas': completar_entradas(dados['entradas'])}
+
+
+def completar_entradas(parciais: dict) -> EntradasProjeto:
+    """Entradas padrão sobrepostas pelas informadas em `parciais`."""
+    entradas = get_empty_project_data()
+    entradas.update(parciais)
+    entradas['custos_monetarios'] = {
+        **get_empty_project_data()['custos_monetarios'], **entradas['custos_monetarios']
+    }
+    return entradas
+
+
+# --- Conversão de/para o estado da sessão do Streamlit ---
+
+def entradas_da_sessao(estado) -> EntradasProjeto:
+    """Monta as entradas a partir de `st.session_state` (ou qualquer mapeamento)."""
+    padrao = get_empty_project_data()
+    entradas = {campo: estado.get(campo, valor) for campo, valor in padrao.items()
+                if campo not in ('custos_indiretos', 'custos_monetarios')}
+
+    tabela = estado.get('custos_indiretos_padrao')
+    if tabela is None:
+        entradas['custos_indiretos'] = padrao['custos_indiretos']
+    else:
+        entradas['custos_indiretos'] = [[str(nome), float(pct)] for nome, pct in zip(tabela['Custo'], tabela['%'])]
+    entradas['custos_monetarios'] = {nome: float(estado.get(nome, 0.0)) for nome in CUSTOS_MONETARIOS}
+    return entradas
+
+
+def entradas_para_sessao(entradas: EntradasProjeto) -> Dict[str, Any]:
+    """Chaves e valores de `st.session_state` que reproduzem as `entradas`."""
+    # Import local: a CLI e os jobs em lote usam este módulo sem o pandas
+    import pandas as pd
+
+    estado = {campo: valor for campo, valor in entradas.items()
+              if campo not in ('custos_indiretos', 'custos_monetarios')}
+    estado['custos_indiretos_padrao'] = pd.DataFrame(entradas['custos_indiretos'], columns=['Custo', '%'])
+    estado.update(entradas['custos_monetarios'])
+    return estado
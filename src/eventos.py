@@ -0,0 +1,198 @@
+# src/eventos.py
+"""
+Avisos de alteração em `viabilidades` para quem mantém dados em cache.
+
+Cada gravação publica, depois de confirmada, a lista de projetos alterados.
+Os inscritos do próprio processo são chamados na hora. No PostgreSQL o aviso
+também sai por NOTIFY, na mesma transação da gravação, e uma thread com
+LISTEN entrega aos inscritos os avisos dos demais processos e servidores.
+Nos outros bancos o aviso fica restrito ao processo.
+
+Um aviso `None` significa "pode ter havido alterações não informadas" (carga
+em massa, reconexão da escuta): quem recebe deve descartar tudo.
+"""
+
+import json
+import select
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import NamedTuple
+
+from sqlalchemy import text
+
+CANAL = 'viabilidades_alteradas'
+
+# Identifica este processo nas notificações, para não entregar duas vezes
+ORIGEM = uuid.uuid4().hex
+
+# Sem notificações por este tempo (s), a escuta testa a conexão
+INTERVALO_VERIFICACAO = 30.0
+
+# Espera entre tentativas de reconectar a escuta (s), dobrando até o máximo
+ESPERA_RECONEXAO = 1.0
+ESPERA_RECONEXAO_MAX = 30.0
+
+
+class Alteracao(NamedTuple):
+    id_viabilidade: int
+    nome_terreno: str
+    data_criacao: datetime = None
+    nova: bool = False   # projeto criado (entra na listagem) ou só atualizado
+
+
+def _codificar(alteracoes) -> list:
+    if alteracoes is None:
+        return [json.dumps({'origem': ORIGEM, 'tudo': True})]
+    return [
+        json.dumps({
+            'origem': ORIGEM,
+            'id': a.id_viabilidade,
+            'nome': a.nome_terreno,
+            'data': a.data_criacao.isoformat() if a.data_criacao is not None else None,
+            'nova': a.nova,
+        })
+        for a in alteracoes
+    ]
+
+
+def _decodificar(mensagem: str):
+    """Alteração da mensagem; None para 'tudo'; False se veio deste processo."""
+    conteudo = json.loads(mensagem)
+    if conteudo.get('origem') == ORIGEM:
+        return False
+    if conteudo.get('tudo'):
+        return None
+    data = conteudo.get('data')
+    return Alteracao(
+        conteudo['id'],
+        conteudo['nome'],
+        datetime.fromisoformat(data) if data else None,
+        conteudo.get('nova', False),
+    )
+
+
+class BarramentoAlteracoes:
+    """
+    Inscritos de um engine e, no PostgreSQL com psycopg2, a thread de escuta.
+
+    Os inscritos recebem uma lista de `Alteracao` ou None e são chamados
+    pela thread que publicou (ou pela de escuta); devem ser rápidos e
+    seguros entre threads.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._inscritos = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self.publicadas = 0
+        self.recebidas = 0
+        self.reconexoes = 0
+
+    @property
+    def distribuido(self) -> bool:
+        """True se os avisos chegam de outros processos (LISTEN/NOTIFY)."""
+        return self.engine.dialect.name == 'postgresql' and self.engine.dialect.driver == 'psycopg2'
+
+    def inscrever(self, funcao):
+        with self._lock:
+            self._inscritos.append(funcao)
+            if self.distribuido and self._thread is None:
+                self._thread = threading.Thread(target=self._ouvir, name='viabilidade-escuta', daemon=True)
+                self._thread.start()
+
+    def publicar(self, alteracoes):
+        """Entrega `alteracoes` (lista ou None) aos inscritos deste processo."""
+        if alteracoes is not None:
+            alteracoes = list(alteracoes)
+            if not alteracoes:
+                return
+        self.publicadas += 1
+        self._entregar(alteracoes)
+
+    def _entregar(self, alteracoes):
+        with self._lock:
+            inscritos = list(self._inscritos)
+        for funcao in inscritos:
+            try:
+                funcao(alteracoes)
+            except Exception:
+                # Um inscrito com erro não impede a entrega aos demais
+                pass
+
+    def _ouvir(self):
+        espera = ESPERA_RECONEXAO
+        while True:
+            conexao = None
+            try:
+                # Conexão própria, fora do pool, com as opções do engine
+                conexao = self.engine.raw_connection()
+                conexao.detach()
+                dbapi = conexao.dbapi_connection
+                dbapi.autocommit = True
+                cursor = dbapi.cursor()
+                cursor.execute(f"LISTEN {CANAL}")
+                espera = ESPERA_RECONEXAO
+                # Avisos emitidos antes do LISTEN (ou durante a queda) se perderam
+                self._entregar(None)
+
+                while True:
+                    if not select.select([dbapi], [], [], INTERVALO_VERIFICACAO)[0]:
+                        cursor.execute("SELECT 1")   # falha se a conexão caiu
+                    dbapi.poll()
+                    alteracoes = []
+                    while dbapi.notifies:
+                        alteracao = _decodificar(dbapi.notifies.pop(0).payload)
+                        if alteracao is None:
+                            alteracoes = None
+                        elif alteracao is not False and alteracoes is not None:
+                            alteracoes.append(alteracao)
+                    if alteracoes is None or alteracoes:
+                        self.recebidas += 1
+                        self._entregar(alteracoes)
+            except Exception:
+                if conexao is not None:
+                    try:
+                        conexao.close()
+                    except Exception:
+                        pass
+                self.reconexoes += 1
+                time.sleep(espera)
+                espera = min(espera * 2, ESPERA_RECONEXAO_MAX)
+
+
+_barramentos = {}
+_lock = threading.Lock()
+
+
+def obter_barramento(engine) -> BarramentoAlteracoes:
+    """Barramento compartilhado do processo para `engine` (criado na primeira chamada)."""
+    barramento = _barramentos.get(engine)
+    if barramento is None:
+        with _lock:
+            barramento = _barramentos.get(engine)
+            if barramento is None:
+                barramento = _barramentos[engine] = BarramentoAlteracoes(engine)
+    return barramento
+
+
+def notificar_alteracoes(conn, alteracoes):
+    """
+    Emite NOTIFY das `alteracoes` (lista ou None) na transação de `conn`.
+
+    O PostgreSQL só entrega as notificações se a transação for confirmada.
+    Nos demais bancos não faz nada; use `publicar_alteracoes` após o commit.
+    """
+    if conn.dialect.name != 'postgresql' or alteracoes == []:
+        return
+    conn.execute(
+        text("SELECT pg_notify(:canal, m) FROM unnest(CAST(:mensagens AS text[])) AS m"),
+        {'canal': CANAL, 'mensagens': _codificar(alteracoes)}
+    )
+
+
+def publicar_alteracoes(engine, alteracoes):
+    """Entrega `alteracoes` (lista ou None) aos inscritos deste processo."""
+    obter_barramento(engine).publicar(alteracoes)
@@ -0,0 +1,282 @@
+# src/fluxo_caixa.py
+
+import numpy as np
+
+# Parâmetros padrão das curvas S (meses a partir do início do projeto)
+CURVA_VENDAS_PADRAO = {'inicio': 6, 'duracao': 30, 'inclinacao': 6.0}
+CURVA_OBRA_PADRAO = {'inicio': 0, 'duracao': 24, 'inclinacao': 6.0}
+
+# Limites do intervalo de busca da TIR mensal
+TIR_MIN = -0.9
+TIR_MAX = 10.0
+
+
+# --- Curvas de distribuição ---
+
+def curva_s(inicio: int, duracao: int, horizonte: int, inclinacao: float = 6.0) -> np.ndarray:
+    """
+    Distribui 100% de um valor entre os meses [inicio, inicio + duracao).
+
+    A curva acumulada é uma logística normalizada; `inclinacao` controla o
+    formato (0 = distribuição linear, valores maiores concentram no meio).
+    O que ultrapassar o horizonte é lançado no último mês.
+
+    Returns:
+        Vetor de pesos de tamanho `horizonte` que soma 1.
+    """
+    duracao = max(int(duracao), 1)
+    x = np.clip((np.arange(horizonte + 1) - inicio) / duracao, 0.0, 1.0)
+    if inclinacao > 0:
+        logistica = 1 / (1 + np.exp(-inclinacao * (x - 0.5)))
+        l0 = 1 / (1 + np.exp(inclinacao * 0.5))
+        l1 = 1 / (1 + np.exp(-inclinacao * 0.5))
+        acumulada = (logistica - l0) / (l1 - l0)
+    else:
+        acumulada = x
+    pesos = np.diff(acumulada)
+    pesos[-1] += 1.0 - acumulada[-1]
+    return pesos
+
+
+# --- Fluxo de caixa ---
+
+def gerar_fluxo_caixa(
+    vgv: float,
+    custo_direto_total: float,
+    total_percentual_custos_indiretos: float,
+    total_custos_monetarios: float,
+    duracao_projeto: int,
+    curva_vendas: dict = None,
+    curva_obra: dict = None,
+    fatores_custos=None,
+    fatores_receitas=None
+) -> dict:
+    """
+    Distribui receitas e custos do projeto ao longo dos meses.
+
+    Receitas e custos indiretos percentuais (impostos, corretagem...)
+    acompanham a curva de vendas; custos diretos acompanham a curva de obra;
+    custos monetários (outorga, preparação do terreno...) entram no mês 1.
+
+    Os fatores opcionais multiplicam, mês a mês, os custos diretos e as
+    receitas (e com elas os custos percentuais); ver `src.reajuste`.
+
+    Args:
+        vgv: Valor geral de vendas.
+        custo_direto_total: Custo direto total da obra.
+        total_percentual_custos_indiretos: Soma dos percentuais sobre o VGV.
+        total_custos_monetarios: Soma dos custos indiretos em R$.
+        duracao_projeto: Horizonte do fluxo em meses.
+        curva_vendas: Parâmetros de `curva_s` para as vendas.
+        curva_obra: Parâmetros de `curva_s` para a obra.
+        fatores_custos: Vetor (duracao_projeto,) de reajuste dos custos diretos.
+        fatores_receitas: Vetor (duracao_projeto,) de reajuste dos preços de venda.
+
+    Returns:
+        Dicionário com os vetores mensais `mes`, `receitas`, `custos` (dos
+        quais `custos_obra` são os diretos) e `fluxo`.
+    """
+    if duracao_projeto <= 0:
+        raise ValueError("A duração do projeto deve ser de pelo menos 1 mês.")
+
+    vendas = curva_s(horizonte=duracao_projeto, **(curva_vendas or CURVA_VENDAS_PADRAO))
+    obra = curva_s(horizonte=duracao_projeto, **(curva_obra or CURVA_OBRA_PADRAO))
+
+    nominal = {
+        'mes': np.arange(1, duracao_projeto + 1),
+        'receitas': vgv * vendas,
+        'custos_obra': custo_direto_total * obra,
+    }
+    return reajustar_fluxo(
+        nominal, total_percentual_custos_indiretos, total_custos_monetarios, fatores_custos, fatores_receitas
+    )
+
+
+def reajustar_fluxo(
+    fluxo: dict,
+    total_percentual_custos_indiretos: float,
+    total_custos_monetarios: float,
+    fatores_custos=None,
+    fatores_receitas=None
+) -> dict:
+    """
+    Fluxo com os fatores de reajuste aplicados a um fluxo nominal.
+
+    Reaproveita as receitas e os custos de obra de `gerar_fluxo_caixa` (sem
+    refazer as curvas) e dá o mesmo resultado que chamá-la com os fatores.
+
+    Args:
+        fluxo: Saída de `gerar_fluxo_caixa` sem fatores.
+        total_percentual_custos_indiretos, total_custos_monetarios: Os mesmos
+            valores usados para gerar `fluxo`.
+        fatores_custos, fatores_receitas: Ver `gerar_fluxo_caixa`.
+    """
+    receitas = fluxo['receitas']
+    custos_obra = fluxo['custos_obra']
+    if fatores_receitas is not None:
+        receitas = receitas * fatores_receitas
+    if fatores_custos is not None:
+        custos_obra = custos_obra * fatores_custos
+    custos = (custos_obra
+              + (total_percentual_custos_indiretos / 100) * receitas)
+    custos[0] += total_custos_monetarios
+
+    return {
+        'mes': fluxo['mes'],
+        'receitas': receitas,
+        'custos': custos,
+        'custos_obra': custos_obra,
+        'fluxo': receitas - custos
+    }
+
+
+def fluxo_do_projeto(entradas: dict, resultados: dict, fatores_custos=None, fatores_receitas=None) -> dict:
+    """
+    `gerar_fluxo_caixa` com os prazos e custos de um projeto.
+
+    Args:
+        entradas: Entradas no formato de `data_model.EntradasProjeto`.
+        resultados: Saída de `calculos_financeiros.calcular_viabilidade`.
+        fatores_custos, fatores_receitas: Reajuste mensal opcional (ver `gerar_fluxo_caixa`).
+    """
+    return gerar_fluxo_caixa(
+        resultados['vgv'],
+        resultados['custo_direto_total'],
+        sum(pct for _, pct in entradas['custos_indiretos']),
+        sum(entradas['custos_monetarios'].values()),
+        int(entradas['duracao_projeto']),
+        curva_vendas={'inicio': int(entradas['inicio_vendas']), 'duracao': int(entradas['duracao_vendas'])},
+        curva_obra={'inicio': int(entradas['inicio_obra']), 'duracao': int(entradas['duracao_obra'])},
+        fatores_custos=fatores_custos,
+        fatores_receitas=fatores_receitas
+    )
+
+
+def fluxo_caixa_df(fluxo: dict):
+    """Converte a saída de `gerar_fluxo_caixa` no DataFrame usado por `plotar_fluxo_de_caixa`."""
+    # Import local: o cálculo do fluxo não depende do pandas
+    import pandas as pd
+
+    return pd.DataFrame({
+        'Mes': fluxo['mes'],
+        'Receitas': fluxo['receitas'],
+        'Custos': fluxo['custos'],
+        'Fluxo de Caixa': fluxo['fluxo'],
+    })
+
+
+# --- Indicadores ---
+
+def taxa_mensal(taxa_anual_pct) -> np.ndarray:
+    """Converte uma taxa anual em % na taxa mensal equivalente (decimal)."""
+    return (1 + np.asarray(taxa_anual_pct, dtype=float) / 100) ** (1 / 12) - 1
+
+
+def calcular_vpl(fluxos, taxa_mensal_dec) -> np.ndarray:
+    """
+    Valor presente líquido de um ou vários fluxos mensais.
+
+    O primeiro mês não é descontado.
+
+    Args:
+        fluxos: Vetor (T,) ou matriz (n, T) de fluxos mensais.
+        taxa_mensal_dec: Taxa mensal decimal (escalar ou vetor (n,)).
+    """
+    fluxos = np.atleast_2d(np.asarray(fluxos, dtype=float))
+    taxa = np.broadcast_to(np.asarray(taxa_mensal_dec, dtype=float), (fluxos.shape[0],))
+    t = np.arange(fluxos.shape[1])
+    descontos = (1 + taxa[:, None]) ** -t[None, :]
+    return (fluxos * descontos).sum(axis=1)
+
+
+def calcular_tir(fluxos, tolerancia: float = 1e-10, max_iter: int = 100) -> np.ndarray:
+    """
+    TIR mensal de vários fluxos de uma vez (Newton com salvaguarda por bissecção).
+
+    Cada linha mantém um intervalo [lo, hi] com troca de sinal do VPL. O
+    passo de Newton é aceito quando cai dentro do intervalo; caso contrário
+    usa-se o ponto médio. Linhas sem troca de sinal em [TIR_MIN, TIR_MAX]
+    retornam NaN.
+
+    Args:
+        fluxos: Vetor (T,) ou matriz (n, T) de fluxos mensais.
+
+    Returns:
+        Vetor (n,) com a TIR mensal decimal.
+    """
+    fluxos = np.atleast_2d(np.asarray(fluxos, dtype=float))
+    n = fluxos.shape[0]
+    t = np.arange(fluxos.shape[1])
+
+    def _vpl_e_derivada(taxa):
+        descontos = (1 + taxa[:, None]) ** -t[None, :]
+        vpl = (fluxos * descontos).sum(axis=1)
+        derivada = -(fluxos * t * descontos / (1 + taxa[:, None])).sum(axis=1)
+        return vpl, derivada
+
+    lo = np.full(n, TIR_MIN)
+    hi = np.full(n, TIR_MAX)
+    f_lo, _ = _vpl_e_derivada(lo)
+    f_hi, _ = _vpl_e_derivada(hi)
+    valido = np.sign(f_lo) * np.sign(f_hi) < 0
+
+    taxa = np.full(n, 0.01)
+    ativo = valido.copy()
+    for _ in range(max_iter):
+        if not ativo.any():
+            break
+        vpl, derivada = _vpl_e_derivada(taxa)
+
+        # Atualiza o intervalo mantendo a troca de sinal
+        mesmo_sinal_lo = np.sign(vpl) == np.sign(f_lo)
+        lo = np.where(mesmo_sinal_lo, taxa, lo)
+        f_lo = np.where(mesmo_sinal_lo, vpl, f_lo)
+        hi = np.where(mesmo_sinal_lo, hi, taxa)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = taxa - vpl / derivada
+        dentro = np.isfinite(newton) & (newton > np.minimum(lo, hi)) & (newton < np.maximum(lo, hi))
+        nova = np.where(dentro, newton, (lo + hi) / 2)
+
+        convergiu = (np.abs(nova - taxa) < tolerancia) | (vpl == 0)
+        taxa = np.where(ativo, nova, taxa)
+        ativo &= ~convergiu
+
+    return np.where(valido, taxa, np.nan)
+
+
+def calcular_indicadores(fluxos, taxa_desconto_anual) -> dict:
+    """
+    VPL, TIR, exposição máxima e payback de um ou vários fluxos mensais.
+
+    Args:
+        fluxos: Vetor (T,) ou matriz (n, T) de fluxos mensais.
+        taxa_desconto_anual: Taxa mínima de atratividade em % a.a.
+
+    Returns:
+        Dicionário de vetores (n,): `vpl`, `tir_mensal`, `tir_anual` (em %),
+        `exposicao_maxima` (R$, positivo) e `payback` (mês a partir do qual o
+        acumulado fica não negativo; NaN se nunca ocorre).
+    """
+    fluxos = np.atleast_2d(np.asarray(fluxos, dtype=float))
+    acumulado = np.cumsum(fluxos, axis=1)
+
+    tir_mensal = calcular_tir(fluxos)
+    negativo = acumulado < 0
+    # Último mês com acumulado negativo (-1 se nunca negativo)
+    ultimo_negativo = np.where(
+        negativo.any(axis=1),
+        fluxos.shape[1] - 1 - np.argmax(negativo[:, ::-1], axis=1),
+        -1
+    )
+    payback = np.where(
+        negativo[:, -1], np.nan, (ultimo_negativo + 2).astype(float)
+    )
+
+    return {
+        'vpl': calcular_vpl(fluxos, taxa_mensal(taxa_desconto_anual)),
+        'tir_mensal': tir_mensal * 100,
+        'tir_anual': ((1 + tir_mensal) ** 12 - 1) * 100,
+        'exposicao_maxima': np.maximum(-acumulado.min(axis=1), 0.0),
+        'payback': payback
+    }
@@ -0,0 +1,176 @@
+# src/formatacao.py
+
+import decimal
+import re
+from functools import lru_cache
+from html import escape
+
+LOCALE_PADRAO = 'pt_BR'
+MOEDA_PADRAO = 'BRL'
+
+
+class _Padrao:
+    """Prefixos, sufixos e precisões de um `NumberPattern` do babel, resolvidos uma vez."""
+
+    def __init__(self, padrao, moeda: str, simbolo_moeda: str, frac_prec: tuple):
+        if padrao.exp_prec or '@' in padrao.pattern or padrao.scale or '¤¤' in padrao.pattern:
+            raise ValueError(f"Padrão numérico não suportado: {padrao.pattern!r}")
+
+        def resolver(texto):
+            # Mesmas substituições que o babel aplica ao texto final
+            if moeda is not None:
+                texto = texto.replace('¤', simbolo_moeda)
+            return re.sub(r"'([^']*)'", lambda m: m.group(1) or "'", texto)
+
+        self.prefixos = tuple(resolver(p) for p in padrao.prefix)
+        self.sufixos = tuple(resolver(s) for s in padrao.suffix)
+        self.digitos_inteiros = padrao.int_prec[0]
+        self.grupo_primario, self.grupo_secundario = padrao.grouping
+        self.frac_min, self.frac_max = frac_prec
+        self.quantum = decimal.Decimal(1).scaleb(-frac_prec[1])
+
+
+class FormatadorNumeros:
+    """
+    Formatação de moeda e números com os símbolos e padrões de um locale.
+
+    `babel.numbers.format_currency`/`format_decimal` resolvem locale, padrão e
+    símbolos a cada chamada; aqui isso é feito uma vez no construtor, e cada
+    valor passa só pelo arredondamento (Decimal, meio-para-par) e pelo
+    agrupamento. O texto produzido é idêntico, byte a byte, ao do babel com os
+    argumentos padrão.
+    """
+
+    def __init__(self, locale: str = LOCALE_PADRAO, moeda: str = MOEDA_PADRAO):
+        from babel import Locale
+        from babel.numbers import (
+            get_currency_precision, get_currency_symbol, get_decimal_symbol,
+            get_group_symbol, get_infinity_symbol
+        )
+
+        loc = Locale.parse(locale)
+        self.locale = str(loc)
+        self.codigo_moeda = moeda
+        self.simbolo_decimal = get_decimal_symbol(loc)
+        self.simbolo_grupo = get_group_symbol(loc)
+        self.simbolo_infinito = get_infinity_symbol(loc)
+
+        padrao_decimal = loc.decimal_formats[None]
+        padrao_moeda = loc.currency_formats['standard']
+        precisao = get_currency_precision(moeda)
+        self._decimal = _Padrao(padrao_decimal, None, None, padrao_decimal.frac_prec)
+        self._moeda = _Padrao(padrao_moeda, moeda, get_currency_symbol(moeda, loc), (precisao, precisao))
+
+    def _formatar(self, valor, p: _Padrao) -> str:
+        if not isinstance(valor, decimal.Decimal):
+            valor = decimal.Decimal(str(valor))
+        negativo = int(valor.is_signed())
+        valor = abs(valor).normalize()
+
+        if valor.is_infinite():
+            numero = self.simbolo_infinito
+        else:
+            inteiro, _, fracao = f"{valor.quantize(p.quantum):f}".partition('.')
+
+            if len(inteiro) < p.digitos_inteiros:
+                inteiro = '0' * (p.digitos_inteiros - len(inteiro)) + inteiro
+            if len(inteiro) > p.grupo_primario:
+                grupos = [inteiro[-p.grupo_primario:]]
+                inteiro = inteiro[:-p.grupo_primario]
+                while len(inteiro) > p.grupo_secundario:
+                    grupos.append(inteiro[-p.grupo_secundario:])
+                    inteiro = inteiro[:-p.grupo_secundario]
+                grupos.append(inteiro)
+                inteiro = self.simbolo_grupo.join(reversed(grupos))
+
+            fracao = fracao or '0'
+            if len(fracao) < p.frac_min:
+                fracao += '0' * (p.frac_min - len(fracao))
+            if p.frac_max == 0 or (p.frac_min == 0 and int(fracao) == 0):
+                numero = inteiro
+            else:
+                fracao = fracao.rstrip('0')
+                if len(fracao) < p.frac_min:
+                    fracao += '0' * (p.frac_min - len(fracao))
+                numero = inteiro + self.simbolo_decimal + fracao
+
+        return p.prefixos[negativo] + numero + p.sufixos[negativo]
+
+    def moeda(self, valor) -> str:
+        """Equivale a `format_currency(valor, moeda, locale=locale)`."""
+        return self._formatar(valor, self._moeda)
+
+    def decimal(self, valor) -> str:
+        """Equivale a `format_decimal(valor, locale=locale)`."""
+        return self._formatar(valor, self._decimal)
+
+    def moedas(self, valores) -> list:
+        """Formata uma coluna inteira (lista, Series ou array) como moeda."""
+        p = self._moeda
+        return [self._formatar(v, p) for v in valores]
+
+    def decimais(self, valores) -> list:
+        """Formata uma coluna inteira (lista, Series ou array) como decimal."""
+        p = self._decimal
+        return [self._formatar(v, p) for v in valores]
+
+
+@lru_cache(maxsize=None)
+def obter_formatador(locale: str = LOCALE_PADRAO, moeda: str = MOEDA_PADRAO) -> FormatadorNumeros:
+    """Formatador compartilhado por processo para o par (locale, moeda)."""
+    return FormatadorNumeros(locale, moeda)
+
+
+def formatar_moeda(valor) -> str:
+    return obter_formatador().moeda(valor)
+
+
+def formatar_decimal(valor) -> str:
+    return obter_formatador().decimal(valor)
+
+
+def formatar_percentual(valor, casas: int = 2) -> str:
+    """Percentual com `casas` decimais (ex.: '12,35%'); '—' para NaN."""
+    if valor != valor:
+        return '—'
+    return obter_formatador().decimal(round(valor, casas)) + '%'
+
+
+# --- Cards de resultado ---
+
+def classe_sinal(valor) -> str:
+    """Classe CSS do card conforme o sinal do valor."""
+    return "positive" if valor > 0 else "negative" if valor < 0 else "neutral"
+
+
+_CARD = '<div class="card {classe}"><div class="card-title">{titulo}</div><div class="card-metric">{valor}</div></div>'
+
+
+def renderizar_cards(cards, colunas: int = None) -> str:
+    """
+    HTML de uma grade de cards, para um único `st.markdown(..., unsafe_allow_html=True)`.
+
+    Args:
+        cards: Sequência de (título, valor já formatado, classe) com classe
+            'positive', 'negative' ou 'neutral'.
+        colunas: Cards por linha; padrão, todos em uma linha.
+    """
+    cards = list(cards)
+    corpo = ''.join(
+        _CARD.format(classe=classe, titulo=escape(titulo), valor=escape(valor))
+        for titulo, valor, classe in cards
+    )
+    return f'<div class="grade-cards" style="--colunas: {colunas or len(cards)}">{corpo}</div>'
+
+
+def renderizar_grade(secoes) -> str:
+    """
+    HTML de várias seções de cards, cada uma com seu título, separadas por linhas.
+
+    Args:
+        secoes: Sequência de (título da seção, cards), com `cards` no formato
+            de `renderizar_cards`.
+    """
+    return '<hr>'.join(
+        f'<h2>{escape(titulo)}</h2>{renderizar_cards(cards)}' for titulo, cards in secoes
+    )
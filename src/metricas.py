@@ -0,0 +1,195 @@
+# src/metricas.py
+
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.cache_calculos import cache_resultados
+
+# Desligado por padrão; com VIABILIDADE_METRICAS=1 as páginas e o banco registram tempos
+ATIVO = os.environ.get('VIABILIDADE_METRICAS', '0') == '1'
+
+# Opcional: arquivo JSON regravado no máximo a cada `INTERVALO_ARQUIVO` segundos
+ARQUIVO = os.environ.get('VIABILIDADE_METRICAS_ARQUIVO')
+INTERVALO_ARQUIVO = 10.0
+
+# Opcional: porta de um servidor HTTP com /metrics (Prometheus) e /metrics.json
+PORTA = os.environ.get('VIABILIDADE_METRICAS_PORTA')
+
+
+class Metricas:
+    """
+    Contagem, soma e máximo de durações por série, seguro entre threads.
+
+    Cada série é identificada por um nome e rótulos, por exemplo
+    ('fase', {'pagina': 'entrada', 'fase': 'calculo'}).
+    """
+
+    def __init__(self):
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, nome: str, duracao: float, **rotulos):
+        chave = (nome, tuple(sorted(rotulos.items())))
+        with self._lock:
+            serie = self._series.get(chave)
+            if serie is None:
+                self._series[chave] = [1, duracao, duracao]
+            else:
+                serie[0] += 1
+                serie[1] += duracao
+                if duracao > serie[2]:
+                    serie[2] = duracao
+
+    def limpar(self):
+        with self._lock:
+            self._series.clear()
+
+    def series(self) -> list:
+        """Lista de dicionários com `nome`, `rotulos`, `contagem`, `soma_segundos` e `max_segundos`."""
+        with self._lock:
+            itens = [(k, list(v)) for k, v in self._series.items()]
+        return [
+            {'nome': nome, 'rotulos': dict(rotulos), 'contagem': c, 'soma_segundos': s, 'max_segundos': m}
+            for (nome, rotulos), (c, s, m) in sorted(itens)
+        ]
+
+
+metricas = Metricas()
+
+
+# --- Fases de uma execução da página ---
+
+class Execucao:
+    """
+    Cronômetro de uma execução (rerun) de página.
+
+    `marcar(fase)` atribui à fase o tempo decorrido desde a marca anterior,
+    então basta chamá-lo ao fim de cada trecho, sem reindentar a página.
+    """
+
+    def __init__(self, pagina: str):
+        self.pagina = pagina
+        self.inicio = self._ultima = time.perf_counter()
+
+    def marcar(self, fase: str):
+        agora = time.perf_counter()
+        metricas.registrar('fase', agora - self._ultima, pagina=self.pagina, fase=fase)
+        self._ultima = agora
+
+    def finalizar(self):
+        metricas.registrar('execucao', time.perf_counter() - self.inicio, pagina=self.pagina)
+        _gravar_arquivo_periodico()
+
+
+class _ExecucaoInativa:
+    def marcar(self, fase: str):
+        pass
+
+    def finalizar(self):
+        pass
+
+
+def iniciar_execucao(pagina: str):
+    """Cronômetro da execução atual; sem custo quando as métricas estão desligadas."""
+    if not ATIVO:
+        return _ExecucaoInativa()
+    iniciar_servidor()
+    return Execucao(pagina)
+
+
+# --- Consultas ao banco ---
+
+def instrumentar_engine(engine):
+    """Registra a latência de cada comando SQL do engine, por tipo (SELECT, INSERT...)."""
+    if not ATIVO:
+        return
+    from sqlalchemy import event
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_inicios_consulta', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _depois(conn, cursor, statement, parameters, context, executemany):
+        duracao = time.perf_counter() - conn.info['_inicios_consulta'].pop()
+        tipo = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'OUTRO'
+        metricas.registrar('consulta', duracao, tipo=tipo)
+
+
+# --- Exportação ---
+
+def exportar_json() -> dict:
+    return {
+        'series': metricas.series(),
+        'cache': cache_resultados.estatisticas(),
+    }
+
+
+def metricas_prometheus(prefixo: str = 'viabilidade') -> str:
+    """Séries e estatísticas do cache no formato texto do Prometheus."""
+    linhas = []
+    declaradas = set()
+    for serie in metricas.series():
+        nome = f"{prefixo}_{serie['nome']}_segundos"
+        if nome not in declaradas:
+            linhas.append(f"# TYPE {nome} summary")
+            linhas.append(f"# TYPE {nome}_max gauge")
+            declaradas.add(nome)
+        rotulos = ','.join(f'{k}="{v}"' for k, v in serie['rotulos'].items())
+        rotulos = f"{{{rotulos}}}" if rotulos else ''
+        linhas.append(f"{nome}_count{rotulos} {serie['contagem']}")
+        linhas.append(f"{nome}_sum{rotulos} {serie['soma_segundos']}")
+        linhas.append(f"{nome}_max{rotulos} {serie['max_segundos']}")
+    return "\n".join(linhas) + "\n" + cache_resultados.metricas_prometheus(f"{prefixo}_cache")
+
+
+_ultima_gravacao = 0.0
+
+
+def _gravar_arquivo_periodico():
+    global _ultima_gravacao
+    if not ARQUIVO or time.monotonic() - _ultima_gravacao < INTERVALO_ARQUIVO:
+        return
+    _ultima_gravacao = time.monotonic()
+    temporario = f"{ARQUIVO}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(exportar_json(), arquivo)
+    os.replace(temporario, ARQUIVO)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/metrics':
+            corpo, tipo = metricas_prometheus().encode(), 'text/plain; version=0.0.4'
+        elif self.path == '/metrics.json':
+            corpo, tipo = json.dumps(exportar_json()).encode(), 'application/json'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+_servidor = None
+_lock_servidor = threading.Lock()
+
+
+def iniciar_servidor(porta: int = None):
+    """Sobe (uma vez por processo) o servidor HTTP de métricas, se houver porta configurada."""
+    global _servidor
+    porta = porta or PORTA
+    if _servidor is not None or not porta:
+        return
+    with _lock_servidor:
+        if _servidor is None:
+            _servidor = ThreadingHTTPServer(('0.0.0.0', int(porta)), _Handler)
+            threading.Thread(target=_servidor.serve_forever, daemon=True).start()
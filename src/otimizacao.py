@@ -0,0 +1,220 @@
+# src/otimizacao.py
+
+import numpy as np
+
+from src.calculos_lote import custos_indiretos_df, verificar_colunas
+from src.fluxo_caixa import (
+    CURVA_OBRA_PADRAO, CURVA_VENDAS_PADRAO, calcular_indicadores, calcular_vpl, curva_s, taxa_mensal
+)
+
+# Variáveis resolvidas para uma margem-alvo. As três primeiras dão o mínimo
+# necessário; as duas últimas, o máximo admissível.
+VARIAVEIS = {
+    'preco_medio_vendas': 'Preço Médio de Vendas mínimo (R$/m²)',
+    'indice_aproveitamento': 'Índice de Aproveitamento mínimo',
+    'relacao_privativa_construida': 'Relação AP/AC mínima',
+    'custo_direto_construcao_m2': 'Custo Direto máximo (R$/m²)',
+    'preco_terreno': 'Preço máximo do Terreno (R$)',
+}
+
+ITERACOES_BISSECAO = 60
+
+# Precisão (R$/m²) da bisseção do preço para a TIR-alvo
+PRECISAO_PRECO = 0.001
+
+
+def resolver_margem(
+    variavel: str,
+    margem_alvo,
+    area_terreno,
+    indice_aproveitamento,
+    relacao_privativa_construida,
+    preco_medio_vendas,
+    custo_direto_construcao_m2,
+    total_percentual_custos_indiretos,
+    total_custos_monetarios=0.0
+) -> np.ndarray:
+    """
+    Valor de `variavel` que leva a margem de lucro exatamente a `margem_alvo` (%).
+
+    Com pct = percentual indireto total, C = custo direto por m² e M = custos
+    monetários, a margem é
+
+        margem = (100 - pct) - 100·C/(R·P) - 100·M/(A·I·P)
+
+    que é linear em 1/P, 1/I, 1/R, C e M; cada variável tem solução fechada.
+    `preco_terreno` é um custo monetário adicional: o valor máximo que se
+    pode pagar pelo terreno mantendo a margem-alvo.
+
+    Todos os argumentos numéricos aceitam escalares ou vetores (um terreno
+    por posição), de modo que uma carteira inteira é resolvida de uma vez.
+
+    Returns:
+        Vetor com a solução por terreno; NaN onde a meta é inatingível (por
+        exemplo, margem-alvo acima de 100 - pct, ou custo máximo negativo).
+    """
+    if variavel not in VARIAVEIS:
+        raise ValueError(f"Variável desconhecida: {variavel}")
+
+    m, a, i, r, p, c, pct, mon = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (
+        margem_alvo, area_terreno, indice_aproveitamento, relacao_privativa_construida,
+        preco_medio_vendas, custo_direto_construcao_m2, total_percentual_custos_indiretos,
+        total_custos_monetarios
+    )))
+    folga = (100 - pct - m) / 100   # fração do VGV que sobra para custos diretos e monetários
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if variavel == 'preco_medio_vendas':
+            solucao = (c / r + mon / (a * i)) / folga
+            valida = (folga > 0) & (r > 0) & (a > 0) & (i > 0)
+        elif variavel == 'indice_aproveitamento':
+            solucao = mon / (a * (p * folga - c / r))
+            valida = (p * folga - c / r > 0) & (r > 0) & (a > 0)
+        elif variavel == 'relacao_privativa_construida':
+            solucao = c / (p * folga - mon / (a * i))
+            valida = (p * folga - mon / (a * i) > 0) & (a > 0) & (i > 0)
+        elif variavel == 'custo_direto_construcao_m2':
+            solucao = r * (p * folga - mon / (a * i))
+            valida = (solucao >= 0) & (a > 0) & (i > 0)
+        else:
+            vgv = p * a * i
+            solucao = vgv * folga - (a * i / r) * c - mon
+            valida = (solucao >= 0) & (r > 0)
+
+    return np.where(valida, solucao, np.nan)
+
+
+def bissecao(
+    funcao, alvo, baixo, alto, iteracoes: int = ITERACOES_BISSECAO, tolerancia: float = 0.0
+) -> np.ndarray:
+    """
+    Resolve `funcao(x) = alvo` por bisseção vetorizada, com `funcao` crescente em x.
+
+    `funcao` recebe e devolve vetores; todos os terrenos avançam juntos, uma
+    avaliação do motor por iteração. Para antes de `iteracoes` quando todos
+    os intervalos ficam menores que `tolerancia`. Onde a meta não está entre
+    `funcao(baixo)` e `funcao(alto)` o resultado é NaN.
+    """
+    baixo, alto, alvo = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (baixo, alto, alvo)))
+    baixo, alto = baixo.copy(), alto.copy()
+    valida = (funcao(baixo) <= alvo) & (funcao(alto) >= alvo)
+    for _ in range(iteracoes):
+        if np.all(alto - baixo <= tolerancia):
+            break
+        meio = (baixo + alto) / 2
+        acima = funcao(meio) >= alvo
+        alto = np.where(acima, meio, alto)
+        baixo = np.where(acima, baixo, meio)
+    return np.where(valida, alto, np.nan)
+
+
+def preco_minimo_para_tir(
+    tir_alvo_anual,
+    area_terreno,
+    indice_aproveitamento,
+    relacao_privativa_construida,
+    custo_direto_construcao_m2,
+    total_percentual_custos_indiretos,
+    total_custos_monetarios,
+    duracao_projeto: int,
+    curva_vendas: dict = None,
+    curva_obra: dict = None,
+    preco_maximo: float = 100_000.0
+) -> np.ndarray:
+    """
+    Menor preço médio de vendas (R$/m²) cuja TIR anual atinge `tir_alvo_anual` (%).
+
+    O VPL à taxa-alvo é linear no preço, então o preço que o zera tem
+    solução fechada. Onde o fluxo nesse preço é convencional (todos os meses
+    negativos antes de todos os positivos), o VPL tem uma única raiz e a TIR
+    é exatamente a taxa-alvo: o preço é a resposta. Nos demais terrenos a
+    TIR não tem solução fechada e usa-se `bissecao` sobre o preço, até
+    `PRECISAO_PRECO`. Mesmas curvas de `gerar_fluxo_caixa`.
+
+    Returns:
+        Vetor com o preço por terreno; NaN onde nem `preco_maximo` atinge a
+        meta (por exemplo, percentual indireto de 100% ou mais).
+    """
+    a, i, r, c, pct, mon, alvo = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (
+        area_terreno, indice_aproveitamento, relacao_privativa_construida,
+        custo_direto_construcao_m2, total_percentual_custos_indiretos,
+        total_custos_monetarios, tir_alvo_anual
+    )))
+    vendas = curva_s(horizonte=duracao_projeto, **(curva_vendas or CURVA_VENDAS_PADRAO))
+    obra = curva_s(horizonte=duracao_projeto, **(curva_obra or CURVA_OBRA_PADRAO))
+
+    area_privativa = np.where(r > 0, a * i, 0.0)
+    custo_direto_total = np.divide(area_privativa, r, out=np.zeros_like(a), where=r > 0) * c
+    custos_fixos = custo_direto_total.reshape(-1, 1) * obra
+    custos_fixos[:, 0] += mon.reshape(-1)
+    receita_liquida = (area_privativa * (1 - pct / 100)).reshape(-1, 1) * vendas
+    alvo = alvo.reshape(-1)
+
+    # Com percentual indireto de 100% ou mais nenhum preço paga os custos
+    sem_receita = (pct >= 100).reshape(-1)
+
+    # Preço que zera o VPL à taxa-alvo
+    taxa = taxa_mensal(alvo)
+    vpl_receita = calcular_vpl(receita_liquida, taxa)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        preco = np.where(vpl_receita > 0, calcular_vpl(custos_fixos, taxa) / vpl_receita, np.nan)
+
+    fluxos = np.nan_to_num(preco).reshape(-1, 1) * receita_liquida - custos_fixos
+    negativo, positivo = fluxos < 0, fluxos > 0
+    ultimo_negativo = fluxos.shape[1] - 1 - np.argmax(negativo[:, ::-1], axis=1)
+    convencional = (
+        (preco >= 0) & ~sem_receita & negativo.any(axis=1) & positivo.any(axis=1)
+        & (ultimo_negativo < np.argmax(positivo, axis=1))
+    )
+    resultado = np.where(preco <= preco_maximo, preco, np.nan)
+
+    resto = np.flatnonzero(~convencional)
+    if resto.size:
+        def tir(precos):
+            fluxos = precos.reshape(-1, 1) * receita_liquida[resto] - custos_fixos[resto]
+            valores = calcular_indicadores(fluxos, 0.0)['tir_anual']
+            # Sem TIR (fluxo sem troca de sinal): só conta como meta atingida se
+            # nenhum mês fica negativo; do contrário, o dinheiro nunca volta
+            atingida = (fluxos >= 0).all(axis=1) & (fluxos > 0).any(axis=1) & ~sem_receita[resto]
+            return np.where(np.isnan(valores), np.where(atingida, np.inf, -np.inf), valores)
+
+        resultado[resto] = bissecao(tir, alvo[resto], 0.0, preco_maximo, tolerancia=PRECISAO_PRECO)
+
+    return resultado.reshape(a.shape)
+
+
+def otimizar_terrenos_df(
+    terrenos,
+    variavel: str,
+    margem_alvo: float,
+    custos_indiretos_data: list = None,
+    custos_indiretos_monetarios: dict = None
+):
+    """
+    Aplica `resolver_margem` a todas as linhas de um DataFrame de terrenos.
+
+    Mesmas colunas e regras de custos indiretos de `calculos_lote.calcular_terrenos_df`;
+    a coluna opcional `margem_alvo` tem precedência sobre o argumento.
+
+    Returns:
+        Uma cópia do DataFrame com a coluna `otimo_<variavel>`.
+    """
+    verificar_colunas(terrenos)
+    percentuais, monetarios = custos_indiretos_df(terrenos, custos_indiretos_data, custos_indiretos_monetarios)
+
+    if 'margem_alvo' in terrenos.columns:
+        margem_alvo = terrenos['margem_alvo'].to_numpy(dtype=float)
+
+    saida = terrenos.copy()
+    saida[f"otimo_{variavel}"] = resolver_margem(
+        variavel,
+        margem_alvo,
+        terrenos['area_terreno'].to_numpy(dtype=float),
+        terrenos['indice_aproveitamento'].to_numpy(dtype=float),
+        terrenos['relacao_privativa_construida'].to_numpy(dtype=float),
+        terrenos['preco_medio_vendas'].to_numpy(dtype=float),
+        terrenos['custo_direto_construcao_m2'].to_numpy(dtype=float),
+        percentuais,
+        monetarios
+    )
+    return saida
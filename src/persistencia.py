@@ -0,0 +1,414 @@
+# src/persistencia.py
+
+import atexit
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import count
+from typing import NamedTuple
+
+from src.banco_dados import (
+    TAMANHO_PAGINA, carregar_viabilidade, listar_viabilidades, salvar_versao, salvar_versoes
+)
+from src.eventos import obter_barramento
+from src.metricas import ATIVO, metricas
+
+# Projetos distintos aguardando gravação; acima disso `enviar` espera (ou falha)
+CAPACIDADE_FILA = 256
+
+# Gravações confirmadas numa mesma transação
+TAMANHO_LOTE = 32
+
+# Espera, em segundos, para juntar gravações de várias sessões num mesmo lote
+JANELA_LOTE = 0.05
+
+# Threads para leituras antecipadas (pré-carga)
+LEITORES = 4
+
+# Tempo máximo, ao encerrar o processo, para esvaziar a fila
+ESPERA_ENCERRAMENTO = 10.0
+
+# Páginas da listagem de projetos mantidas em memória (as menos usadas saem primeiro)
+PAGINAS_EM_CACHE = 512
+
+
+# --- Gravação em segundo plano ---
+
+class GravadorAssincrono:
+    """
+    Fila limitada de gravações (`salvar_versao`) esvaziada por uma thread própria.
+
+    `enviar` retorna um `Future` e não espera o banco. Gravações do mesmo
+    projeto ainda não iniciadas são coalescidas: vale o conteúdo mais
+    recente, e todos os `Future` recebem o mesmo resultado. A thread grava
+    em lotes de até `tamanho_lote` projetos por transação; se o lote falha,
+    cada projeto é regravado sozinho, para que um erro não derrube os demais.
+    """
+
+    def __init__(
+        self,
+        engine,
+        capacidade: int = CAPACIDADE_FILA,
+        tamanho_lote: int = TAMANHO_LOTE,
+        janela: float = JANELA_LOTE
+    ):
+        self.engine = engine
+        self.capacidade = capacidade
+        self.tamanho_lote = tamanho_lote
+        self.janela = janela
+        self._pendentes = OrderedDict()   # nome_terreno -> [dados, [futures]]
+        self._em_gravacao = 0
+        self._cond = threading.Condition()
+        self._thread = None
+        self.enviadas = 0
+        self.coalescidas = 0
+        self.lotes = 0
+        self.gravadas = 0
+        self.falhas = 0
+
+    def enviar(self, nome_terreno: str, dados: dict, timeout: float = None) -> Future:
+        """
+        Agenda a gravação e retorna o `Future` do resultado de `salvar_versao`.
+
+        Com a fila cheia, espera até `timeout` segundos por espaço (None:
+        indefinidamente) e então levanta `queue.Full`.
+        """
+        futuro = Future()
+        with self._cond:
+            if nome_terreno not in self._pendentes:
+                if not self._cond.wait_for(lambda: len(self._pendentes) < self.capacidade, timeout):
+                    raise queue.Full("Fila de gravação cheia.")
+            self.enviadas += 1
+            item = self._pendentes.get(nome_terreno)
+            if item is None:
+                self._pendentes[nome_terreno] = [dados, [futuro]]
+            else:
+                item[0] = dados
+                item[1].append(futuro)
+                self.coalescidas += 1
+            self._iniciar()
+            self._cond.notify_all()
+        return futuro
+
+    def aguardar(self, timeout: float = None) -> bool:
+        """Espera a fila esvaziar e o lote em andamento terminar; False se o tempo acabar."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pendentes and not self._em_gravacao, timeout)
+
+    def estatisticas(self) -> dict:
+        with self._cond:
+            pendentes = len(self._pendentes)
+        return {
+            'pendentes': pendentes,
+            'enviadas': self.enviadas,
+            'coalescidas': self.coalescidas,
+            'lotes': self.lotes,
+            'gravadas': self.gravadas,
+            'falhas': self.falhas,
+        }
+
+    def _iniciar(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._executar, name='viabilidade-gravador', daemon=True)
+            self._thread.start()
+
+    def _executar(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pendentes)
+            # Janela curta para que saves simultâneos de outras sessões entrem no mesmo lote
+            if self.janela:
+                time.sleep(self.janela)
+            with self._cond:
+                lote = []
+                while self._pendentes and len(lote) < self.tamanho_lote:
+                    nome, (dados, futuros) = self._pendentes.popitem(last=False)
+                    lote.append((nome, dados, futuros))
+                self._em_gravacao = len(lote)
+                self._cond.notify_all()   # libera quem espera por espaço na fila
+
+            inicio = time.perf_counter()
+            self._gravar(lote)
+            if ATIVO:
+                metricas.registrar('lote_gravacao', time.perf_counter() - inicio)
+
+            with self._cond:
+                self._em_gravacao = 0
+                self._cond.notify_all()
+
+    def _gravar(self, lote):
+        self.lotes += 1
+        try:
+            resultados = salvar_versoes(self.engine, [(nome, dados) for nome, dados, _ in lote])
+        except Exception:
+            resultados = None
+
+        for i, (nome, dados, futuros) in enumerate(lote):
+            if resultados is not None:
+                resultado, erro = resultados[i], None
+            else:
+                try:
+                    resultado, erro = salvar_versao(self.engine, nome, dados), None
+                except Exception as e:
+                    resultado, erro = None, e
+
+            if erro is None:
+                self.gravadas += 1
+            else:
+                self.falhas += 1
+            for futuro in futuros:
+                if erro is None:
+                    futuro.set_result(resultado)
+                else:
+                    futuro.set_exception(erro)
+
+
+_gravadores = {}
+_lock = threading.Lock()
+
+
+def obter_gravador(engine) -> GravadorAssincrono:
+    """Gravador compartilhado do processo para `engine` (criado na primeira chamada)."""
+    gravador = _gravadores.get(engine)
+    if gravador is None:
+        with _lock:
+            gravador = _gravadores.get(engine)
+            if gravador is None:
+                gravador = _gravadores[engine] = GravadorAssincrono(engine)
+    return gravador
+
+
+@atexit.register
+def _esvaziar_filas():
+    for gravador in list(_gravadores.values()):
+        gravador.aguardar(ESPERA_ENCERRAMENTO)
+
+
+# --- Leitura antecipada ---
+
+# Geração de cada projeto, renovada a cada aviso de alteração (`src.eventos`),
+# inclusive de gravações feitas por outros processos; uma pré-carga feita antes
+# de uma alteração do mesmo projeto é descartada. Um aviso sem projetos
+# renova a geração de todos.
+_contador = count(1)
+_geracoes = {}
+_geracao_geral = 0
+_acompanhados = set()
+_executor = None
+
+
+def marcar_alterada(id_viabilidade: int):
+    with _lock:
+        _geracoes[id_viabilidade] = next(_contador)
+
+
+def _registrar_alteracoes(alteracoes):
+    global _geracao_geral
+    if alteracoes is None:
+        with _lock:
+            _geracao_geral = next(_contador)
+        return
+    for alteracao in alteracoes:
+        marcar_alterada(alteracao.id_viabilidade)
+
+
+def _acompanhar(engine):
+    if engine not in _acompanhados:
+        with _lock:
+            if engine in _acompanhados:
+                return
+            _acompanhados.add(engine)
+        obter_barramento(engine).inscrever(_registrar_alteracoes)
+
+
+def _geracao(id_viabilidade: int) -> int:
+    return max(_geracao_geral, _geracoes.get(id_viabilidade, 0))
+
+
+def _obter_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=LEITORES, thread_name_prefix='viabilidade-leitura')
+    return _executor
+
+
+class PreCarga(NamedTuple):
+    id_viabilidade: int
+    geracao: int
+    futuro: Future
+
+
+def pre_carregar(engine, id_viabilidade: int, anterior: PreCarga = None) -> PreCarga:
+    """
+    Inicia, em segundo plano, a leitura dos `dados` atuais do projeto.
+
+    Reaproveita `anterior` se for do mesmo projeto e nenhuma gravação o
+    tiver alterado desde então.
+    """
+    _acompanhar(engine)
+    geracao = _geracao(id_viabilidade)
+    if anterior is not None and anterior.id_viabilidade == id_viabilidade and anterior.geracao == geracao:
+        return anterior
+    futuro = _obter_executor().submit(carregar_viabilidade, engine, id_viabilidade)
+    return PreCarga(id_viabilidade, geracao, futuro)
+
+
+def dados_pre_carregados(engine, pre_carga: PreCarga, timeout: float = None):
+    """`dados` da pré-carga, esperando se ainda não chegaram; relê se ficaram obsoletos."""
+    pre_carga = pre_carregar(engine, pre_carga.id_viabilidade, pre_carga)
+    return pre_carga.futuro.result(timeout)
+
+
+# --- Listagem de projetos ---
+
+def _corresponde(termo: str, modo: str, nome: str):
+    """Se `nome` entra na busca de `listar_viabilidades`; None se só o banco sabe."""
+    if not termo:
+        return True
+    # lower() do SQLite só trata ASCII; fora disso a comparação fica com o banco
+    if not (termo.isascii() and nome.isascii()):
+        return None
+    termo, nome = termo.lower(), nome.lower()
+    return termo in nome if modo == 'contem' else nome.startswith(termo)
+
+
+class ListagemEmCache:
+    """
+    Páginas de `listar_viabilidades` mantidas até que uma gravação as altere.
+
+    Não há prazo de validade: o cache se inscreve nos avisos de alteração
+    (`src.eventos`) e, a cada projeto novo, o insere nas páginas em cache cuja
+    faixa de cursores o contém, ajustando o cursor da página seguinte.
+    Atualizações de projetos existentes não mudam a listagem (id, nome e
+    data de criação) e são ignoradas; um aviso sem projetos esvazia o cache.
+
+    Sessões que pedem a mesma página ausente esperam uma única consulta ao
+    banco, em vez de cada uma repetir a sua.
+    """
+
+    def __init__(self, engine, limite: int = TAMANHO_PAGINA, capacidade: int = PAGINAS_EM_CACHE):
+        self.engine = engine
+        self.limite = limite
+        self.capacidade = capacidade
+        self._paginas = OrderedDict()   # (termo, modo, cursor) -> (itens, proximo)
+        self._consultas = {}            # (termo, modo, cursor) -> Future
+        self._versao = 0
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.consultas = 0
+        self.atualizadas = 0
+        obter_barramento(engine).inscrever(self._aplicar)
+
+    def pagina(self, termo: str = None, modo: str = 'prefixo', cursor: tuple = None) -> tuple:
+        """Mesmo retorno de `listar_viabilidades(engine, termo, modo, cursor)`."""
+        chave = (termo or '', modo, tuple(cursor) if cursor is not None else None)
+        with self._lock:
+            pagina = self._paginas.get(chave)
+            if pagina is not None:
+                self._paginas.move_to_end(chave)
+                self.acertos += 1
+                return pagina
+            futuro = self._consultas.get(chave)
+            responsavel = futuro is None
+            if responsavel:
+                futuro = self._consultas[chave] = Future()
+                versao = self._versao
+        if not responsavel:
+            return futuro.result()
+
+        try:
+            pagina = listar_viabilidades(self.engine, termo=termo, modo=modo, apos=cursor, limite=self.limite)
+        except Exception as e:
+            with self._lock:
+                del self._consultas[chave]
+            futuro.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._consultas[chave]
+            self.consultas += 1
+            # Um aviso chegado durante a consulta pode não estar no resultado
+            if self._versao == versao:
+                self._paginas[chave] = pagina
+                if len(self._paginas) > self.capacidade:
+                    self._paginas.popitem(last=False)
+        futuro.set_result(pagina)
+        return pagina
+
+    def limpar(self):
+        self._aplicar(None)
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            paginas = len(self._paginas)
+        return {
+            'paginas': paginas,
+            'acertos': self.acertos,
+            'consultas': self.consultas,
+            'atualizadas': self.atualizadas,
+        }
+
+    def _aplicar(self, alteracoes):
+        if alteracoes is not None:
+            alteracoes = [a for a in alteracoes if a.nova]
+            if not alteracoes:
+                return
+        with self._lock:
+            self._versao += 1
+            if alteracoes is None:
+                self._paginas.clear()
+                return
+            for chave, pagina in list(self._paginas.items()):
+                pagina = self._inserir(chave, pagina, alteracoes)
+                if pagina is None:
+                    del self._paginas[chave]
+                else:
+                    self._paginas[chave] = pagina
+
+    def _inserir(self, chave, pagina, alteracoes):
+        """A página com os projetos novos que caem na sua faixa; None se precisa reler."""
+        termo, modo, cursor = chave
+        itens, proximo = pagina
+        for a in alteracoes:
+            corresponde = _corresponde(termo, modo, a.nome_terreno)
+            if corresponde is False:
+                continue
+            if corresponde is None or a.data_criacao is None:
+                return None
+            posicao = (a.data_criacao, a.id_viabilidade)
+            try:
+                # A página cobre as chaves abaixo do seu cursor e, se há
+                # próxima página, acima do cursor dela (seu último item)
+                if cursor is not None and not posicao < cursor:
+                    continue
+                if proximo is not None and not posicao > tuple(proximo):
+                    continue
+            except TypeError:   # datas com e sem fuso: só o banco ordena
+                return None
+            if any(item['id'] == a.id_viabilidade for item in itens):
+                continue
+            novo = {'id': a.id_viabilidade, 'nome_terreno': a.nome_terreno, 'data_criacao': a.data_criacao}
+            itens = sorted(itens + [novo], key=lambda item: (item['data_criacao'], item['id']), reverse=True)
+            if len(itens) > self.limite:
+                itens = itens[:self.limite]
+                proximo = (itens[-1]['data_criacao'], itens[-1]['id'])
+            self.atualizadas += 1
+        return itens, proximo
+
+
+_listagens = {}
+
+
+def obter_listagem(engine) -> ListagemEmCache:
+    """Listagem em cache compartilhada do processo para `engine`."""
+    listagem = _listagens.get(engine)
+    if listagem is None:
+        with _lock:
+            listagem = _listagens.get(engine)
+            if listagem is None:
+                listagem = _listagens[engine] = ListagemEmCache(engine)
+    return listagem
@@ -0,0 +1,474 @@
+# src/reajuste.py
+"""
+Reajuste mensal de custos e preços por índices (INCC, IGP-M, CUB...).
+
+Uso (na raiz do repositório):
+    python -m src.reajuste projetos.jsonl --indices indices.csv --data-base 2025-01 --inicio 2025-03
+    python -m src.reajuste projeto.json --indices historico.csv --indices focus.csv \
+        --custos CUB --precos IGP-M --data-base 2025-06
+
+Os arquivos de índices são CSV com uma coluna `mes` (AAAA-MM ou MM/AAAA),
+uma coluna por índice com a variação mensal em % e, opcionalmente, uma
+coluna `projetado` (1 para meses de projeção). CSV com ';' usa vírgula
+decimal. Vários arquivos se combinam: valores históricos prevalecem sobre
+projetados e, entre iguais, vale o arquivo listado por último.
+
+As séries são convertidas uma vez em números-índice acumulados (produto
+acumulado das variações) e gravadas em disco; as cargas seguintes abrem os
+arrays por memória mapeada. O fator de um mês é a razão entre dois
+números-índice, de modo que qualquer combinação de data-base, início e
+prazo é resolvida por indexação, para um projeto ou para uma carteira.
+"""
+
+import argparse
+import csv
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+VERSAO_CACHE = 1
+
+PASTA_CACHE = os.environ.get(
+    'VIABILIDADE_INDICES_DIR',
+    os.path.join(tempfile.gettempdir(), 'viabilidade_indices')
+)
+
+# Arquivos (ou pastas com .csv) de índices usados pela interface, separados por os.pathsep
+FONTES = os.environ.get('VIABILIDADE_INDICES', '')
+
+INDICE_CUSTOS_PADRAO = 'INCC'
+
+# Meses usados na taxa de projeção padrão (média geométrica das últimas variações)
+MESES_PROJECAO = 12
+
+_ARRAYS = ('nivel', 'projetado', 'primeiro', 'ultimo', 'taxa_projecao')
+
+
+# --- Meses ---
+
+def mes_ordinal(texto: str) -> int:
+    """'2025-03', '2025-03-01' ou '03/2025' como um inteiro (ano * 12 + mês - 1)."""
+    texto = str(texto).strip()
+    m = re.fullmatch(r'(\d{4})-(\d{1,2})(?:-\d{1,2})?', texto)
+    if m:
+        ano, mes = int(m.group(1)), int(m.group(2))
+    else:
+        m = re.fullmatch(r'(?:\d{1,2}/)?(\d{1,2})/(\d{4})', texto)
+        if not m:
+            raise ValueError(f"Mês inválido: '{texto}'. Use AAAA-MM.")
+        ano, mes = int(m.group(2)), int(m.group(1))
+    if not 1 <= mes <= 12:
+        raise ValueError(f"Mês inválido: '{texto}'.")
+    return ano * 12 + mes - 1
+
+
+def mes_texto(ordinal: int) -> str:
+    return f"{ordinal // 12:04d}-{ordinal % 12 + 1:02d}"
+
+
+# --- Leitura das séries ---
+
+def _numero(texto: str, virgula_decimal: bool):
+    texto = texto.strip()
+    if not texto:
+        return None
+    if virgula_decimal:
+        texto = texto.replace('.', '').replace(',', '.')
+    return float(texto)
+
+
+def ler_indices(caminho: str, numero_indice: bool = False) -> dict:
+    """
+    Séries de um CSV de índices.
+
+    Args:
+        caminho: Arquivo CSV no formato descrito no módulo.
+        numero_indice: Os valores são números-índice (níveis) e não
+            variações mensais; o primeiro mês de cada série serve só de base.
+
+    Returns:
+        Dicionário nome -> lista de (mês ordinal, variação %, projetado).
+    """
+    with open(caminho, encoding='utf-8-sig', newline='') as arquivo:
+        cabecalho = arquivo.readline()
+        virgula_decimal = ';' in cabecalho
+        arquivo.seek(0)
+        leitor = csv.DictReader(arquivo, delimiter=';' if virgula_decimal else ',')
+        campos = {c.strip().lower(): c for c in leitor.fieldnames or []}
+        if 'mes' not in campos:
+            raise ValueError(f"O arquivo '{caminho}' não tem a coluna 'mes'.")
+        coluna_mes = campos['mes']
+        coluna_projetado = campos.get('projetado')
+        nomes = [c for c in leitor.fieldnames if c not in (coluna_mes, coluna_projetado)]
+
+        series = {nome.strip(): [] for nome in nomes}
+        for linha in leitor:
+            mes = mes_ordinal(linha[coluna_mes])
+            projetado = bool(coluna_projetado) and linha[coluna_projetado].strip().lower() in ('1', 'sim', 's', 'true')
+            for nome in nomes:
+                valor = _numero(linha[nome] or '', virgula_decimal)
+                if valor is not None:
+                    series[nome.strip()].append((mes, valor, projetado))
+
+    if numero_indice:
+        for nome, pontos in series.items():
+            pontos.sort()
+            series[nome] = [
+                (mes, (valor / anterior - 1) * 100, projetado)
+                for (mes_anterior, anterior, _), (mes, valor, projetado) in zip(pontos, pontos[1:])
+                if mes == mes_anterior + 1
+            ]
+    return {nome: pontos for nome, pontos in series.items() if pontos}
+
+
+def construir_base(fontes) -> tuple:
+    """
+    Combina as séries dos arquivos e calcula os números-índice acumulados.
+
+    Args:
+        fontes: Sequência de caminhos ou de pares (caminho, numero_indice).
+
+    Returns:
+        Tupla (arrays, meta). `nivel` (k, n + 1) tem o número-índice ao fim de
+        cada mês, com 1 no mês anterior ao início da série; as posições fora
+        de [primeiro, ultimo] são NaN.
+    """
+    combinadas = {}
+    for fonte in fontes:
+        caminho, numero_indice = (fonte, False) if isinstance(fonte, str) else fonte
+        for nome, pontos in ler_indices(caminho, numero_indice).items():
+            serie = combinadas.setdefault(nome, {})
+            for mes, valor, projetado in pontos:
+                atual = serie.get(mes)
+                # Valor histórico não é substituído por projeção
+                if atual is None or not (projetado and not atual[1]):
+                    serie[mes] = (valor, projetado)
+    if not combinadas:
+        raise ValueError("Nenhuma série de índices nos arquivos informados.")
+
+    nomes = sorted(combinadas)
+    inicio = min(min(serie) for serie in combinadas.values())
+    n = max(max(serie) for serie in combinadas.values()) - inicio + 1
+    k = len(nomes)
+
+    variacoes = np.full((k, n), np.nan)
+    projetado = np.zeros((k, n), dtype=bool)
+    for i, nome in enumerate(nomes):
+        meses = np.fromiter(combinadas[nome], dtype=np.int64, count=len(combinadas[nome])) - inicio
+        valores = np.array(list(combinadas[nome].values()), dtype=object)
+        variacoes[i, meses] = valores[:, 0].astype(float)
+        projetado[i, meses] = valores[:, 1].astype(bool)
+
+    nivel = np.full((k, n + 1), np.nan)
+    primeiro = np.empty(k, dtype=np.int64)
+    ultimo = np.empty(k, dtype=np.int64)
+    taxa_projecao = np.empty(k)
+    for i, nome in enumerate(nomes):
+        validos = np.flatnonzero(~np.isnan(variacoes[i]))
+        a, b = validos[0], validos[-1]
+        lacunas = np.flatnonzero(np.isnan(variacoes[i, a:b + 1]))
+        if lacunas.size:
+            raise ValueError(f"Série '{nome}' sem valor em {mes_texto(inicio + a + lacunas[0])}.")
+        nivel[i, a] = 1.0
+        nivel[i, a + 1:b + 2] = np.cumprod(1 + variacoes[i, a:b + 1] / 100)
+        primeiro[i], ultimo[i] = a, b + 1
+        meses = min(MESES_PROJECAO, b + 1 - a)
+        taxa_projecao[i] = (nivel[i, b + 1] / nivel[i, b + 1 - meses]) ** (1 / meses) - 1
+
+    arrays = {
+        'nivel': nivel,
+        'projetado': projetado,
+        'primeiro': primeiro,
+        'ultimo': ultimo,
+        'taxa_projecao': taxa_projecao,
+    }
+    return arrays, {'indices': nomes, 'inicio': int(inicio)}
+
+
+# --- Consulta ---
+
+class BaseIndices:
+    """
+    Números-índice mensais de várias séries, para cálculo de fatores de reajuste.
+
+    O fator do mês M a partir da data-base B é I(M) / I(B), com I o
+    número-índice ao fim do mês. Depois do último mês da série, I cresce à
+    taxa de projeção: a informada (% a.a.) ou, por padrão, a média
+    geométrica das últimas `MESES_PROJECAO` variações.
+    """
+
+    def __init__(self, arrays: dict, meta: dict):
+        # `np.asarray` não copia: tira a subclasse `np.memmap` (e o custo dela por
+        # operação), mas os arrays continuam apontando para o arquivo mapeado
+        self.nivel = np.asarray(arrays['nivel'])
+        self.projetado = np.asarray(arrays['projetado'])
+        self.primeiro = np.asarray(arrays['primeiro'])
+        self.ultimo = np.asarray(arrays['ultimo'])
+        self.taxa_projecao = np.asarray(arrays['taxa_projecao'])
+        self.indices = list(meta['indices'])
+        self.inicio = meta['inicio']
+        self._posicoes = {nome.lower(): i for i, nome in enumerate(self.indices)}
+
+    def posicao(self, indice: str) -> int:
+        try:
+            return self._posicoes[indice.lower()]
+        except KeyError:
+            raise ValueError(
+                f"Índice desconhecido: '{indice}'. Disponíveis: {', '.join(self.indices)}."
+            ) from None
+
+    def periodo(self, indice: str) -> tuple:
+        """Primeiro e último mês ('AAAA-MM') com valor na série."""
+        k = self.posicao(indice)
+        return mes_texto(self.inicio + int(self.primeiro[k])), mes_texto(self.inicio + int(self.ultimo[k]) - 1)
+
+    def _niveis(self, k: int, meses, taxa_mensal: float) -> np.ndarray:
+        posicoes = np.asarray(meses) - self.inicio + 1
+        if (posicoes < self.primeiro[k]).any():
+            anterior = mes_texto(self.inicio + int(self.primeiro[k]) - 1)
+            raise ValueError(f"A série '{self.indices[k]}' não cobre meses anteriores a {anterior}.")
+        ultimo = self.ultimo[k]
+        excesso = np.maximum(posicoes - ultimo, 0)
+        return self.nivel[k, np.minimum(posicoes, ultimo)] * (1 + taxa_mensal) ** excesso
+
+    def fatores(self, indice: str, mes_base, mes_inicio, horizonte: int, projecao: float = None) -> np.ndarray:
+        """
+        Fatores de reajuste dos meses de um ou vários fluxos.
+
+        Args:
+            indice: Nome da série.
+            mes_base: Mês (ordinal) da data-base dos valores; escalar ou vetor (n,).
+            mes_inicio: Mês (ordinal) do primeiro mês do fluxo; escalar ou vetor (n,).
+            horizonte: Meses de cada fluxo.
+            projecao: Taxa (% a.a.) após o fim da série; None usa a padrão.
+
+        Returns:
+            Matriz (n, horizonte) com I(mes_inicio + t) / I(mes_base).
+        """
+        k = self.posicao(indice)
+        taxa = self.taxa_projecao[k] if projecao is None else (1 + projecao / 100) ** (1 / 12) - 1
+        mes_base, mes_inicio = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(mes_base, dtype=np.int64)),
+            np.atleast_1d(np.asarray(mes_inicio, dtype=np.int64))
+        )
+        meses = mes_inicio[:, None] + np.arange(horizonte)
+        return self._niveis(k, meses, taxa) / self._niveis(k, mes_base, taxa)[:, None]
+
+    def meses_projetados(self, indice: str, mes_inicio, duracao) -> np.ndarray:
+        """Quantos meses de cada fluxo usam valores projetados (marcados ou além da série)."""
+        k = self.posicao(indice)
+        mes_inicio, duracao = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(mes_inicio, dtype=np.int64)),
+            np.atleast_1d(np.asarray(duracao, dtype=np.int64))
+        )
+        t = np.arange(int(duracao.max()))
+        posicoes = mes_inicio[:, None] + t - self.inicio + 1
+        marcados = self.projetado[k, np.clip(posicoes - 1, 0, self.projetado.shape[1] - 1)] & (posicoes >= 1)
+        return ((marcados | (posicoes > self.ultimo[k])) & (t < duracao[:, None])).sum(axis=1)
+
+
+# --- Cache em disco ---
+
+def chave_base(fontes) -> str:
+    """Identifica os arquivos (caminho, tamanho e data de modificação) e como foram lidos."""
+    partes = [VERSAO_CACHE, MESES_PROJECAO]
+    for fonte in fontes:
+        caminho, numero_indice = (fonte, False) if isinstance(fonte, str) else fonte
+        info = os.stat(caminho)
+        partes.append((os.path.abspath(caminho), info.st_size, info.st_mtime_ns, bool(numero_indice)))
+    return hashlib.blake2b(repr(partes).encode(), digest_size=16).hexdigest()
+
+
+def gravar_base(pasta: str, arrays: dict, meta: dict):
+    """Grava os arrays (.npy) e os nomes das séries; a pasta aparece completa ou não aparece."""
+    os.makedirs(os.path.dirname(pasta) or '.', exist_ok=True)
+    temporaria = tempfile.mkdtemp(dir=os.path.dirname(pasta) or '.')
+    try:
+        for nome in _ARRAYS:
+            np.save(os.path.join(temporaria, f"{nome}.npy"), np.ascontiguousarray(arrays[nome]))
+        with open(os.path.join(temporaria, 'meta.json'), 'w', encoding='utf-8') as arquivo:
+            json.dump(meta, arquivo)
+        os.replace(temporaria, pasta)
+    except OSError:
+        # Outro processo gravou a mesma base primeiro
+        shutil.rmtree(temporaria, ignore_errors=True)
+        if not os.path.isdir(pasta):
+            raise
+
+
+def carregar_base(pasta: str) -> BaseIndices:
+    """Abre uma base gravada por `gravar_base`, com os arrays em memória mapeada."""
+    arrays = {nome: np.load(os.path.join(pasta, f"{nome}.npy"), mmap_mode='r') for nome in _ARRAYS}
+    with open(os.path.join(pasta, 'meta.json'), encoding='utf-8') as arquivo:
+        meta = json.load(arquivo)
+    return BaseIndices(arrays, meta)
+
+
+def abrir_indices(fontes, pasta_cache: str = PASTA_CACHE) -> BaseIndices:
+    """
+    Base dos arquivos de índices, construída só na primeira vez.
+
+    O cache é invalidado quando algum arquivo muda (tamanho ou data de
+    modificação) ou quando a lista de arquivos muda.
+    """
+    fontes = list(fontes)
+    pasta = os.path.join(pasta_cache, chave_base(fontes))
+    if not os.path.isdir(pasta):
+        gravar_base(pasta, *construir_base(fontes))
+    return carregar_base(pasta)
+
+
+def fontes_configuradas(valor: str = None) -> list:
+    """Arquivos de `VIABILIDADE_INDICES` (pastas contribuem com seus .csv, em ordem alfabética)."""
+    fontes = []
+    for item in (FONTES if valor is None else valor).split(os.pathsep):
+        if not item:
+            continue
+        if os.path.isdir(item):
+            fontes.extend(sorted(glob.glob(os.path.join(item, '*.csv'))))
+        else:
+            fontes.append(item)
+    return fontes
+
+
+# --- Projetos ---
+
+def fatores_do_projeto(
+    base: BaseIndices,
+    horizonte: int,
+    mes_base,
+    mes_inicio,
+    indice_custos: str = INDICE_CUSTOS_PADRAO,
+    indice_precos: str = None,
+    projecao: float = None
+) -> tuple:
+    """
+    Fatores (n, horizonte) dos custos diretos e das receitas.
+
+    Sem `indice_precos`, os preços de venda ficam nominais (fatores 1).
+    """
+    custos = base.fatores(indice_custos, mes_base, mes_inicio, horizonte, projecao)
+    if indice_precos:
+        receitas = base.fatores(indice_precos, mes_base, mes_inicio, horizonte, projecao)
+    else:
+        receitas = np.ones_like(custos)
+    return custos, receitas
+
+
+def avaliar_reajustado(
+    projetos: list,
+    base: BaseIndices,
+    mes_base,
+    mes_inicio,
+    indice_custos: str = INDICE_CUSTOS_PADRAO,
+    indice_precos: str = None,
+    projecao: float = None
+) -> dict:
+    """
+    Resultados e indicadores do fluxo de caixa reajustado de vários projetos.
+
+    Custos diretos seguem `indice_custos` e receitas (com os custos
+    percentuais sobre elas) seguem `indice_precos`, mês a mês, a partir da
+    data-base; custos monetários ficam nominais. Os fluxos, com durações
+    diferentes, são completados com zeros numa única matriz, e VPL, TIR,
+    exposição e payback saem de uma só chamada de `calcular_indicadores`.
+
+    Args:
+        projetos: Lista de entradas no formato de `data_model.EntradasProjeto`.
+        mes_base, mes_inicio: Meses ordinais (escalares ou um por projeto).
+
+    Returns:
+        Dicionário de vetores (n,): `vgv`, `custo_total`, `resultado_negocio`,
+        `margem_lucro` (reajustados), os de `calcular_indicadores` e
+        `meses_projetados` (do índice de custos).
+    """
+    from src.calculos_financeiros import calcular_viabilidade
+    from src.fluxo_caixa import calcular_indicadores, fluxo_do_projeto
+
+    n = len(projetos)
+    duracoes = np.array([int(e['duracao_projeto']) for e in projetos], dtype=np.int64)
+    horizonte = int(duracoes.max()) if n else 0
+    mes_base = np.broadcast_to(np.asarray(mes_base, dtype=np.int64), (n,))
+    mes_inicio = np.broadcast_to(np.asarray(mes_inicio, dtype=np.int64), (n,))
+    fatores_custos, fatores_receitas = fatores_do_projeto(
+        base, horizonte, mes_base, mes_inicio, indice_custos, indice_precos, projecao
+    )
+
+    fluxos = np.zeros((n, horizonte))
+    receitas = np.zeros(n)
+    custos = np.zeros(n)
+    for i, entradas in enumerate(projetos):
+        t = duracoes[i]
+        fluxo = fluxo_do_projeto(
+            entradas, calcular_viabilidade(entradas), fatores_custos[i, :t], fatores_receitas[i, :t]
+        )
+        fluxos[i, :t] = fluxo['fluxo']
+        receitas[i] = fluxo['receitas'].sum()
+        custos[i] = fluxo['custos'].sum()
+
+    taxas = np.array([float(e['taxa_desconto']) for e in projetos])
+    resultado = receitas - custos
+    return {
+        'vgv': receitas,
+        'custo_total': custos,
+        'resultado_negocio': resultado,
+        'margem_lucro': np.divide(resultado, receitas, out=np.zeros(n), where=receitas > 0) * 100,
+        **calcular_indicadores(fluxos, taxas),
+        'meses_projetados': base.meses_projetados(indice_custos, mes_inicio, duracoes),
+    }
+
+
+def main(argv=None):
+    from src.cli import entradas_do_projeto, ler_projetos
+
+    parser = argparse.ArgumentParser(description="Avalia projetos com custos e preços reajustados por índices.")
+    parser.add_argument('arquivos', nargs='*', help="Projetos em JSON/JSONL ('-' ou nenhum = stdin)")
+    parser.add_argument('--indices', action='append',
+                        help="CSV (ou pasta) de índices; pode repetir (padrão: VIABILIDADE_INDICES)")
+    parser.add_argument('--data-base', '-b', required=True, help="Mês (AAAA-MM) dos valores informados")
+    parser.add_argument('--inicio', '-i', help="Mês (AAAA-MM) do início do projeto (padrão: a data-base)")
+    parser.add_argument('--custos', default=INDICE_CUSTOS_PADRAO, help="Índice dos custos diretos (padrão: INCC)")
+    parser.add_argument('--precos', help="Índice dos preços de venda (padrão: preços nominais)")
+    parser.add_argument('--projecao', type=float, help="Taxa (%% a.a.) após o fim das séries")
+    parser.add_argument('--numero-indice', action='store_true', help="Os CSV trazem números-índice, não variações")
+    args = parser.parse_args(argv)
+
+    fontes = fontes_configuradas(os.pathsep.join(args.indices or [FONTES]))
+    if not fontes:
+        parser.error("informe os índices com --indices ou VIABILIDADE_INDICES")
+
+    base = abrir_indices([(caminho, args.numero_indice) for caminho in fontes])
+    projetos = []
+    for caminho in args.arquivos or ['-']:
+        arquivo = sys.stdin if caminho == '-' else open(caminho, encoding='utf-8')
+        try:
+            projetos.extend(entradas_do_projeto(projeto) for projeto in ler_projetos(arquivo))
+        finally:
+            if arquivo is not sys.stdin:
+                arquivo.close()
+    if not projetos:
+        return 0
+
+    mes_base = mes_ordinal(args.data_base)
+    resultados = avaliar_reajustado(
+        projetos, base, mes_base, mes_ordinal(args.inicio) if args.inicio else mes_base,
+        args.custos, args.precos, args.projecao
+    )
+    for i, entradas in enumerate(projetos):
+        linha = {'nome_terreno': entradas['nome_terreno']}
+        for campo, valores in resultados.items():
+            valor = valores[i].item()
+            linha[campo] = valor if valor == valor else None
+        sys.stdout.write(json.dumps(linha, ensure_ascii=False) + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
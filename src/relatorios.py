@@ -0,0 +1,313 @@
+# src/relatorios.py
+"""
+Geração de relatórios PDF de viabilidade.
+
+Uso em lote (um PDF por projeto salvo):
+    python -m src.relatorios pasta_saida --url postgresql://... --processos 8
+"""
+
+import argparse
+import functools
+import hashlib
+import importlib.util
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import repeat
+
+from src.cache_calculos import chave_entradas
+from src.calculos_financeiros import calcular_viabilidade
+
+# Módulos que definem os números e o layout do relatório; qualquer mudança
+# no código deles muda a chave e invalida os PDFs em cache
+MODULOS_RELATORIO = (
+    'src.calculos_financeiros',
+    'src.fluxo_caixa',
+    'src.formatacao',
+    'src.visualizacoes',
+    'src.relatorios',
+)
+
+PASTA_CACHE = os.environ.get(
+    'VIABILIDADE_RELATORIOS_DIR',
+    os.path.join(tempfile.gettempdir(), 'viabilidade_relatorios')
+)
+
+# PDFs mantidos em PASTA_CACHE; além disso, os usados há mais tempo são apagados
+MAXIMO_CACHE = int(os.environ.get('VIABILIDADE_RELATORIOS_MAX', 500))
+
+PROCESSOS_PADRAO = int(os.environ.get('VIABILIDADE_RELATORIOS_PROCESSOS', 2))
+
+_executor = None
+_em_andamento = {}
+_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def versao_codigo() -> str:
+    """Hash do código-fonte de `MODULOS_RELATORIO` (lido sem importar os módulos)."""
+    resumo = hashlib.blake2b(digest_size=8)
+    for nome in MODULOS_RELATORIO:
+        with open(importlib.util.find_spec(nome).origin, 'rb') as arquivo:
+            resumo.update(arquivo.read())
+    return resumo.hexdigest()
+
+
+def chave_relatorio(entradas: dict) -> str:
+    """Hash do conteúdo do relatório: as entradas do projeto e o código que o gera."""
+    return chave_entradas('relatorio', versao_codigo(), entradas)
+
+
+def caminho_relatorio(entradas: dict, pasta: str = PASTA_CACHE) -> str:
+    return os.path.join(pasta, f"{chave_relatorio(entradas)}.pdf")
+
+
+# --- Conteúdo ---
+
+def calcular_conteudo(entradas: dict) -> dict:
+    """
+    Resultados, indicadores e fluxo de caixa exibidos no relatório.
+
+    Args:
+        entradas: Entradas do projeto no formato de `data_model.EntradasProjeto`.
+    """
+    from src.fluxo_caixa import calcular_indicadores, fluxo_do_projeto
+
+    resultados = calcular_viabilidade(entradas)
+    fluxo = fluxo_do_projeto(entradas, resultados)
+    indicadores = {
+        k: float(v[0]) for k, v in calcular_indicadores(fluxo['fluxo'], entradas['taxa_desconto']).items()
+    }
+    return {'resultados': resultados, 'indicadores': indicadores, 'fluxo': fluxo}
+
+
+# --- Renderização ---
+
+def renderizar_pdf(entradas: dict) -> bytes:
+    """Monta o PDF com os cards de resultado, a tabela de custos e o gráfico do fluxo de caixa."""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    from src.fluxo_caixa import fluxo_caixa_df
+    from src.formatacao import formatar_decimal, formatar_moeda
+    from src.visualizacoes import plotar_fluxo_de_caixa
+
+    moeda = formatar_moeda
+
+    def decimal(valor):
+        return formatar_decimal(round(valor, 2))
+
+    conteudo = calcular_conteudo(entradas)
+    res = conteudo['resultados']
+    ind = conteudo['indicadores']
+    estilos = getSampleStyleSheet()
+
+    def tabela(linhas, larguras, cabecalho=False):
+        t = Table(linhas, colWidths=larguras, hAlign='LEFT')
+        estilo = [
+            ('GRID', (0, 0), (-1, -1), 0.25, colors.HexColor('#dee2e6')),
+            ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ]
+        if cabecalho:
+            estilo += [
+                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f8f9fa')),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ]
+        t.setStyle(TableStyle(estilo))
+        return t
+
+    cards = [
+        ['Custos Diretos', moeda(res['custo_direto_total'])],
+        ['Custos Indiretos', moeda(res['custos_indiretos_total'])],
+        ['Custo Total', moeda(res['custo_total'])],
+        ['V.G.V.', moeda(res['vgv'])],
+        ['Resultado do Negócio', moeda(res['resultado_negocio'])],
+        ['Margem de Lucro', f"{decimal(res['margem_lucro'])}%"],
+        ['Área do Terreno', f"{decimal(entradas['area_terreno'])} m²"],
+        ['Índice de Aproveitamento', decimal(entradas['indice_aproveitamento'])],
+        ['Área Construída', f"{decimal(res['area_construida'])} m²"],
+        ['Área Privativa', f"{decimal(res['area_privativa'])} m²"],
+        ['Relação AP/AC', decimal(entradas['relacao_privativa_construida'])],
+        ['VPL', moeda(ind['vpl'])],
+        ['TIR (a.a.)', f"{decimal(ind['tir_anual'])}%" if ind['tir_anual'] == ind['tir_anual'] else '—'],
+        ['Exposição Máxima', moeda(ind['exposicao_maxima'])],
+        ['Payback', f"{int(ind['payback'])} meses" if ind['payback'] == ind['payback'] else '—'],
+    ]
+
+    custos = [['Custo', '%', 'Valor (R$)']]
+    custos += [[nome, decimal(pct), moeda(pct / 100 * res['vgv'])] for nome, pct in entradas['custos_indiretos']]
+    custos += [[nome.replace('_', ' ').capitalize(), '', moeda(valor)]
+               for nome, valor in entradas['custos_monetarios'].items()]
+
+    grafico = plotar_fluxo_de_caixa(fluxo_caixa_df(conteudo['fluxo']))
+    png = grafico.to_image(format='png', width=1000, height=450, scale=2)
+
+    buffer = io.BytesIO()
+    documento = SimpleDocTemplate(
+        buffer, pagesize=A4, title=f"Viabilidade - {entradas['nome_terreno']}",
+        leftMargin=2 * cm, rightMargin=2 * cm, topMargin=1.5 * cm, bottomMargin=1.5 * cm
+    )
+    documento.build([
+        Paragraph(f"Análise de Viabilidade: {entradas['nome_terreno']}", estilos['Title']),
+        Paragraph("Resumo", estilos['Heading2']),
+        tabela(cards, [8 * cm, 6 * cm]),
+        Spacer(1, 0.5 * cm),
+        Paragraph("Custos Indiretos", estilos['Heading2']),
+        tabela(custos, [8 * cm, 2.5 * cm, 5 * cm], cabecalho=True),
+        Spacer(1, 0.5 * cm),
+        Paragraph("Fluxo de Caixa", estilos['Heading2']),
+        Image(io.BytesIO(png), width=17 * cm, height=7.65 * cm),
+    ])
+    return buffer.getvalue()
+
+
+def _em_cache(caminho: str) -> bool:
+    # Renova a data de uso, que ordena a limpeza do cache
+    try:
+        os.utime(caminho)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def limpar_cache(pasta: str = PASTA_CACHE, maximo: int = MAXIMO_CACHE) -> int:
+    """Apaga os PDFs usados há mais tempo até restarem `maximo`; retorna quantos apagou."""
+    try:
+        arquivos = [a for a in os.scandir(pasta) if a.name.endswith('.pdf')]
+    except FileNotFoundError:
+        return 0
+    if len(arquivos) <= maximo:
+        return 0
+
+    def uso(arquivo):
+        try:
+            return arquivo.stat().st_mtime
+        except FileNotFoundError:
+            return 0.0
+
+    apagados = 0
+    for arquivo in sorted(arquivos, key=uso)[:len(arquivos) - maximo]:
+        try:
+            os.remove(arquivo.path)
+            apagados += 1
+        except FileNotFoundError:
+            # Outro processo já apagou
+            pass
+    return apagados
+
+
+def gerar_relatorio(entradas: dict, pasta: str = PASTA_CACHE, maximo: int = None) -> str:
+    """
+    Gera (ou reaproveita) o PDF do projeto e retorna o caminho do arquivo.
+
+    O arquivo é nomeado pelo hash das entradas e do código do relatório; um
+    projeto sem alterações não é renderizado de novo. Com `maximo`, a pasta
+    é tratada como cache e limitada a esse número de PDFs.
+    """
+    caminho = caminho_relatorio(entradas, pasta)
+    if _em_cache(caminho):
+        return caminho
+
+    os.makedirs(pasta, exist_ok=True)
+    pdf = renderizar_pdf(entradas)
+    # Escrita atômica: outros processos nunca veem um PDF pela metade
+    descritor, temporario = tempfile.mkstemp(dir=pasta, suffix='.tmp')
+    with os.fdopen(descritor, 'wb') as arquivo:
+        arquivo.write(pdf)
+    os.replace(temporario, caminho)
+    if maximo is not None:
+        limpar_cache(pasta, maximo)
+    return caminho
+
+
+# --- Execução em segundo plano ---
+
+def _obter_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # 'spawn' evita copiar (fork) as threads do servidor Streamlit
+        _executor = ProcessPoolExecutor(
+            max_workers=PROCESSOS_PADRAO,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+    return _executor
+
+
+def gerar_relatorio_async(entradas: dict, pasta: str = PASTA_CACHE) -> Future:
+    """
+    Agenda a geração do PDF no pool de processos e retorna o `Future` do caminho.
+
+    Relatórios já em cache retornam um `Future` concluído; pedidos repetidos
+    enquanto o mesmo relatório está sendo gerado compartilham o mesmo `Future`.
+    A pasta é limitada a `MAXIMO_CACHE` PDFs.
+    """
+    caminho = caminho_relatorio(entradas, pasta)
+    if _em_cache(caminho):
+        futuro = Future()
+        futuro.set_result(caminho)
+        return futuro
+
+    with _lock:
+        futuro = _em_andamento.get(caminho)
+        if futuro is None:
+            futuro = _obter_executor().submit(gerar_relatorio, entradas, pasta, MAXIMO_CACHE)
+            _em_andamento[caminho] = futuro
+            futuro.add_done_callback(lambda _: _em_andamento.pop(caminho, None))
+    return futuro
+
+
+def gerar_relatorios_lote(
+    lista_entradas,
+    pasta: str = PASTA_CACHE,
+    processos: int = None,
+    executor: ProcessPoolExecutor = None
+) -> list:
+    """
+    Gera os PDFs de vários projetos em paralelo; retorna os caminhos na mesma ordem.
+
+    Sem `executor`, cria um pool só para esta chamada.
+    """
+    lista_entradas = list(lista_entradas)
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            return gerar_relatorios_lote(lista_entradas, pasta, executor=executor)
+    return list(executor.map(gerar_relatorio, lista_entradas, repeat(pasta), chunksize=4))
+
+
+# --- Linha de comando ---
+
+def main(argv=None):
+    from src.banco_dados import obter_engine
+    from src.data_model import ler_registro
+    from src.transferencia import ler_tabela
+
+    parser = argparse.ArgumentParser(description="Gera os relatórios PDF de todos os projetos salvos.")
+    parser.add_argument('pasta')
+    parser.add_argument('--url', default=os.environ.get('VIABILIDADE_DB_URL'),
+                        help="URL do banco (padrão: variável VIABILIDADE_DB_URL)")
+    parser.add_argument('--processos', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if not args.url:
+        parser.error("Informe --url ou defina VIABILIDADE_DB_URL.")
+
+    total = 0
+    # Um pool para toda a execução; os lotes do banco só limitam a memória
+    with ProcessPoolExecutor(max_workers=args.processos) as executor:
+        for lote in ler_tabela(obter_engine(args.url)):
+            entradas = [ler_registro(r['dados'])['entradas'] for r in lote]
+            total += len(gerar_relatorios_lote(entradas, args.pasta, executor=executor))
+    print(f"{total} relatórios em {args.pasta}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
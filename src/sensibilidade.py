@@ -0,0 +1,151 @@
+# src/sensibilidade.py
+
+import numpy as np
+
+from src.calculos_lote import calcular_resultado_negocio_lote
+
+# Faixa do slider de índice de aproveitamento da página de entrada
+INDICE_MIN = 1.00
+INDICE_MAX = 4.00
+
+
+def decompor_margem(
+    area_terreno: float,
+    relacao_privativa_construida: float,
+    custo_direto_construcao_m2: float,
+    total_percentual_custos_indiretos: float,
+    total_custos_monetarios: float
+) -> dict:
+    """
+    Reduz a margem de lucro a três coeficientes em função de índice e preço.
+
+    Com AP = A·I, AC = AP/R, VGV = P·AP e custos indiretos = pct·VGV + M:
+
+        margem(I, P) = k0 - k1 / P - k2 / (P · I)
+
+    onde k0 = 100 - pct, k1 = 100·C/R e k2 = 100·M/A. Os coeficientes são
+    calculados uma única vez e a grade inteira vira uma operação de array.
+
+    Returns:
+        Dicionário com `k0`, `k1`, `k2` e `valido` (False quando R <= 0 ou
+        A <= 0, casos em que o VGV é nulo e a margem é zero).
+    """
+    valido = relacao_privativa_construida > 0 and area_terreno > 0
+    if not valido:
+        return {'k0': 0.0, 'k1': 0.0, 'k2': 0.0, 'valido': False}
+    return {
+        'k0': 100 - total_percentual_custos_indiretos,
+        'k1': 100 * custo_direto_construcao_m2 / relacao_privativa_construida,
+        'k2': 100 * total_custos_monetarios / area_terreno,
+        'valido': True
+    }
+
+
+def grade_margem(coeficientes: dict, indices, precos) -> np.ndarray:
+    """
+    Avalia a margem sobre a grade índice × preço.
+
+    Args:
+        coeficientes: Saída de `decompor_margem`.
+        indices: Vetor de índices de aproveitamento (linhas).
+        precos: Vetor de preços médios de venda por m² (colunas).
+
+    Returns:
+        Matriz (len(indices), len(precos)) com a margem de lucro em %.
+    """
+    indices = np.asarray(indices, dtype=float)[:, None]
+    precos = np.asarray(precos, dtype=float)[None, :]
+    if not coeficientes['valido']:
+        return np.zeros((indices.shape[0], precos.shape[1]))
+
+    vgv_positivo = (precos > 0) & (indices > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        margem = (coeficientes['k0']
+                  - coeficientes['k1'] / precos
+                  - coeficientes['k2'] / (precos * indices))
+    return np.where(vgv_positivo, margem, 0.0)
+
+
+def faixas_grade(preco_medio_vendas: float, pontos: int = 200, variacao_preco_pct: float = 50.0) -> tuple:
+    """Eixos padrão da grade: índice de 1,00 a 4,00 e preço ± `variacao_preco_pct`%."""
+    indices = np.linspace(INDICE_MIN, INDICE_MAX, pontos)
+    preco_min = preco_medio_vendas * (1 - variacao_preco_pct / 100)
+    preco_max = preco_medio_vendas * (1 + variacao_preco_pct / 100)
+    precos = np.linspace(max(preco_min, 0.0), preco_max, pontos)
+    return indices, precos
+
+
+def analisar_tornado(
+    area_terreno: float,
+    indice_aproveitamento: float,
+    relacao_privativa_construida: float,
+    preco_medio_vendas: float,
+    custo_direto_construcao_m2: float,
+    custos_indiretos_percentuais: dict,
+    custos_indiretos_monetarios: dict,
+    variacao_pct: float = 10.0
+) -> list:
+    """
+    Variação da margem quando cada entrada sobe ou desce `variacao_pct`%.
+
+    Todos os cenários (dois por entrada) são avaliados numa única chamada do
+    motor vetorizado.
+
+    Args:
+        custos_indiretos_percentuais: Dicionário {nome do custo: %}.
+        custos_indiretos_monetarios: Dicionário {nome do custo: R$}.
+
+    Returns:
+        Lista de dicionários {'entrada', 'margem_baixa', 'margem_alta',
+        'amplitude'} ordenada da maior para a menor amplitude, mais a margem
+        base em cada item (`margem_base`).
+    """
+    escalares = {
+        'Área do Terreno': area_terreno,
+        'Índice de Aproveitamento': indice_aproveitamento,
+        'Relação AP/AC': relacao_privativa_construida,
+        'Preço Médio de Vendas': preco_medio_vendas,
+        'Custo Direto (R$/m²)': custo_direto_construcao_m2,
+    }
+    base = np.array(
+        list(escalares.values())
+        + list(custos_indiretos_percentuais.values())
+        + list(custos_indiretos_monetarios.values()),
+        dtype=float
+    )
+    nomes = (list(escalares)
+             + [f"{nome} (%)" for nome in custos_indiretos_percentuais]
+             + [f"{nome} (R$)" for nome in custos_indiretos_monetarios])
+    n_esc = len(escalares)
+    n_perc = len(custos_indiretos_percentuais)
+    n = len(base)
+
+    # Linha 0 = base; linhas 1..n = entrada i reduzida; n+1..2n = aumentada
+    fatores = np.ones((2 * n + 1, n))
+    fatores[1 + np.arange(n), np.arange(n)] = 1 - variacao_pct / 100
+    fatores[1 + n + np.arange(n), np.arange(n)] = 1 + variacao_pct / 100
+    cenarios = fatores * base
+
+    margens = calcular_resultado_negocio_lote(
+        cenarios[:, 0],
+        cenarios[:, 1],
+        cenarios[:, 4],
+        cenarios[:, 2],
+        cenarios[:, 3],
+        cenarios[:, n_esc:n_esc + n_perc],
+        cenarios[:, n_esc + n_perc:]
+    )['margem_lucro']
+
+    margem_base = float(margens[0])
+    tornado = [
+        {
+            'entrada': nome,
+            'margem_baixa': float(margens[1 + i]),
+            'margem_alta': float(margens[1 + n + i]),
+            'amplitude': abs(float(margens[1 + n + i] - margens[1 + i])),
+            'margem_base': margem_base
+        }
+        for i, nome in enumerate(nomes)
+    ]
+    tornado.sort(key=lambda item: item['amplitude'], reverse=True)
+    return tornado
@@ -0,0 +1,162 @@
+# src/simulacao.py
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.calculos_lote import calcular_resultado_negocio_lote
+
+# Cenários avaliados por bloco; limita a memória a algumas dezenas de MB
+TAMANHO_BLOCO = 50_000
+
+PERCENTIS = (5, 50, 95)
+
+
+# --- Distribuições ---
+
+def distribuicao_fixa(valor: float) -> dict:
+    """Distribuição degenerada: sempre retorna `valor`."""
+    return {'tipo': 'fixa', 'valor': valor}
+
+
+def distribuicao_triangular(valor: float, variacao_pct: float) -> dict:
+    """Distribuição triangular centrada em `valor`, com ± `variacao_pct`%."""
+    delta = abs(valor) * variacao_pct / 100
+    if delta == 0:
+        return distribuicao_fixa(valor)
+    return {'tipo': 'triangular', 'min': valor - delta, 'moda': valor, 'max': valor + delta}
+
+
+def distribuicao_uniforme(minimo: float, maximo: float) -> dict:
+    """Distribuição uniforme entre `minimo` e `maximo`."""
+    return {'tipo': 'uniforme', 'min': minimo, 'max': maximo}
+
+
+def distribuicao_normal(media: float, desvio: float, minimo: float = 0.0) -> dict:
+    """Distribuição normal truncada em `minimo` (custos e preços não ficam negativos)."""
+    return {'tipo': 'normal', 'media': media, 'desvio': desvio, 'min': minimo}
+
+
+def _amostrar(rng: np.random.Generator, dist: dict, n: int) -> np.ndarray:
+    tipo = dist['tipo']
+    if tipo == 'fixa':
+        return np.full(n, float(dist['valor']))
+    if tipo == 'triangular':
+        return rng.triangular(dist['min'], dist['moda'], dist['max'], n)
+    if tipo == 'uniforme':
+        return rng.uniform(dist['min'], dist['max'], n)
+    if tipo == 'normal':
+        return np.maximum(rng.normal(dist['media'], dist['desvio'], n), dist['min'])
+    raise ValueError(f"Tipo de distribuição desconhecido: {tipo}")
+
+
+def _amostrar_matriz(rng: np.random.Generator, dists: list, n: int) -> np.ndarray:
+    matriz = np.empty((n, len(dists)))
+    for j, dist in enumerate(dists):
+        matriz[:, j] = _amostrar(rng, dist, n)
+    return matriz
+
+
+# --- Simulação ---
+
+def _simular_bloco(modelo: dict, n: int, semente: np.random.SeedSequence) -> tuple:
+    """Sorteia e avalia `n` cenários; retorna (margens, cenários com prejuízo)."""
+    rng = np.random.default_rng(semente)
+    resultados = calcular_resultado_negocio_lote(
+        modelo['area_terreno'],
+        modelo['indice_aproveitamento'],
+        _amostrar(rng, modelo['custo_direto_construcao_m2'], n),
+        modelo['relacao_privativa_construida'],
+        _amostrar(rng, modelo['preco_medio_vendas'], n),
+        _amostrar_matriz(rng, modelo['custos_indiretos_percentuais'], n),
+        _amostrar_matriz(rng, modelo['custos_indiretos_monetarios'], n)
+    )
+    return resultados['margem_lucro'], int(np.count_nonzero(resultados['resultado_negocio'] < 0))
+
+
+def montar_modelo(
+    area_terreno: float,
+    indice_aproveitamento: float,
+    relacao_privativa_construida: float,
+    preco_medio_vendas,
+    custo_direto_construcao_m2,
+    custos_indiretos_percentuais: list,
+    custos_indiretos_monetarios: list
+) -> dict:
+    """
+    Monta o modelo estocástico de um projeto.
+
+    Áreas e índices são determinísticos. Os demais argumentos aceitam um
+    número (tratado como distribuição fixa) ou um dicionário de distribuição
+    criado por `distribuicao_*`. Os custos indiretos são listas com uma
+    entrada por linha da tabela de percentuais / por custo monetário.
+    """
+    def _dist(v):
+        return v if isinstance(v, dict) else distribuicao_fixa(v)
+
+    return {
+        'area_terreno': area_terreno,
+        'indice_aproveitamento': indice_aproveitamento,
+        'relacao_privativa_construida': relacao_privativa_construida,
+        'preco_medio_vendas': _dist(preco_medio_vendas),
+        'custo_direto_construcao_m2': _dist(custo_direto_construcao_m2),
+        'custos_indiretos_percentuais': [_dist(v) for v in custos_indiretos_percentuais],
+        'custos_indiretos_monetarios': [_dist(v) for v in custos_indiretos_monetarios],
+    }
+
+
+def simular_viabilidade(
+    modelo: dict,
+    n_cenarios: int = 100_000,
+    semente: int = None,
+    tamanho_bloco: int = TAMANHO_BLOCO,
+    processos: int = 1
+) -> dict:
+    """
+    Executa a simulação de Monte Carlo de um modelo criado por `montar_modelo`.
+
+    Os cenários são divididos em blocos de `tamanho_bloco`, cada um com seu
+    próprio gerador derivado de `semente`; assim o resultado é o mesmo para
+    qualquer número de `processos`. De cada bloco só a margem de cada
+    cenário é guardada (8 bytes por cenário) até o cálculo dos percentis.
+
+    Args:
+        modelo: Modelo estocástico do projeto.
+        n_cenarios: Quantidade de cenários sorteados.
+        semente: Semente para reprodutibilidade (None = aleatória).
+        tamanho_bloco: Cenários avaliados por vez.
+        processos: Processos paralelos (1 = executa no processo atual).
+
+    Returns:
+        Um dicionário com os percentis P5/P50/P95 da margem, a média e a
+        probabilidade de prejuízo.
+    """
+    if n_cenarios <= 0:
+        raise ValueError("O número de cenários deve ser positivo.")
+
+    tamanhos = [tamanho_bloco] * (n_cenarios // tamanho_bloco)
+    if n_cenarios % tamanho_bloco:
+        tamanhos.append(n_cenarios % tamanho_bloco)
+    sementes = np.random.SeedSequence(semente).spawn(len(tamanhos))
+
+    if processos > 1 and len(tamanhos) > 1:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            blocos = list(executor.map(
+                _simular_bloco, [modelo] * len(tamanhos), tamanhos, sementes
+            ))
+    else:
+        blocos = [_simular_bloco(modelo, n, s) for n, s in zip(tamanhos, sementes)]
+
+    margens = np.concatenate([b[0] for b in blocos])
+    prejuizos = sum(b[1] for b in blocos)
+    del blocos
+    p5, p50, p95 = np.percentile(margens, PERCENTIS)
+
+    return {
+        'n_cenarios': n_cenarios,
+        'margem_p5': float(p5),
+        'margem_p50': float(p50),
+        'margem_p95': float(p95),
+        'margem_media': float(margens.mean()),
+        'probabilidade_prejuizo': prejuizos / n_cenarios * 100,
+    }
@@ -0,0 +1,355 @@
+# src/transferencia.py
+"""
+Carga e exportação em massa da tabela `viabilidades`.
+
+Uso:
+    python -m src.transferencia importar carteira.jsonl --url postgresql://...
+    python -m src.transferencia exportar backup.parquet --url sqlite:///local.db
+
+Formatos aceitos (pela extensão ou por `--formato`): JSONL, CSV e Parquet.
+Cada registro tem `nome_terreno`, `dados` e, opcionalmente, `data_criacao`.
+Parquet requer `pyarrow`.
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from itertools import islice
+
+from sqlalchemy import bindparam, func, select
+
+from src.banco_dados import obter_engine, registrar_versoes, viabilidades, viabilidades_resumo
+from src.carteira import atualizar_resumos
+from src.eventos import notificar_alteracoes, publicar_alteracoes
+
+# Registros por lote (e por transação); a memória usada não depende do total
+TAMANHO_LOTE = 5_000
+
+FORMATOS = {
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+}
+
+CAMPOS = ('nome_terreno', 'dados', 'data_criacao')
+
+# Campos de CSV com o JSON de projetos grandes passam do limite padrão do módulo csv
+csv.field_size_limit(2**31 - 1)
+
+
+def detectar_formato(caminho: str) -> str:
+    """Formato do arquivo a partir da extensão."""
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao not in FORMATOS:
+        raise ValueError(f"Extensão não reconhecida: '{extensao}'. Use --formato.")
+    return FORMATOS[extensao]
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("O formato Parquet requer o pacote 'pyarrow'.") from None
+    return pyarrow
+
+
+def _lotes(iteravel, tamanho: int):
+    iterador = iter(iteravel)
+    while lote := list(islice(iterador, tamanho)):
+        yield lote
+
+
+# --- Leitura ---
+
+def _registro(nome_terreno, dados, data_criacao=None) -> dict:
+    if isinstance(dados, str):
+        dados = json.loads(dados)
+    if isinstance(data_criacao, str):
+        data_criacao = datetime.fromisoformat(data_criacao) if data_criacao else None
+    return {'nome_terreno': nome_terreno, 'dados': dados, 'data_criacao': data_criacao}
+
+
+def ler_registros(caminho: str, formato: str = None, tamanho_lote: int = TAMANHO_LOTE):
+    """
+    Gera os registros do arquivo um a um, sem carregá-lo inteiro na memória.
+
+    Parquet é lido por grupos de `tamanho_lote` linhas.
+    """
+    formato = formato or detectar_formato(caminho)
+
+    if formato == 'jsonl':
+        with open(caminho, encoding='utf-8') as arquivo:
+            for linha in arquivo:
+                if linha.strip():
+                    item = json.loads(linha)
+                    yield _registro(item['nome_terreno'], item['dados'], item.get('data_criacao'))
+    elif formato == 'csv':
+        with open(caminho, encoding='utf-8', newline='') as arquivo:
+            for item in csv.DictReader(arquivo):
+                yield _registro(item['nome_terreno'], item['dados'], item.get('data_criacao'))
+    elif formato == 'parquet':
+        arquivo = _pyarrow().parquet.ParquetFile(caminho)
+        colunas = [c for c in CAMPOS if c in arquivo.schema_arrow.names]
+        for lote in arquivo.iter_batches(batch_size=tamanho_lote, columns=colunas):
+            for item in lote.to_pylist():
+                yield _registro(item['nome_terreno'], item['dados'], item.get('data_criacao'))
+    else:
+        raise ValueError(f"Formato desconhecido: {formato}")
+
+
+# --- Upsert ---
+
+def _sem_repetidos(lote: list) -> list:
+    # ON CONFLICT não aceita o mesmo nome duas vezes no mesmo comando; vale o último
+    return list({r['nome_terreno']: r for r in lote}.values())
+
+
+def _dados_atuais(conn, lote: list) -> dict:
+    # Conteúdo anterior à carga dos projetos que já existem, travados até o commit
+    c = viabilidades.c
+    consulta = (
+        select(c.nome_terreno, c.dados)
+        .where(c.nome_terreno.in_([r['nome_terreno'] for r in lote]))
+        .with_for_update()
+    )
+    return dict(conn.execute(consulta).all())
+
+
+def _registrar_versoes(conn, lote: list, anteriores: dict, gravados: list):
+    # Uma versão por projeto inserido ou reescrito, como faria `salvar_versao`
+    novos = {r['nome_terreno']: r['dados'] for r in lote}
+    registrar_versoes(conn, [
+        (id_viabilidade, anteriores.get(nome), novos[nome]) for id_viabilidade, nome in gravados
+    ])
+
+
+def _invalidar_resumos(conn, ids: list):
+    # Os resumos da carteira dos projetos alterados são recriados ao fim da importação
+    if ids:
+        conn.execute(viabilidades_resumo.delete().where(viabilidades_resumo.c.viabilidade_id.in_(ids)))
+
+
+def _upsert_executemany(conn, lote: list) -> list:
+    if conn.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif conn.dialect.name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise ValueError(f"Upsert não suportado no banco '{conn.dialect.name}'.")
+
+    c = viabilidades.c
+    comando = insert(viabilidades).values(
+        nome_terreno=bindparam('nome_terreno'),
+        dados=bindparam('dados', type_=c.dados.type),
+        data_criacao=func.coalesce(
+            bindparam('data_criacao', type_=c.data_criacao.type), func.current_timestamp()
+        ),
+    )
+    # Só reescreve quando o conteúdo mudou: reimportar o mesmo arquivo não altera nada
+    comando = comando.on_conflict_do_update(
+        index_elements=[c.nome_terreno],
+        set_={'dados': comando.excluded.dados},
+        where=c.dados.is_distinct_from(comando.excluded.dados),
+    )
+    return conn.execute(comando.returning(c.id, c.nome_terreno), lote).all()
+
+
+def _upsert_copy(conn, lote: list) -> list:
+    """Carrega o lote com COPY numa tabela temporária e faz o upsert a partir dela."""
+    conn.exec_driver_sql(
+        "CREATE TEMP TABLE IF NOT EXISTS _carga_viabilidades "
+        "(nome_terreno text, dados jsonb, data_criacao timestamp) ON COMMIT DELETE ROWS"
+    )
+
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    for r in lote:
+        escritor.writerow((
+            r['nome_terreno'],
+            json.dumps(r['dados'], ensure_ascii=False),
+            r['data_criacao'].isoformat() if r['data_criacao'] else None,
+        ))
+    buffer.seek(0)
+
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(
+            "COPY _carga_viabilidades (nome_terreno, dados, data_criacao) "
+            "FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+    finally:
+        cursor.close()
+
+    resultado = conn.exec_driver_sql(
+        "INSERT INTO viabilidades (nome_terreno, dados, data_criacao) "
+        "SELECT nome_terreno, dados, COALESCE(data_criacao, CURRENT_TIMESTAMP) "
+        "FROM _carga_viabilidades "
+        "ON CONFLICT (nome_terreno) DO UPDATE SET dados = EXCLUDED.dados "
+        "WHERE viabilidades.dados IS DISTINCT FROM EXCLUDED.dados "
+        "RETURNING id, nome_terreno"
+    )
+    return resultado.all()
+
+
+def importar(
+    engine,
+    caminho: str,
+    formato: str = None,
+    tamanho_lote: int = TAMANHO_LOTE,
+    usar_copy: bool = True
+) -> dict:
+    """
+    Importa um arquivo para `viabilidades`, com upsert por `nome_terreno`.
+
+    Cada lote é gravado em sua própria transação. No PostgreSQL (psycopg2) o
+    lote entra por COPY; nos demais casos, por `executemany`. Linhas cujo
+    `dados` já é igual ao do banco não são reescritas, então importar o mesmo
+    arquivo de novo não tem efeito. Cada projeto inserido ou reescrito
+    ganha uma versão no histórico (ver `banco_dados.salvar_versao`), na
+    mesma transação.
+
+    Ao final, os resumos da carteira dos projetos alterados são recriados.
+    Cada lote com alterações avisa os caches para descartarem tudo (ver
+    `src.eventos`), em vez de um aviso por projeto.
+
+    Returns:
+        Dicionário com `linhas` lidas, `alteradas` (inseridas ou atualizadas),
+        `resumos` recriados, `segundos` e `linhas_por_segundo`.
+    """
+    copy = usar_copy and engine.dialect.name == 'postgresql' and engine.dialect.driver == 'psycopg2'
+    inicio = time.perf_counter()
+    linhas = alteradas = 0
+
+    for lote in _lotes(ler_registros(caminho, formato, tamanho_lote), tamanho_lote):
+        linhas += len(lote)
+        lote = _sem_repetidos(lote)
+        with engine.begin() as conn:
+            anteriores = _dados_atuais(conn, lote)
+            gravados = _upsert_copy(conn, lote) if copy else _upsert_executemany(conn, lote)
+            _registrar_versoes(conn, lote, anteriores, gravados)
+            ids = [id_viabilidade for id_viabilidade, _ in gravados]
+            _invalidar_resumos(conn, ids)
+            if ids:
+                notificar_alteracoes(conn, None)
+        if ids:
+            publicar_alteracoes(engine, None)
+        alteradas += len(ids)
+
+    resumos = atualizar_resumos(engine)
+    return _vazao(linhas, time.perf_counter() - inicio, alteradas=alteradas, resumos=resumos)
+
+
+# --- Exportação ---
+
+def ler_tabela(engine, tamanho_lote: int = TAMANHO_LOTE):
+    """Gera lotes de registros da tabela usando um cursor no servidor."""
+    c = viabilidades.c
+    consulta = select(c.nome_terreno, c.dados, c.data_criacao).order_by(c.id)
+    with engine.connect() as conn:
+        resultado = conn.execution_options(stream_results=True, yield_per=tamanho_lote).execute(consulta)
+        for parte in resultado.partitions():
+            yield [dict(linha._mapping) for linha in parte]
+
+
+def _texto_data(valor):
+    return valor.isoformat() if valor is not None else None
+
+
+def exportar(engine, caminho: str, formato: str = None, tamanho_lote: int = TAMANHO_LOTE) -> dict:
+    """
+    Exporta `viabilidades` para um arquivo, lote a lote.
+
+    Returns:
+        Dicionário com `linhas`, `segundos` e `linhas_por_segundo`.
+    """
+    formato = formato or detectar_formato(caminho)
+    inicio = time.perf_counter()
+    linhas = 0
+    lotes = ler_tabela(engine, tamanho_lote)
+
+    if formato == 'jsonl':
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            for lote in lotes:
+                for r in lote:
+                    r['data_criacao'] = _texto_data(r['data_criacao'])
+                    arquivo.write(json.dumps(r, ensure_ascii=False) + '\n')
+                linhas += len(lote)
+    elif formato == 'csv':
+        with open(caminho, 'w', encoding='utf-8', newline='') as arquivo:
+            escritor = csv.writer(arquivo)
+            escritor.writerow(CAMPOS)
+            for lote in lotes:
+                escritor.writerows(
+                    (r['nome_terreno'], json.dumps(r['dados'], ensure_ascii=False), _texto_data(r['data_criacao']))
+                    for r in lote
+                )
+                linhas += len(lote)
+    elif formato == 'parquet':
+        pa = _pyarrow()
+        esquema = pa.schema([
+            ('nome_terreno', pa.string()),
+            ('dados', pa.string()),
+            ('data_criacao', pa.timestamp('us')),
+        ])
+        with pa.parquet.ParquetWriter(caminho, esquema) as escritor:
+            for lote in lotes:
+                escritor.write_table(pa.table({
+                    'nome_terreno': [r['nome_terreno'] for r in lote],
+                    'dados': [json.dumps(r['dados'], ensure_ascii=False) for r in lote],
+                    'data_criacao': [r['data_criacao'] for r in lote],
+                }, schema=esquema))
+                linhas += len(lote)
+    else:
+        raise ValueError(f"Formato desconhecido: {formato}")
+
+    return _vazao(linhas, time.perf_counter() - inicio)
+
+
+def _vazao(linhas: int, segundos: float, **extras) -> dict:
+    return {
+        'linhas': linhas,
+        **extras,
+        'segundos': segundos,
+        'linhas_por_segundo': linhas / segundos if segundos > 0 else 0.0,
+    }
+
+
+# --- Linha de comando ---
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importa ou exporta a tabela de viabilidades.")
+    parser.add_argument('acao', choices=['importar', 'exportar'])
+    parser.add_argument('arquivo')
+    parser.add_argument('--url', default=os.environ.get('VIABILIDADE_DB_URL'),
+                        help="URL do banco (padrão: variável VIABILIDADE_DB_URL)")
+    parser.add_argument('--formato', choices=sorted(set(FORMATOS.values())))
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE)
+    parser.add_argument('--sem-copy', action='store_true', help="Usa executemany mesmo no PostgreSQL")
+    args = parser.parse_args(argv)
+
+    if not args.url:
+        parser.error("Informe --url ou defina VIABILIDADE_DB_URL.")
+
+    engine = obter_engine(args.url)
+    if args.acao == 'importar':
+        rel = importar(engine, args.arquivo, args.formato, args.lote, usar_copy=not args.sem_copy)
+        print(f"{rel['linhas']} linhas lidas, {rel['alteradas']} inseridas/atualizadas, "
+              f"{rel['resumos']} resumos recriados "
+              f"em {rel['segundos']:.2f} s ({rel['linhas_por_segundo']:.0f} linhas/s)")
+    else:
+        rel = exportar(engine, args.arquivo, args.formato, args.lote)
+        print(f"{rel['linhas']} linhas exportadas em {rel['segundos']:.2f} s "
+              f"({rel['linhas_por_segundo']:.0f} linhas/s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
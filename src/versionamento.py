@@ -0,0 +1,75 @@
+# src/versionamento.py
+
+import copy
+
+# A cada quantas versões uma cópia completa é gravada no lugar de um delta.
+# Limita a reconstrução de qualquer versão a no máximo esse número de linhas.
+INTERVALO_SNAPSHOT = 20
+
+
+def calcular_delta(antigo: dict, novo: dict, _caminho: tuple = ()) -> list:
+    """
+    Operações que transformam o dicionário `antigo` em `novo`.
+
+    Dicionários são comparados chave a chave, recursivamente; qualquer outro
+    valor (inclusive listas) é substituído por inteiro. Cada operação é
+    `['set', caminho, valor]` ou `['del', caminho]`, com `caminho` sendo a
+    lista de chaves a partir da raiz, o que mantém o delta serializável
+    em JSON.
+
+    Returns:
+        Lista de operações; vazia quando os dicionários são iguais.
+    """
+    operacoes = []
+    for chave in antigo:
+        if chave not in novo:
+            operacoes.append(['del', [*_caminho, chave]])
+    for chave, valor in novo.items():
+        if chave not in antigo:
+            operacoes.append(['set', [*_caminho, chave], valor])
+        elif isinstance(valor, dict) and isinstance(antigo[chave], dict):
+            operacoes.extend(calcular_delta(antigo[chave], valor, (*_caminho, chave)))
+        elif antigo[chave] != valor or type(antigo[chave]) is not type(valor):
+            operacoes.append(['set', [*_caminho, chave], valor])
+    return operacoes
+
+
+def aplicar_delta(documento: dict, operacoes: list) -> dict:
+    """Retorna uma cópia de `documento` com as operações de `calcular_delta` aplicadas."""
+    resultado = copy.deepcopy(documento)
+    for operacao in operacoes:
+        caminho = operacao[1]
+        alvo = resultado
+        for chave in caminho[:-1]:
+            alvo = alvo.setdefault(chave, {})
+        if operacao[0] == 'set':
+            alvo[caminho[-1]] = copy.deepcopy(operacao[2])
+        elif operacao[0] == 'del':
+            alvo.pop(caminho[-1], None)
+        else:
+            raise ValueError(f"Operação de delta desconhecida: {operacao[0]}")
+    return resultado
+
+
+def reconstruir(registros: list) -> dict:
+    """
+    Reconstrói um documento a partir de um snapshot seguido de deltas.
+
+    Args:
+        registros: Dicionários com `tipo` ('snapshot' ou 'delta') e `conteudo`,
+            em ordem de versão, começando por um snapshot.
+    """
+    if not registros or registros[0]['tipo'] != 'snapshot':
+        raise ValueError("A reconstrução precisa começar por um snapshot.")
+    documento = registros[0]['conteudo']
+    for registro in registros[1:]:
+        if registro['tipo'] == 'snapshot':
+            documento = registro['conteudo']
+        else:
+            documento = aplicar_delta(documento, registro['conteudo'])
+    return documento
+
+
+def tipo_da_versao(versao: int) -> str:
+    """'snapshot' para a versão 1 e a cada `INTERVALO_SNAPSHOT` versões; 'delta' nas demais."""
+    return 'snapshot' if (versao - 1) % INTERVALO_SNAPSHOT == 0 else 'delta'
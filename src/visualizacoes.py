@@ -1,37 +1,36 @@
 # src/visualizacoes.py
 
+import numpy as np
 import pandas as pd
-import plotly.express as px
+import plotly.graph_objects as go
+
+# Pontos por série após a redução (LTTB) e total de pontos de um gráfico com
+# várias séries; acima disso cada série é reduzida proporcionalmente.
+LIMITE_PONTOS = 1_000
+ORCAMENTO_PONTOS = 100_000
+
+PERCENTIS_FAIXAS = (5, 25, 50, 75, 95)
 
 def plotar_fluxo_de_caixa(fluxo_caixa_df: pd.DataFrame):
     """
     Cria e retorna um gráfico de barras interativo do fluxo de caixa.
+
+    O acumulado é calculado à parte; o DataFrame recebido não é alterado.
     """
-    # Calcula o fluxo de caixa acumulado
-    fluxo_caixa_df["Fluxo de Caixa Acumulado"] = fluxo_caixa_df["Fluxo de Caixa"].cumsum()
-    
-    fig = px.bar(
-        fluxo_caixa_df,
-        x="Mes",
-        y="Fluxo de Caixa",
-        title="Fluxo de Caixa Mensal",
-        labels={"Mes": "Mês do Projeto", "Fluxo de Caixa": "Valor (R$)"}
-    )
-    
-    # Adiciona a linha do fluxo de caixa acumulado
-    fig.add_trace(
-        px.line(
-            fluxo_caixa_df,
-            x="Mes",
-            y="Fluxo de Caixa Acumulado",
-        ).data[0]
-    )
-    
+    meses = fluxo_caixa_df["Mes"].to_numpy()
+    fluxo = fluxo_caixa_df["Fluxo de Caixa"].to_numpy(dtype=float)
+
+    fig = go.Figure([
+        go.Bar(x=meses, y=fluxo, name="Fluxo de Caixa"),
+        go.Scatter(x=meses, y=np.cumsum(fluxo), mode="lines", name="Fluxo de Caixa Acumulado"),
+    ])
+
     # Atualiza o layout do gráfico
     fig.update_traces(
         hovertemplate="Mês: %{x}<br>Fluxo de Caixa: R$ %{y:,.2f}<extra></extra>"
     )
     fig.update_layout(
+        title="Fluxo de Caixa Mensal",
         xaxis_title="Mês do Projeto",
         yaxis_title="Valor (R$)",
         hovermode="x unified",
@@ -48,3 +47,257 @@ def plotar_fluxo_de_caixa(fluxo_caixa_df: pd.DataFrame):
     )
     
     return fig
+
+
+def plotar_mapa_sensibilidade(indices, precos, margens):
+    """
+    Cria um mapa de calor da margem de lucro por índice de aproveitamento e preço.
+    """
+    fig = go.Figure(
+        go.Heatmap(
+            x=precos,
+            y=indices,
+            z=margens,
+            colorscale="RdYlGn",
+            zmid=0,
+            colorbar=dict(title="Margem (%)"),
+            hovertemplate="Preço: R$ %{x:,.2f}/m²<br>Índice: %{y:.2f}<br>Margem: %{z:.2f}%<extra></extra>"
+        )
+    )
+    fig.update_layout(
+        title="Margem de Lucro por Índice de Aproveitamento e Preço de Vendas",
+        xaxis_title="Preço Médio de Vendas (R$/m²)",
+        yaxis_title="Índice de Aproveitamento"
+    )
+    return fig
+
+
+def plotar_tornado(tornado: list):
+    """
+    Cria um gráfico de tornado a partir da saída de `analisar_tornado`.
+    """
+    # Maior amplitude no topo do gráfico
+    itens = list(reversed(tornado))
+    base = itens[0]['margem_base'] if itens else 0
+    entradas = [item['entrada'] for item in itens]
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        y=entradas,
+        x=[item['margem_baixa'] - base for item in itens],
+        base=base,
+        customdata=[item['margem_baixa'] for item in itens],
+        orientation="h",
+        name="Entrada -",
+        marker_color="#dc3545",
+        hovertemplate="%{y}<br>Margem: %{customdata:.2f}%<extra></extra>"
+    ))
+    fig.add_trace(go.Bar(
+        y=entradas,
+        x=[item['margem_alta'] - base for item in itens],
+        base=base,
+        customdata=[item['margem_alta'] for item in itens],
+        orientation="h",
+        name="Entrada +",
+        marker_color="#28a745",
+        hovertemplate="%{y}<br>Margem: %{customdata:.2f}%<extra></extra>"
+    ))
+    fig.update_layout(
+        title="Sensibilidade da Margem de Lucro",
+        xaxis_title="Margem de Lucro (%)",
+        barmode="overlay",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, title=""),
+        height=max(300, 28 * len(itens) + 120)
+    )
+    return fig
+
+
+def plotar_distribuicao_margens(distribuicao: list):
+    """
+    Cria um histograma da quantidade de projetos por faixa de margem de lucro.
+    """
+    fig = go.Figure(go.Bar(
+        x=[rotulo for rotulo, _ in distribuicao],
+        y=[quantidade for _, quantidade in distribuicao],
+        marker_color="#495057",
+        hovertemplate="Margem %{x}<br>Projetos: %{y}<extra></extra>"
+    ))
+    fig.update_layout(
+        title="Distribuição da Margem de Lucro",
+        xaxis_title="Margem de Lucro",
+        yaxis_title="Projetos"
+    )
+    return fig
+
+
+# --- Várias séries: carteira e cenários ---
+
+def indices_lttb(series, limite: int) -> np.ndarray:
+    """
+    Índices dos pontos mantidos pelo Largest-Triangle-Three-Buckets em cada série.
+
+    As séries têm períodos igualmente espaçados (meses ou dias). O primeiro e
+    o último ponto são sempre mantidos; em cada balde intermediário fica o
+    ponto que forma o maior triângulo com o ponto escolhido no balde anterior
+    e a média do balde seguinte, o que preserva picos e vales. Todas as
+    séries avançam juntas, um balde por iteração.
+
+    Args:
+        series: Matriz (n, T) com uma série por linha.
+        limite: Pontos por série após a redução (mínimo 3).
+
+    Returns:
+        Matriz (n, k) de índices crescentes, k = min(limite, T).
+    """
+    y = np.atleast_2d(series)
+    n, total = y.shape
+    if limite >= total or limite < 3:
+        return np.broadcast_to(np.arange(total), (n, total))
+
+    x = np.arange(total, dtype=float)
+    bordas = np.linspace(1, total - 1, limite - 1).astype(np.intp)
+    linhas = np.arange(n)
+    indices = np.empty((n, limite), dtype=np.intp)
+    indices[:, 0] = 0
+    indices[:, -1] = total - 1
+
+    anterior = np.zeros(n, dtype=np.intp)
+    for b in range(limite - 2):
+        inicio, fim = bordas[b], bordas[b + 1]
+        if b + 2 < len(bordas):
+            prox_inicio, prox_fim = bordas[b + 1], bordas[b + 2]
+        else:
+            prox_inicio, prox_fim = total - 1, total
+        xc = x[prox_inicio:prox_fim].mean()
+        yc = y[:, prox_inicio:prox_fim].mean(axis=1)
+        xa = x[anterior]
+        ya = y[linhas, anterior]
+
+        area = np.abs(
+            (xa - xc)[:, None] * (y[:, inicio:fim] - ya[:, None])
+            - (xa[:, None] - x[None, inicio:fim]) * (yc - ya)[:, None]
+        )
+        anterior = inicio + np.argmax(np.nan_to_num(area, nan=-1.0), axis=1)
+        indices[:, b + 1] = anterior
+    return indices
+
+
+def _limite_por_serie(n_series: int, limite_pontos: int) -> int:
+    return max(3, min(limite_pontos, ORCAMENTO_PONTOS // max(n_series, 1)))
+
+
+def plotar_fluxos_carteira(
+    fluxos,
+    nomes=None,
+    periodos=None,
+    acumulado: bool = True,
+    limite_pontos: int = LIMITE_PONTOS,
+    titulo: str = "Fluxo de Caixa Acumulado da Carteira"
+):
+    """
+    Sobrepõe os fluxos de caixa de vários projetos num único gráfico WebGL.
+
+    Todas as séries vão num só traço `Scattergl`, separadas por lacunas, o
+    que mantém o gráfico leve no navegador mesmo com centenas de projetos.
+    Séries longas (ex.: diárias) são reduzidas com `indices_lttb`. Os dados
+    recebidos não são alterados.
+
+    Args:
+        fluxos: Matriz (n, T) de fluxos por período, um projeto por linha.
+        nomes: Nome de cada projeto, exibido ao passar o mouse.
+        periodos: Rótulos (T,) do eixo x (números ou datas); padrão 1..T.
+        acumulado: Plota o acumulado (padrão) em vez do fluxo do período.
+        limite_pontos: Pontos máximos por série.
+    """
+    y = np.atleast_2d(np.asarray(fluxos, dtype=float))
+    if acumulado:
+        y = np.cumsum(y, axis=1)
+    n, total = y.shape
+    x = np.arange(1, total + 1) if periodos is None else np.asarray(periodos)
+    nomes = np.asarray([f"Projeto {i + 1}" for i in range(n)] if nomes is None else nomes, dtype=object)
+
+    indices = indices_lttb(y, _limite_por_serie(n, limite_pontos))
+    k = indices.shape[1]
+    # Uma coluna de lacuna ao fim de cada série separa os projetos no traço único
+    ys = np.hstack([np.take_along_axis(y, indices, axis=1), np.full((n, 1), np.nan)]).ravel()
+    lacuna_x = np.array(['NaT'], dtype=x.dtype) if np.issubdtype(x.dtype, np.datetime64) else np.array([np.nan])
+    xs = np.hstack([x[indices], np.broadcast_to(lacuna_x, (n, 1))]).ravel()
+
+    fig = go.Figure(go.Scattergl(
+        x=xs,
+        y=ys,
+        mode="lines",
+        line=dict(width=1, color="rgba(73, 80, 87, 0.35)"),
+        customdata=np.repeat(nomes, k + 1),
+        connectgaps=False,
+        hovertemplate="%{customdata}<br>Período: %{x}<br>R$ %{y:,.2f}<extra></extra>",
+        name="Projetos"
+    ))
+    fig.update_layout(
+        title=titulo,
+        xaxis_title="Período",
+        yaxis_title="Valor (R$)",
+        hovermode="closest",
+        showlegend=False
+    )
+    return fig
+
+
+def plotar_faixas_fluxo(
+    cenarios,
+    periodos=None,
+    percentis: tuple = PERCENTIS_FAIXAS,
+    acumulado: bool = True,
+    limite_pontos: int = LIMITE_PONTOS,
+    titulo: str = "Faixas do Fluxo de Caixa Acumulado"
+):
+    """
+    Gráfico em leque (faixas de percentis) de muitos cenários de fluxo de caixa.
+
+    Args:
+        cenarios: Matriz (m, T) com um cenário (ex.: de Monte Carlo) por linha.
+        periodos: Rótulos (T,) do eixo x; padrão 1..T.
+        percentis: Quantidade ímpar de percentis em ordem crescente; o do meio
+            vira a linha central e os demais formam faixas simétricas.
+        acumulado: Usa o fluxo acumulado (padrão) em vez do fluxo do período.
+        limite_pontos: Pontos máximos das curvas; todas usam os mesmos períodos,
+            escolhidos pelo LTTB da curva central.
+    """
+    if len(percentis) % 2 == 0 or list(percentis) != sorted(percentis):
+        raise ValueError("Informe uma quantidade ímpar de percentis em ordem crescente.")
+
+    y = np.atleast_2d(np.asarray(cenarios, dtype=float))
+    if acumulado:
+        y = np.cumsum(y, axis=1)
+    total = y.shape[1]
+    x = np.arange(1, total + 1) if periodos is None else np.asarray(periodos)
+
+    curvas = np.percentile(y, percentis, axis=0)
+    meio = len(percentis) // 2
+    indices = indices_lttb(curvas[meio], limite_pontos)[0]
+    curvas = curvas[:, indices]
+    x = x[indices]
+
+    fig = go.Figure()
+    for i in range(meio):
+        opacidade = 0.15 + 0.5 * (i + 1) / (meio + 1)
+        cor = f"rgba(0, 123, 255, {opacidade:.2f})"
+        fig.add_trace(go.Scattergl(
+            x=x, y=curvas[i], mode="lines", line=dict(width=0), showlegend=False, hoverinfo="skip"
+        ))
+        fig.add_trace(go.Scattergl(
+            x=x, y=curvas[-1 - i], mode="lines", line=dict(width=0), fill="tonexty", fillcolor=cor,
+            name=f"P{percentis[i]}–P{percentis[-1 - i]}", hoverinfo="skip"
+        ))
+    fig.add_trace(go.Scattergl(
+        x=x, y=curvas[meio], mode="lines", line=dict(color="#343a40", width=2),
+        name=f"P{percentis[meio]}",
+        hovertemplate="Período: %{x}<br>R$ %{y:,.2f}<extra></extra>"
+    ))
+    fig.update_layout(
+        title=titulo,
+        xaxis_title="Período",
+        yaxis_title="Valor (R$)",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, title="")
+    )
+    return fig
@@ -0,0 +1,531 @@
+# src/zoneamento.py
+"""
+Zoneamento local: índice de aproveitamento e relação AP/AC pela localização do terreno.
+
+Uso (na raiz do repositório):
+    python -m src.zoneamento zonas.geojson terrenos.csv terrenos_zoneados.csv
+    python -m src.zoneamento zonas.shp terrenos.csv saida.csv --campo-indice CA_BASICO
+    python -m src.zoneamento zonas.geojson terrenos.csv saida.csv --calcular
+
+Os polígonos de zoneamento (GeoJSON ou Shapefile) são convertidos uma vez
+em arrays — arestas, caixas envolventes e uma R-tree empacotada por STR —
+gravados em disco; as cargas seguintes abrem esses arrays por memória
+mapeada, sem reler o arquivo original. Shapefile requer `pyshp`.
+
+As coordenadas dos terrenos devem estar no mesmo sistema de referência
+dos polígonos (por exemplo, longitude/latitude em WGS 84 para GeoJSON).
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+from src.calculos_lote import calcular_terrenos_df
+from src.data_model import get_empty_project_data
+
+VERSAO_CACHE = 1
+
+PASTA_CACHE = os.environ.get(
+    'VIABILIDADE_ZONEAMENTO_DIR',
+    os.path.join(tempfile.gettempdir(), 'viabilidade_zoneamento')
+)
+
+# Atributos lidos de cada polígono (podem ser trocados por arquivo)
+CAMPO_INDICE = 'indice_aproveitamento'
+CAMPO_RELACAO = 'relacao_privativa_construida'
+CAMPO_ZONA = 'zona'
+
+# Filhos por nó da R-tree; nós pequenos testam menos caixas por ponto na descida em lote
+CAPACIDADE_NO = 6
+
+# Cada polígono é dividido em até FAIXAS_MAX faixas horizontais; um ponto só
+# testa as arestas da sua faixa
+FAIXAS_MAX = 64
+
+# Pontos consultados por vez (limita a memória dos pares ponto × aresta)
+PONTOS_POR_BLOCO = 16_384
+
+_ARRAYS = (
+    'caixas', 'area', 'origem', 'indice', 'relacao',
+    'arestas', 'faixa_inicio', 'faixa_n', 'faixa_y0', 'faixa_altura', 'faixa_ptr', 'faixa_arestas',
+    'arvore_caixas', 'arvore_inicio', 'arvore_fim', 'nivel_ptr',
+)
+
+
+# --- Leitura dos polígonos ---
+
+def _area_assinada(anel) -> float:
+    x, y = anel[:, 0], anel[:, 1]
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+
+
+def _numero(valor):
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _ler_geojson(caminho: str):
+    with open(caminho, encoding='utf-8') as arquivo:
+        dados = json.load(arquivo)
+    feicoes = dados['features'] if dados.get('type') == 'FeatureCollection' else [dados]
+    for feicao in feicoes:
+        geometria = feicao.get('geometry') or {}
+        if geometria.get('type') == 'Polygon':
+            poligonos = [geometria['coordinates']]
+        elif geometria.get('type') == 'MultiPolygon':
+            poligonos = geometria['coordinates']
+        else:
+            continue
+        aneis, area = [], 0.0
+        for poligono in poligonos:
+            for i, anel in enumerate(poligono):
+                anel = np.asarray(anel, dtype=float)[:, :2]
+                aneis.append(anel)
+                # Primeiro anel é o contorno; os demais, buracos
+                area += abs(_area_assinada(anel)) * (1 if i == 0 else -1)
+        yield aneis, area, feicao.get('properties') or {}
+
+
+def _pyshp():
+    try:
+        import shapefile
+    except ImportError:
+        raise ImportError("O formato Shapefile requer o pacote 'pyshp'.") from None
+    return shapefile
+
+
+def _ler_shapefile(caminho: str):
+    leitor = _pyshp().Reader(caminho)
+    campos = [campo[0] for campo in leitor.fields[1:]]
+    for forma, registro in zip(leitor.iterShapes(), leitor.iterRecords()):
+        if not forma.points:
+            continue
+        pontos = np.asarray(forma.points, dtype=float)[:, :2]
+        limites = list(forma.parts) + [len(pontos)]
+        aneis = [pontos[a:b] for a, b in zip(limites, limites[1:])]
+        # Contornos em sentido horário e buracos no anti-horário: a soma já desconta os buracos
+        area = abs(sum(_area_assinada(anel) for anel in aneis))
+        yield aneis, area, dict(zip(campos, registro))
+
+
+def ler_zonas(caminho: str):
+    """Itera (anéis, área, atributos) dos polígonos de um GeoJSON ou Shapefile."""
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao in ('.geojson', '.json'):
+        return _ler_geojson(caminho)
+    if extensao == '.shp':
+        return _ler_shapefile(caminho)
+    raise ValueError(f"Formato de zoneamento não suportado: {extensao}")
+
+
+# --- Construção do índice ---
+
+def _expandir(inicio, contagem) -> np.ndarray:
+    """Concatena os intervalos [inicio, inicio + contagem) de cada posição."""
+    total = int(contagem.sum())
+    deslocamento = np.cumsum(contagem) - contagem
+    return np.repeat(inicio - deslocamento, contagem) + np.arange(total)
+
+
+def _ordem_str(caixas, capacidade: int) -> np.ndarray:
+    """Ordem Sort-Tile-Recursive: fatias verticais pelo centro em x, cada uma ordenada em y."""
+    n = len(caixas)
+    folhas = math.ceil(n / capacidade)
+    por_fatia = math.ceil(math.sqrt(folhas)) * capacidade
+    cx = (caixas[:, 0] + caixas[:, 2]) / 2
+    cy = (caixas[:, 1] + caixas[:, 3]) / 2
+    fatia = np.empty(n, dtype=np.intp)
+    fatia[np.argsort(cx, kind='stable')] = np.arange(n) // por_fatia
+    return np.lexsort((cy, fatia))
+
+
+def _agrupar(caixas, capacidade: int):
+    """Nós de um nível: grupos consecutivos de `capacidade` itens e a caixa de cada grupo."""
+    inicio = np.arange(0, len(caixas), capacidade)
+    fim = np.minimum(inicio + capacidade, len(caixas))
+    caixas_nos = np.column_stack([
+        np.minimum.reduceat(caixas[:, 0], inicio),
+        np.minimum.reduceat(caixas[:, 1], inicio),
+        np.maximum.reduceat(caixas[:, 2], inicio),
+        np.maximum.reduceat(caixas[:, 3], inicio),
+    ])
+    return caixas_nos, inicio, fim
+
+
+def construir_indice(
+    zonas,
+    campo_indice: str = CAMPO_INDICE,
+    campo_relacao: str = CAMPO_RELACAO,
+    campo_zona: str = CAMPO_ZONA,
+    capacidade: int = CAPACIDADE_NO
+) -> tuple:
+    """
+    Converte polígonos em arrays consultáveis.
+
+    Args:
+        zonas: Iterável de (anéis, área, atributos), como o de `ler_zonas`.
+
+    Returns:
+        Tupla (arrays, nomes das zonas), no formato lido por `IndiceZoneamento`.
+    """
+    caixas, areas, indices, relacoes, nomes = [], [], [], [], []
+    arestas, faixas = [], []
+    total_arestas = 0
+
+    for aneis, area, atributos in zonas:
+        segmentos = []
+        for anel in aneis:
+            if len(anel) < 3:
+                continue
+            fechado = anel if np.array_equal(anel[0], anel[-1]) else np.vstack([anel, anel[:1]])
+            segmentos.append(np.hstack([fechado[:-1], fechado[1:]]))
+        if not segmentos:
+            continue
+        seg = np.vstack(segmentos)
+        xmin, ymin = seg[:, [0, 2]].min(), seg[:, [1, 3]].min()
+        xmax, ymax = seg[:, [0, 2]].max(), seg[:, [1, 3]].max()
+
+        # Faixas horizontais do polígono; cada aresta entra em todas as que cruza
+        n_faixas = min(FAIXAS_MAX, max(1, math.isqrt(len(seg))))
+        altura = (ymax - ymin) / n_faixas or 1.0
+        baixo = np.clip(((np.minimum(seg[:, 1], seg[:, 3]) - ymin) / altura).astype(np.intp), 0, n_faixas - 1)
+        alto = np.clip(((np.maximum(seg[:, 1], seg[:, 3]) - ymin) / altura).astype(np.intp), 0, n_faixas - 1)
+        contagem = alto - baixo + 1
+        faixa = _expandir(baixo, contagem)
+        aresta = np.repeat(np.arange(len(seg)), contagem)
+        ordem = np.argsort(faixa, kind='stable')
+        por_faixa = np.bincount(faixa, minlength=n_faixas)
+
+        caixas.append((xmin, ymin, xmax, ymax))
+        areas.append(area)
+        indices.append(_numero(atributos.get(campo_indice)))
+        relacoes.append(_numero(atributos.get(campo_relacao)))
+        nomes.append(None if atributos.get(campo_zona) is None else str(atributos[campo_zona]))
+        arestas.append(seg)
+        faixas.append((ymin, altura, por_faixa, total_arestas + aresta[ordem]))
+        total_arestas += len(seg)
+
+    if not caixas:
+        raise ValueError("Nenhum polígono encontrado no arquivo de zoneamento.")
+
+    caixas = np.asarray(caixas, dtype=float)
+    ordem = _ordem_str(caixas, capacidade)
+
+    # Faixas no formato CSR, já na ordem da R-tree
+    faixas = [faixas[i] for i in ordem]
+    faixa_n = np.array([len(f[2]) for f in faixas], dtype=np.int64)
+    faixa_inicio = np.concatenate([[0], np.cumsum(faixa_n)[:-1]]).astype(np.int64)
+    faixa_ptr = np.concatenate([[0], np.cumsum(np.concatenate([f[2] for f in faixas]))]).astype(np.int64)
+
+    arrays = {
+        'caixas': caixas[ordem],
+        'area': np.asarray(areas, dtype=float)[ordem],
+        'origem': ordem.astype(np.int64),
+        'indice': np.asarray(indices, dtype=float)[ordem],
+        'relacao': np.asarray(relacoes, dtype=float)[ordem],
+        'arestas': np.vstack(arestas),
+        'faixa_inicio': faixa_inicio,
+        'faixa_n': faixa_n,
+        'faixa_y0': np.array([f[0] for f in faixas], dtype=float),
+        'faixa_altura': np.array([f[1] for f in faixas], dtype=float),
+        'faixa_ptr': faixa_ptr,
+        'faixa_arestas': np.concatenate([f[3] for f in faixas]).astype(np.int64),
+    }
+
+    # R-tree: nível 0 aponta para as zonas; cada nível acima, para o de baixo
+    niveis = []
+    itens = arrays['caixas']
+    while True:
+        caixas_nos, inicio, fim = _agrupar(itens, capacidade)
+        if len(caixas_nos) > 1:
+            reordem = _ordem_str(caixas_nos, capacidade)
+            caixas_nos, inicio, fim = caixas_nos[reordem], inicio[reordem], fim[reordem]
+        niveis.append((caixas_nos, inicio, fim))
+        if len(caixas_nos) == 1:
+            break
+        itens = caixas_nos
+
+    arrays['arvore_caixas'] = np.vstack([n[0] for n in niveis])
+    arrays['arvore_inicio'] = np.concatenate([n[1] for n in niveis]).astype(np.int64)
+    arrays['arvore_fim'] = np.concatenate([n[2] for n in niveis]).astype(np.int64)
+    arrays['nivel_ptr'] = np.concatenate([[0], np.cumsum([len(n[0]) for n in niveis])]).astype(np.int64)
+
+    return arrays, [nomes[i] for i in ordem]
+
+
+# --- Consulta ---
+
+class IndiceZoneamento:
+    """
+    Índice espacial das zonas, consultado em lote.
+
+    Os arrays podem ser memória mapeada (ver `carregar_indice`); nenhum é
+    modificado pelas consultas, então uma instância pode ser compartilhada
+    entre threads.
+    """
+
+    def __init__(self, arrays: dict, zonas: list):
+        # np.asarray descarta a subclasse memmap (mantendo o mapeamento), cuja
+        # indexação é bem mais lenta
+        for nome in _ARRAYS:
+            setattr(self, nome, np.asarray(arrays[nome]))
+        self._largura = np.arange(int((self.arvore_fim - self.arvore_inicio).max()))
+        self.zonas = np.asarray(zonas, dtype=object)
+
+    def __len__(self):
+        return len(self.caixas)
+
+    def localizar(self, x, y) -> np.ndarray:
+        """
+        Zona (posição em `zonas`) que contém cada ponto; -1 fora de todas.
+
+        Com zonas sobrepostas vale a de menor área (a mais específica) e, em
+        caso de empate, a que aparece antes no arquivo.
+        """
+        x = np.asarray(x, dtype=float).ravel()
+        y = np.asarray(y, dtype=float).ravel()
+        saida = np.full(len(x), -1, dtype=np.int64)
+        for inicio in range(0, len(x), PONTOS_POR_BLOCO):
+            bloco = slice(inicio, inicio + PONTOS_POR_BLOCO)
+            saida[bloco] = self._localizar_bloco(x[bloco], y[bloco])
+        return saida
+
+    def _localizar_bloco(self, x, y) -> np.ndarray:
+        # Descida na R-tree: pares (ponto, nó) cuja caixa contém o ponto. Cada
+        # nó é expandido numa linha de `largura` filhos (as posições além do
+        # último filho são mascaradas), testados de uma vez.
+        ponto = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+        px, py = x[ponto], y[ponto]
+        raiz = self.arvore_caixas[self.nivel_ptr[-2]]
+        dentro = (px >= raiz[0]) & (px <= raiz[2]) & (py >= raiz[1]) & (py <= raiz[3])
+        ponto, px, py = ponto[dentro], px[dentro], py[dentro]
+        no = np.zeros(len(ponto), dtype=np.int64)
+
+        for nivel in range(len(self.nivel_ptr) - 2, -1, -1):
+            i = self.nivel_ptr[nivel] + no
+            inicio = self.arvore_inicio[i][:, None]
+            filhos = inicio + self._largura
+            validos = filhos < self.arvore_fim[i][:, None]
+            filhos = np.where(validos, filhos, inicio)
+            if nivel:
+                c = self.arvore_caixas[self.nivel_ptr[nivel - 1]:self.nivel_ptr[nivel]][filhos]
+            else:
+                c = self.caixas[filhos]
+            xs, ys = px[:, None], py[:, None]
+            dentro = validos & (xs >= c[..., 0]) & (xs <= c[..., 2]) & (ys >= c[..., 1]) & (ys <= c[..., 3])
+            linha, coluna = np.nonzero(dentro)
+            ponto, px, py, no = ponto[linha], px[linha], py[linha], filhos[linha, coluna]
+        zona = no
+
+        # Ponto no polígono (regra par-ímpar), só com as arestas da faixa do ponto
+        faixa = np.clip(
+            ((py - self.faixa_y0[zona]) / self.faixa_altura[zona]).astype(np.int64), 0, self.faixa_n[zona] - 1
+        )
+        slot = self.faixa_inicio[zona] + faixa
+        inicio = self.faixa_ptr[slot]
+        contagem = self.faixa_ptr[slot + 1] - inicio
+        par = np.repeat(np.arange(len(ponto)), contagem)
+        a = self.arestas[self.faixa_arestas[_expandir(inicio, contagem)]]
+        ypar, xpar = py[par], px[par]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cruza = ((a[:, 1] > ypar) != (a[:, 3] > ypar)) & (
+                xpar < (a[:, 2] - a[:, 0]) * (ypar - a[:, 1]) / (a[:, 3] - a[:, 1]) + a[:, 0]
+            )
+        contido = np.bincount(par, weights=cruza, minlength=len(ponto)).astype(np.int64) % 2 == 1
+        ponto, zona = ponto[contido], zona[contido]
+
+        # Menor área primeiro (empate: a que vem antes no arquivo); fica a primeira de cada ponto
+        ordem = np.lexsort((self.origem[zona], self.area[zona], ponto))
+        ponto, zona = ponto[ordem], zona[ordem]
+        primeiro = np.ones(len(ponto), dtype=bool)
+        primeiro[1:] = ponto[1:] != ponto[:-1]
+        saida = np.full(len(x), -1, dtype=np.int64)
+        saida[ponto[primeiro]] = zona[primeiro]
+        return saida
+
+    def consultar(self, x, y) -> dict:
+        """
+        Atributos da zona de cada ponto.
+
+        Returns:
+            Dicionário de vetores: `zona` (nome ou None), `indice_aproveitamento`
+            e `relacao_privativa_construida` (NaN fora de zona ou sem o atributo).
+        """
+        posicao = self.localizar(x, y)
+        achou = posicao >= 0
+        indice = np.full(len(posicao), np.nan)
+        relacao = np.full(len(posicao), np.nan)
+        zona = np.full(len(posicao), None, dtype=object)
+        indice[achou] = self.indice[posicao[achou]]
+        relacao[achou] = self.relacao[posicao[achou]]
+        zona[achou] = self.zonas[posicao[achou]]
+        return {
+            'zona': zona,
+            'indice_aproveitamento': indice,
+            'relacao_privativa_construida': relacao,
+        }
+
+    def consultar_poligonos(self, poligonos) -> dict:
+        """`consultar` no centroide de cada terreno (lista de anéis externos (k, 2))."""
+        centros = np.array([centroide(p) for p in poligonos], dtype=float).reshape(-1, 2)
+        return self.consultar(centros[:, 0], centros[:, 1])
+
+
+def centroide(anel) -> tuple:
+    """Centroide (x, y) de um polígono simples; a média dos vértices se a área for nula."""
+    anel = np.asarray(anel, dtype=float)[:, :2]
+    x, y = anel[:, 0], anel[:, 1]
+    x1, y1 = np.roll(x, -1), np.roll(y, -1)
+    cruz = x * y1 - x1 * y
+    area = cruz.sum() / 2
+    if area == 0:
+        return float(x.mean()), float(y.mean())
+    return float(((x + x1) * cruz).sum() / (6 * area)), float(((y + y1) * cruz).sum() / (6 * area))
+
+
+# --- Cache em disco ---
+
+def chave_indice(caminho: str, campo_indice: str, campo_relacao: str, campo_zona: str) -> str:
+    """Identifica o arquivo (caminho, tamanho e data de modificação) e os campos lidos."""
+    info = os.stat(caminho)
+    partes = (VERSAO_CACHE, os.path.abspath(caminho), info.st_size, info.st_mtime_ns,
+              campo_indice, campo_relacao, campo_zona, CAPACIDADE_NO, FAIXAS_MAX)
+    return hashlib.blake2b(repr(partes).encode(), digest_size=16).hexdigest()
+
+
+def gravar_indice(pasta: str, arrays: dict, zonas: list):
+    """Grava os arrays (.npy) e os nomes das zonas; a pasta aparece completa ou não aparece."""
+    os.makedirs(os.path.dirname(pasta) or '.', exist_ok=True)
+    temporaria = tempfile.mkdtemp(dir=os.path.dirname(pasta) or '.')
+    try:
+        for nome in _ARRAYS:
+            np.save(os.path.join(temporaria, f"{nome}.npy"), np.ascontiguousarray(arrays[nome]))
+        with open(os.path.join(temporaria, 'zonas.json'), 'w', encoding='utf-8') as arquivo:
+            json.dump(zonas, arquivo)
+        os.replace(temporaria, pasta)
+    except OSError:
+        # Outro processo gravou o mesmo índice primeiro
+        shutil.rmtree(temporaria, ignore_errors=True)
+        if not os.path.isdir(pasta):
+            raise
+
+
+def carregar_indice(pasta: str) -> IndiceZoneamento:
+    """Abre um índice gravado por `gravar_indice`, com os arrays em memória mapeada."""
+    arrays = {nome: np.load(os.path.join(pasta, f"{nome}.npy"), mmap_mode='r') for nome in _ARRAYS}
+    with open(os.path.join(pasta, 'zonas.json'), encoding='utf-8') as arquivo:
+        zonas = json.load(arquivo)
+    return IndiceZoneamento(arrays, zonas)
+
+
+def abrir_zoneamento(
+    caminho: str,
+    campo_indice: str = CAMPO_INDICE,
+    campo_relacao: str = CAMPO_RELACAO,
+    campo_zona: str = CAMPO_ZONA,
+    pasta_cache: str = PASTA_CACHE
+) -> IndiceZoneamento:
+    """
+    Índice do arquivo de zoneamento, construído só na primeira vez.
+
+    O cache é invalidado quando o arquivo muda (tamanho ou data de
+    modificação) ou quando outros campos são pedidos.
+    """
+    pasta = os.path.join(pasta_cache, chave_indice(caminho, campo_indice, campo_relacao, campo_zona))
+    if not os.path.isdir(pasta):
+        arrays, zonas = construir_indice(ler_zonas(caminho), campo_indice, campo_relacao, campo_zona)
+        gravar_indice(pasta, arrays, zonas)
+    return carregar_indice(pasta)
+
+
+# --- Terrenos ---
+
+def preencher_terrenos_df(
+    terrenos,
+    indice: IndiceZoneamento,
+    colunas_coordenadas: tuple = ('longitude', 'latitude'),
+    sobrescrever: bool = False
+):
+    """
+    Preenche `indice_aproveitamento` e `relacao_privativa_construida` pela zona de cada terreno.
+
+    Valores já informados são mantidos, a menos que `sobrescrever` seja
+    True. Sem relação AP/AC na zona nem no arquivo, usa o padrão da página
+    de entrada. A coluna `zona` recebe o nome da zona (vazia fora de zona).
+
+    Returns:
+        Uma cópia do DataFrame, pronta para `calculos_lote.calcular_terrenos_df`.
+    """
+    coluna_x, coluna_y = colunas_coordenadas
+    faltando = [c for c in colunas_coordenadas if c not in terrenos.columns]
+    if faltando:
+        raise ValueError(f"Colunas ausentes no arquivo de terrenos: {', '.join(faltando)}")
+
+    zoneado = indice.consultar(
+        terrenos[coluna_x].to_numpy(dtype=float), terrenos[coluna_y].to_numpy(dtype=float)
+    )
+    padroes = {'relacao_privativa_construida': get_empty_project_data()['relacao_privativa_construida']}
+
+    saida = terrenos.copy()
+    saida['zona'] = zoneado['zona']
+    for coluna in ('indice_aproveitamento', 'relacao_privativa_construida'):
+        da_zona = zoneado[coluna]
+        if coluna in saida.columns and not sobrescrever:
+            atual = saida[coluna].to_numpy(dtype=float)
+            valores = np.where(np.isnan(atual), da_zona, atual)
+        else:
+            valores = da_zona
+        if coluna in padroes:
+            valores = np.where(np.isnan(valores), padroes[coluna], valores)
+        saida[coluna] = valores
+    return saida
+
+
+# --- Linha de comando ---
+
+def main(argv=None):
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Preenche índice de aproveitamento e relação AP/AC pelo zoneamento.")
+    parser.add_argument('zoneamento', help="GeoJSON ou Shapefile com os polígonos das zonas")
+    parser.add_argument('terrenos', help="CSV com as coordenadas dos terrenos")
+    parser.add_argument('saida', help="CSV de saída")
+    parser.add_argument('--campo-indice', default=CAMPO_INDICE)
+    parser.add_argument('--campo-relacao', default=CAMPO_RELACAO)
+    parser.add_argument('--campo-zona', default=CAMPO_ZONA)
+    parser.add_argument('--x', default='longitude', help="Coluna da coordenada x (padrão: longitude)")
+    parser.add_argument('--y', default='latitude', help="Coluna da coordenada y (padrão: latitude)")
+    parser.add_argument('--sobrescrever', action='store_true', help="Substitui valores já informados")
+    parser.add_argument('--calcular', action='store_true',
+                        help="Acrescenta os resultados da viabilidade (área, VGV, custos, margem) de cada terreno")
+    args = parser.parse_args(argv)
+
+    indice = abrir_zoneamento(args.zoneamento, args.campo_indice, args.campo_relacao, args.campo_zona)
+    terrenos = pd.read_csv(args.terrenos)
+    saida = preencher_terrenos_df(terrenos, indice, (args.x, args.y), args.sobrescrever)
+    if args.calcular:
+        # Sem colunas próprias, os custos indiretos são os padrões da página de entrada
+        padrao = get_empty_project_data()
+        saida = calcular_terrenos_df(
+            saida,
+            [{'%': pct} for _, pct in padrao['custos_indiretos']],
+            padrao['custos_monetarios']
+        )
+    saida.to_csv(args.saida, index=False)
+
+    fora = int(saida['zona'].isna().sum())
+    print(f"{len(saida)} terrenos, {len(indice)} zonas; {fora} fora de qualquer zona")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,39 @@
+import pytest
+
+from src.banco_dados import (
+    carregar_versao, carregar_viabilidade, diferenca_versoes, listar_versoes, obter_engine,
+    salvar_versao, viabilidades
+)
+from src.versionamento import INTERVALO_SNAPSHOT
+
+
+@pytest.fixture
+def engine(tmp_path):
+    return obter_engine(f"sqlite:///{tmp_path / 'viabilidades.db'}")
+
+
+def test_versoes_atravessando_snapshots(engine):
+    gravados = [{'area': i, 'custos': {'iptu': i % 3}, 'nome': 'Lote'} for i in range(2 * INTERVALO_SNAPSHOT + 3)]
+    for dados in gravados:
+        resultado = salvar_versao(engine, 'Lote', dados)
+    assert salvar_versao(engine, 'Lote', gravados[-1])['alterada'] is False
+
+    id_viabilidade = resultado['id']
+    tipos = {v['versao']: v['tipo'] for v in listar_versoes(engine, id_viabilidade)}
+    assert len(tipos) == len(gravados)
+    assert tipos[INTERVALO_SNAPSHOT + 1] == 'snapshot' and tipos[INTERVALO_SNAPSHOT + 2] == 'delta'
+    for numero, dados in enumerate(gravados, start=1):
+        assert carregar_versao(engine, id_viabilidade, numero) == dados
+    assert carregar_versao(engine, id_viabilidade, len(gravados) + 1) is None
+    assert diferenca_versoes(engine, id_viabilidade, 1, 2) == [['set', ['area'], 1], ['set', ['custos', 'iptu'], 1]]
+
+
+def test_gravacao_fora_do_historico_vira_versao(engine):
+    id_viabilidade = salvar_versao(engine, 'Lote', {'a': 1, 'b': 1})['id']
+    with engine.begin() as conn:
+        conn.execute(viabilidades.update().values(dados={'a': 1, 'b': 2}))
+
+    assert salvar_versao(engine, 'Lote', {'a': 3, 'b': 2})['versao'] == 3
+    assert carregar_versao(engine, id_viabilidade, 1) == {'a': 1, 'b': 1}
+    assert carregar_versao(engine, id_viabilidade, 2) == {'a': 1, 'b': 2}
+    assert carregar_versao(engine, id_viabilidade, 3) == carregar_viabilidade(engine, id_viabilidade)
@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+from src.calculos_financeiros import calcular_resultado_negocio
+from src.calculos_lote import COLUNAS_RESULTADO, calcular_terrenos_df
+
+CUSTOS_INDIRETOS = [{'%': 4.0}, {'%': 3.61}, {'%': 0.9}]
+CUSTOS_MONETARIOS = {'outorga_onerosa': 150_000.0, 'iptu': 12_000.0}
+
+
+def _terrenos():
+    return pd.DataFrame({
+        'area_terreno': [1200.0, 850.0, 3000.0, 500.0],
+        'indice_aproveitamento': [2.5, 1.0, 4.0, 2.0],
+        'custo_direto_construcao_m2': [3800.0, 4200.0, 3500.0, 3900.0],
+        # zero e negativo: áreas zeradas; último com preço zero: margem zerada
+        'relacao_privativa_construida': [0.7, 0.0, -0.5, 0.8],
+        'preco_medio_vendas': [9500.0, 11000.0, 8700.0, 0.0],
+    })
+
+
+def test_igual_ao_calculo_escalar():
+    terrenos = _terrenos()
+    saida = calcular_terrenos_df(terrenos, CUSTOS_INDIRETOS, CUSTOS_MONETARIOS)
+
+    for _, linha in saida.iterrows():
+        esperado = calcular_resultado_negocio(
+            linha['area_terreno'],
+            linha['indice_aproveitamento'],
+            linha['custo_direto_construcao_m2'],
+            linha['relacao_privativa_construida'],
+            linha['preco_medio_vendas'],
+            CUSTOS_INDIRETOS,
+            CUSTOS_MONETARIOS,
+        )
+        for coluna in COLUNAS_RESULTADO:
+            assert linha[coluna] == esperado[coluna], coluna
+
+
+def test_colunas_de_custos_tem_precedencia():
+    terrenos = _terrenos().assign(percentual_custos_indiretos=10.0, custos_indiretos_monetarios=0.0)
+    saida = calcular_terrenos_df(terrenos, CUSTOS_INDIRETOS, CUSTOS_MONETARIOS)
+    assert saida['custos_indiretos_total'].tolist() == pytest.approx((saida['vgv'] * 0.10).tolist())
+
+
+def test_coluna_ausente():
+    with pytest.raises(ValueError, match='preco_medio_vendas'):
+        calcular_terrenos_df(_terrenos().drop(columns='preco_medio_vendas'))
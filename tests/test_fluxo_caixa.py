@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from src.fluxo_caixa import gerar_fluxo_caixa, reajustar_fluxo
+
+PARAMETROS = dict(
+    vgv=10_000_000.0, custo_direto_total=5_000_000.0, total_percentual_custos_indiretos=16.0,
+    total_custos_monetarios=200_000.0, duracao_projeto=36,
+)
+
+
+def test_fluxo_nominal_fecha_com_o_resultado():
+    fluxo = gerar_fluxo_caixa(**PARAMETROS)
+    assert fluxo['receitas'].sum() == pytest.approx(10_000_000.0)
+    assert fluxo['custos_obra'].sum() == pytest.approx(5_000_000.0)
+    assert fluxo['fluxo'].sum() == pytest.approx(10_000_000.0 * 0.84 - 5_200_000.0)
+
+
+def test_reajuste_sobre_o_fluxo_nominal():
+    fatores_custos = np.linspace(1.0, 1.2, 36)
+    fatores_receitas = np.linspace(1.0, 1.1, 36)
+    nominal = gerar_fluxo_caixa(**PARAMETROS)
+    copia = {k: v.copy() for k, v in nominal.items()}
+
+    reajustado = reajustar_fluxo(nominal, 16.0, 200_000.0, fatores_custos, fatores_receitas)
+    direto = gerar_fluxo_caixa(**PARAMETROS, fatores_custos=fatores_custos, fatores_receitas=fatores_receitas)
+
+    for chave in direto:
+        np.testing.assert_array_equal(reajustado[chave], direto[chave])
+        np.testing.assert_array_equal(nominal[chave], copia[chave])
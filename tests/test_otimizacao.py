@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from src.calculos_financeiros import calcular_resultado_negocio
+from src.fluxo_caixa import calcular_indicadores, gerar_fluxo_caixa
+from src.otimizacao import PRECISAO_PRECO, bissecao, preco_minimo_para_tir, resolver_margem
+
+
+def test_preco_para_margem_atinge_a_meta():
+    preco = resolver_margem('preco_medio_vendas', 20.0, 1200.0, 2.5, 0.7, 0.0, 3800.0, 16.0, 100_000.0)
+    resultado = calcular_resultado_negocio(
+        1200.0, 2.5, 3800.0, 0.7, float(preco), [{'%': 16.0}], {'outorga_onerosa': 100_000.0}
+    )
+    assert resultado['margem_lucro'] == pytest.approx(20.0)
+
+
+def test_preco_para_tir():
+    precos = preco_minimo_para_tir(15.0, 1200.0, 2.5, 0.7, 3800.0, [16.0, 100.0, 120.0], 100_000.0, 24)
+    assert precos[0] == pytest.approx(7089.04, abs=0.01)
+    # Percentual indireto de 100% ou mais: nenhum preço atinge a meta
+    assert np.isnan(precos[1:]).all()
+
+
+def test_preco_maximo_insuficiente():
+    assert np.isnan(preco_minimo_para_tir(15.0, 1200.0, 2.5, 0.7, 3800.0, 16.0, 100_000.0, 24, preco_maximo=5000.0))
+
+
+def test_bissecao_fora_do_intervalo():
+    resultado = bissecao(lambda x: x ** 3, np.array([8.0, 27.0, -1.0]), 0.0, 3.0)
+    assert resultado[:2] == pytest.approx([2.0, 3.0])
+    assert np.isnan(resultado[2])
+
+
+def test_preco_para_tir_e_o_limite():
+    # Fluxo convencional, pela solução fechada: um décimo de centavo acima
+    # o preço atinge a TIR-alvo, abaixo não
+    preco = float(preco_minimo_para_tir(15.0, 1200.0, 2.5, 0.7, 3800.0, 16.0, 100_000.0, 24))
+    for ajuste, atingida in ((PRECISAO_PRECO, True), (-PRECISAO_PRECO, False)):
+        fluxo = gerar_fluxo_caixa((preco + ajuste) * 3000.0, 3000.0 / 0.7 * 3800.0, 16.0, 100_000.0, 24)
+        assert (calcular_indicadores(fluxo['fluxo'], 0.0)['tir_anual'][0] >= 15.0) == atingida
@@ -0,0 +1,33 @@
+import os
+
+from src import relatorios
+from src.data_model import get_empty_project_data
+
+
+def test_chave_muda_com_o_codigo(monkeypatch):
+    entradas = {**get_empty_project_data(), 'nome_terreno': 'Lote'}
+    chave = relatorios.chave_relatorio(entradas)
+    assert chave == relatorios.chave_relatorio(dict(entradas))
+
+    monkeypatch.setattr(relatorios, 'MODULOS_RELATORIO', relatorios.MODULOS_RELATORIO + ('src.data_model',))
+    relatorios.versao_codigo.cache_clear()
+    try:
+        assert relatorios.chave_relatorio(entradas) != chave
+    finally:
+        monkeypatch.undo()
+        relatorios.versao_codigo.cache_clear()
+
+
+def test_limpar_cache_apaga_os_usados_ha_mais_tempo(tmp_path):
+    for i in range(6):
+        caminho = tmp_path / f"{i}.pdf"
+        caminho.write_bytes(b'%PDF')
+        os.utime(caminho, (1000 + i, 1000 + i))
+    (tmp_path / 'outro.tmp').write_bytes(b'')
+    # Usar um PDF antigo o coloca entre os mais recentes
+    assert relatorios._em_cache(str(tmp_path / '0.pdf'))
+
+    assert relatorios.limpar_cache(str(tmp_path), 3) == 3
+    assert sorted(os.listdir(tmp_path)) == ['0.pdf', '4.pdf', '5.pdf', 'outro.tmp']
+    assert relatorios.limpar_cache(str(tmp_path), 3) == 0
+    assert relatorios.limpar_cache(str(tmp_path / 'inexistente'), 3) == 0
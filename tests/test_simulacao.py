@@ -0,0 +1,32 @@
+import pytest
+
+from src.simulacao import distribuicao_triangular, montar_modelo, simular_viabilidade
+
+
+def _modelo(preco=9000.0):
+    return montar_modelo(
+        1000.0, 2.0, 0.7,
+        distribuicao_triangular(preco, 10),
+        distribuicao_triangular(3800.0, 10),
+        [distribuicao_triangular(4.0, 10), distribuicao_triangular(3.61, 10)],
+        [distribuicao_triangular(100_000.0, 10)],
+    )
+
+
+def test_resumo_reprodutivel_e_sem_vetores():
+    resumo = simular_viabilidade(_modelo(), 30_000, semente=7, tamanho_bloco=4_000)
+    assert resumo == simular_viabilidade(_modelo(), 30_000, semente=7, tamanho_bloco=4_000)
+    assert all(isinstance(v, (int, float)) for v in resumo.values())
+    assert resumo['margem_p5'] < resumo['margem_p50'] < resumo['margem_p95']
+
+
+def test_probabilidade_de_prejuizo():
+    # Preço em torno do custo: parte dos cenários dá prejuízo
+    resumo = simular_viabilidade(_modelo(preco=5900.0), 20_000, semente=1, tamanho_bloco=3_000)
+    assert 0 < resumo['probabilidade_prejuizo'] < 100
+    assert simular_viabilidade(_modelo(), 20_000, semente=1)['probabilidade_prejuizo'] == 0
+
+
+def test_cenarios_invalidos():
+    with pytest.raises(ValueError):
+        simular_viabilidade(_modelo(), 0)
@@ -0,0 +1,38 @@
+import json
+
+import pytest
+
+from src.banco_dados import carregar_versao, carregar_viabilidade, listar_versoes, obter_engine, salvar_versao
+from src.transferencia import importar
+
+
+@pytest.fixture
+def engine(tmp_path):
+    return obter_engine(f"sqlite:///{tmp_path / 'viabilidades.db'}")
+
+
+def _importar(engine, tmp_path, registros):
+    caminho = tmp_path / 'carga.jsonl'
+    caminho.write_text(''.join(json.dumps(r) + '\n' for r in registros), encoding='utf-8')
+    return importar(engine, str(caminho))
+
+
+def test_importacao_seguida_de_gravacao_mantem_historico(engine, tmp_path):
+    id_viabilidade = salvar_versao(engine, 'Lote A', {'a': 1, 'b': 1})['id']
+    _importar(engine, tmp_path, [{'nome_terreno': 'Lote A', 'dados': {'a': 1, 'b': 2}}])
+    resultado = salvar_versao(engine, 'Lote A', {'a': 3, 'b': 2})
+
+    assert resultado['versao'] == 3
+    assert carregar_versao(engine, id_viabilidade, 1) == {'a': 1, 'b': 1}
+    assert carregar_versao(engine, id_viabilidade, 2) == {'a': 1, 'b': 2}
+    assert carregar_versao(engine, id_viabilidade, 3) == carregar_viabilidade(engine, id_viabilidade)
+
+
+def test_importacao_cria_versao_inicial_e_ignora_repeticao(engine, tmp_path):
+    registros = [{'nome_terreno': f'Lote {i}', 'dados': {'i': i}} for i in range(5)]
+    assert _importar(engine, tmp_path, registros)['alteradas'] == 5
+    assert _importar(engine, tmp_path, registros)['alteradas'] == 0
+
+    id_viabilidade = salvar_versao(engine, 'Lote 3', {'i': 3})['id']
+    assert [v['versao'] for v in listar_versoes(engine, id_viabilidade)] == [1]
+    assert carregar_versao(engine, id_viabilidade, 1) == {'i': 3}
@@ -0,0 +1,74 @@
+import json
+import random
+
+import pytest
+
+from src.versionamento import INTERVALO_SNAPSHOT, aplicar_delta, calcular_delta, reconstruir, tipo_da_versao
+
+
+def _documento(rng: random.Random, profundidade: int = 0) -> dict:
+    documento = {}
+    for chave in rng.sample('abcdefgh', rng.randint(0, 6)):
+        sorteio = rng.random()
+        if sorteio < 0.2 and profundidade < 2:
+            documento[chave] = _documento(rng, profundidade + 1)
+        elif sorteio < 0.4:
+            documento[chave] = [rng.randint(0, 3) for _ in range(rng.randint(0, 3))]
+        elif sorteio < 0.6:
+            documento[chave] = rng.choice([0, 1, 1.0, 2.5, None, True])
+        else:
+            documento[chave] = rng.choice(['x', 'y', '', 'ação'])
+    return documento
+
+
+def _historico(versoes: list) -> list:
+    """Registros como gravados no banco (passando por JSON), da versão 1 em diante."""
+    registros = []
+    for numero, documento in enumerate(versoes, start=1):
+        tipo = tipo_da_versao(numero)
+        conteudo = documento if tipo == 'snapshot' else calcular_delta(versoes[numero - 2], documento)
+        registros.append({'versao': numero, 'tipo': tipo, 'conteudo': json.loads(json.dumps(conteudo))})
+    return registros
+
+
+def test_delta_ida_e_volta():
+    rng = random.Random(3)
+    for _ in range(500):
+        antigo, novo = _documento(rng), _documento(rng)
+        assert aplicar_delta(antigo, calcular_delta(antigo, novo)) == novo
+        assert calcular_delta(novo, novo) == []
+
+
+def test_delta_distingue_tipos_e_nao_altera_original():
+    antigo = {'a': 1, 'b': {'c': [1]}}
+    delta = calcular_delta(antigo, {'a': 1.0, 'b': {'c': [1]}})
+    assert delta == [['set', ['a'], 1.0]]
+    assert type(aplicar_delta(antigo, delta)['a']) is float
+    assert antigo == {'a': 1, 'b': {'c': [1]}}
+
+
+def test_reconstroi_todas_as_versoes_atravessando_snapshots():
+    rng = random.Random(11)
+    versoes = [_documento(rng)]
+    for _ in range(2 * INTERVALO_SNAPSHOT + 5):
+        # Edições pequenas sobre a versão anterior, como nas gravações reais
+        proxima = json.loads(json.dumps(versoes[-1]))
+        proxima.update(_documento(rng, profundidade=1))
+        if proxima and rng.random() < 0.3:
+            proxima.pop(rng.choice(sorted(proxima)))
+        versoes.append(proxima)
+    registros = _historico(versoes)
+
+    assert [r['versao'] for r in registros if r['tipo'] == 'snapshot'] == [1, INTERVALO_SNAPSHOT + 1, 2 * INTERVALO_SNAPSHOT + 1]
+    for numero, documento in enumerate(versoes, start=1):
+        # Como em `carregar_versao`: do último snapshot até a versão pedida
+        inicio = (numero - 1) // INTERVALO_SNAPSHOT * INTERVALO_SNAPSHOT
+        assert reconstruir(registros[inicio:numero]) == documento
+        assert reconstruir(registros[:numero]) == documento
+
+
+def test_reconstrucao_precisa_de_snapshot():
+    with pytest.raises(ValueError):
+        reconstruir([{'tipo': 'delta', 'conteudo': []}])
+    with pytest.raises(ValueError):
+        aplicar_delta({}, [['mover', ['a']]])
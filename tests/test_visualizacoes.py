@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from src.visualizacoes import indices_lttb, plotar_faixas_fluxo, plotar_fluxos_carteira
+
+
+def _cenarios(n=200, meses=120):
+    rng = np.random.default_rng(5)
+    return rng.normal(0.0, 1_000.0, (n, meses)) - np.linspace(5_000.0, -8_000.0, meses)
+
+
+def test_lttb_mantem_extremos_e_pico():
+    serie = np.zeros(1_000)
+    serie[537] = 10.0
+    indices = indices_lttb(serie, 50)[0]
+    assert len(indices) == 50 and indices[0] == 0 and indices[-1] == 999
+    assert 537 in indices and (np.diff(indices) > 0).all()
+
+
+def test_faixas_de_percentis():
+    cenarios = _cenarios()
+    copia = cenarios.copy()
+    fig = plotar_faixas_fluxo(cenarios, limite_pontos=40)
+
+    np.testing.assert_array_equal(cenarios, copia)
+    assert [t.name for t in fig.data if t.showlegend is not False] == ['P5–P95', 'P25–P75', 'P50']
+    central = np.asarray(fig.data[-1].y)
+    mediana = np.percentile(np.cumsum(cenarios, axis=1), 50, axis=0)
+    assert len(central) == 40
+    np.testing.assert_allclose(central, mediana[np.asarray(fig.data[-1].x) - 1])
+
+    with pytest.raises(ValueError):
+        plotar_faixas_fluxo(cenarios, percentis=(25, 75))
+
+
+def test_sobreposicao_sem_alterar_os_dados():
+    cenarios = _cenarios(n=30)
+    copia = cenarios.copy()
+    fig = plotar_fluxos_carteira(cenarios)
+    np.testing.assert_array_equal(cenarios, copia)
+    assert len(fig.data) == 1 and np.isnan(np.asarray(fig.data[0].y, dtype=float)).sum() == 30